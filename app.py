@@ -1,23 +1,47 @@
-from flask import Flask, render_template, request, jsonify, send_file
+from flask import Flask, Response, g, render_template, request, jsonify, send_file, stream_with_context
 import ast
+import asyncio
+import atexit
+import cProfile
+import csv
+import ftplib
+import io
 import copy
 import logging
 import os
 import re
 import json
+import math
+import struct
 import sys
-from datetime import datetime
+from datetime import datetime, timezone
 import glob
+import hmac
+import pstats
 import socket
 import threading
-from logging.handlers import RotatingFileHandler
+import time
+import bisect
+import heapq
+import random
+import sqlite3
+import queue
+from array import array
+import uuid
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from collections import Counter, OrderedDict, deque
+from functools import partial, wraps
 from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
 from openpyxl.styles import Font, PatternFill, Alignment
 from openpyxl.utils import get_column_letter
 import tempfile
+import shutil
 from html import unescape
 from pathlib import Path
 import requests
+from requests.adapters import HTTPAdapter
+from urllib.parse import urlsplit
 
 BASE_DIR = Path(getattr(sys, "_MEIPASS", Path(__file__).resolve().parent))
 TEMPLATE_FOLDER = BASE_DIR / "templates"
@@ -25,53 +49,108 @@ STATIC_FOLDER = BASE_DIR / "assets"
 
 app = Flask(__name__, template_folder=str(TEMPLATE_FOLDER), static_folder=str(STATIC_FOLDER), static_url_path='/assets')
 logger = logging.getLogger(__name__)
-SHUTDOWN_TOKEN = os.environ.get('TRANSMISSION_SHUTDOWN_TOKEN', 'transmission-shutdown')
+DEFAULT_SHUTDOWN_TOKEN = 'transmission-shutdown'
+SHUTDOWN_TOKEN = os.environ.get('TRANSMISSION_SHUTDOWN_TOKEN', DEFAULT_SHUTDOWN_TOKEN)
 
 # Settings configuration
 SETTINGS_FILE = 'settings.json'
 
-FTP_TARGET_SLOTS = 2
+FTP_TARGET_SLOTS = 2  # Minimum number of target slots kept for the settings form
+MAX_FTP_TARGETS = 64
+FTP_CONNECT_TIMEOUT = 5
+FTP_LATENCY_BUCKETS_MS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000)
+FTP_LATENCY_WINDOW = 120
+FTP_PROBE_MIN_INTERVAL = 5
+FTP_PROBE_FAST_DIVISOR = 12
+FTP_PROBE_BACKOFF_GROWTH = 1.25
+FTP_PROBE_STABLE_FACTOR = 1.15
+FTP_PROBE_OFFLINE_FACTOR = 0.5
+FTP_PROBE_JITTER = 0.1
+FTP_PROBE_BATCH_WINDOW = 0.25
+FTP_PROBE_MODES = ('tcp', 'ftp')
+FTP_PROTOCOL_TIMEOUT = 10
+FTP_PROTOCOL_MAX_WORKERS = 8
+FTP_THROUGHPUT_MAX_KB = 10240
+FTP_THROUGHPUT_FILE_PREFIX = '.transmission-dashboard-probe'
 DEFAULT_FTP_PORT = 21
 DEFAULT_FTP_PING_INTERVAL = 60
 DEFAULT_RESEND_TIMEOUT = 15
 MAX_REMOTE_RESPONSE_PREVIEW = 1000
-
-PING_LOG_MAX_BYTES = 10_000 * 1024 * 1024  # 10,000 MB limit for ping logs
-PING_LOG_FILENAME = 'ping_status.log'
-
-ping_logger = logging.getLogger('transmission.ping_status')
-ping_logger.setLevel(logging.INFO)
-ping_logger.propagate = False
-
-def configure_ping_logger(logs_dir):
-    """Configure rotating file handler for FTP ping status logs."""
-    try:
-        absolute_dir = os.path.abspath(logs_dir)
-        os.makedirs(absolute_dir, exist_ok=True)
-    except OSError as exc:  # pragma: no cover - filesystem dependent
-        logger.exception('Failed to prepare ping log directory %s: %s', logs_dir, exc)
-        return
-
-    log_path = os.path.join(absolute_dir, PING_LOG_FILENAME)
-
-    try:
-        handler = RotatingFileHandler(
-            log_path,
-            maxBytes=PING_LOG_MAX_BYTES,
-            backupCount=5,
-            encoding='utf-8'
-        )
-    except Exception as exc:  # pragma: no cover - filesystem dependent
-        logger.exception('Failed to initialize ping log handler for %s: %s', log_path, exc)
-        return
-
-    handler.setFormatter(logging.Formatter('%(asctime)s %(message)s'))
-
-    for existing in list(ping_logger.handlers):
-        ping_logger.removeHandler(existing)
-        existing.close()
-
-    ping_logger.addHandler(handler)
+RESEND_PHASES = ('lookup', 'payload', 'post', 'classify', 'log')
+RESEND_LATENCY_BUCKETS_MS = (1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 15000)
+RESEND_LATENCY_WINDOW = 200
+RESEND_TELEMETRY_WINDOWS = (60, 300, 900)
+RESEND_TELEMETRY_MAX_EVENTS = 10000
+RESEND_TELEMETRY_MAX_TARGETS = 32
+RESEND_POOL_MAXSIZE = 8
+DEFAULT_BULK_RESEND_CONCURRENCY = 4
+DEFAULT_BULK_RESEND_RATE_LIMIT = 5
+BULK_RESEND_MAX_CONCURRENCY = 16
+BULK_RESEND_MAX_ITEMS = 5000
+BULK_RESEND_STATUS_FILTERS = ('OK', 'NOK', 'any')
+RESEND_LOG_FLUSH_POLICIES = ('batch', 'fsync')
+DEFAULT_RESEND_LOG_FLUSH_POLICY = 'batch'
+RESEND_LOG_BATCH_MAX_LINES = 256
+RESEND_LOG_BATCH_WINDOW = 0.05
+RESEND_LOG_IDLE_CLOSE_SECONDS = 2.0
+RESEND_LOG_DRAIN_TIMEOUT = 10
+RESEND_LEDGER_FILENAME = 'resend_ledger.sqlite3'
+AUTO_RETRY_QUEUE_FILENAME = 'resend_retry_queue.sqlite3'
+DEFAULT_AUTO_RETRY_WORKERS = 2
+DEFAULT_AUTO_RETRY_MAX_ATTEMPTS = 8
+AUTO_RETRY_MAX_WORKERS = 8
+AUTO_RETRY_BASE_DELAY = 30
+AUTO_RETRY_MAX_DELAY = 3600
+AUTO_RETRY_SWEEP_INTERVAL = 60
+AUTO_RETRY_POLL_INTERVAL = 1.0
+AUTO_RETRY_BREAKER_THRESHOLD = 5
+AUTO_RETRY_BREAKER_COOLDOWN = 120
+AUTO_RETRY_THROUGHPUT_WINDOW = 300
+DEFAULT_QUERY_CACHE_MAX_ENTRIES = 32
+DEFAULT_QUERY_CACHE_MAX_MB = 256
+DEFAULT_MAX_CONCURRENT_SCANS = 2
+DEFAULT_MAX_CONCURRENT_EXPORTS = 1
+DEFAULT_ADMISSION_QUEUE_SIZE = 1
+DEFAULT_ADMISSION_QUEUE_TIMEOUT = 10
+# Worker threads server_runner.py starts Waitress with. Admission limits are
+# clamped so heavy endpoints never occupy more than all but these reserved ones.
+WAITRESS_THREADS = 8
+RESERVED_LIGHTWEIGHT_THREADS = 1
+# Bulk resend streams run for minutes and each pins a thread outside the
+# scan/export budget, so their slots are set aside as well.
+BULK_RESEND_MAX_STREAMS = 1
+DEFAULT_REQUEST_DEADLINE_SECONDS = 60
+PARSE_DEADLINE_CHECK_LINES = 512
+HTTP_LATENCY_BUCKETS_SECONDS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+PROFILE_DIRNAME = 'profiles'
+PROFILE_MAX_FILES = 20
+PROFILE_SUMMARY_LINES = 40
+SAMPLER_DEFAULT_SECONDS = 30
+SAMPLER_MAX_SECONDS = 600
+SAMPLER_DEFAULT_INTERVAL = 0.01
+SAMPLER_MIN_INTERVAL = 0.001
+SAMPLER_MAX_DEPTH = 128
+PARSE_DURATION_BUCKETS_SECONDS = (0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+MAX_ENTRY_TRAIL_LINES = 500
+ENTRY_INDEX_TAIL_WINDOW = 64 * 1024
+
+SCAN_LINE_PICNO_PATTERN = re.compile(r'(?:<|&lt;)PICNO(?:>|&gt;)\s*([^<&\s]+)', re.IGNORECASE)
+SCAN_LINE_TASK_PATTERN = re.compile(r"'(?:task_no|pic_no)':\s*'([^']+)'")
+SCAN_LINE_CENTER_PATTERN = re.compile(r'center response:([^,]+)')
+SCAN_LINE_STATE_PATTERN = re.compile(r"'id':\s*'([^']+)'")
+
+DELTA_CHANGE_LOG_LIMIT = 50_000
+
+PING_HISTORY_FILENAME = 'ping_history.bin'
+PING_HISTORY_RAW_CAPACITY = 262_144      # 16-byte probes (~4 MB)
+PING_HISTORY_MINUTE_CAPACITY = 524_288   # 40-byte aggregates (~20 MB)
+PING_HISTORY_HOUR_CAPACITY = 65_536      # 40-byte aggregates (~2.5 MB)
+PING_HISTORY_TIER_SECONDS = {'minute': 60, 'hour': 3600}
+PING_HISTORY_READ_CHUNK = 4096
+PING_HISTORY_DEFAULT_SPAN = 24 * 3600
+PING_HISTORY_MAX_BUCKETS = 2000
+PING_HISTORY_AUTO_BUCKETS = 500
+PING_HISTORY_MAX_SPAN = 10 * 366 * 86400   # beyond the hour tier's retention
 
 def sanitize_ftp_targets(targets, strict=False):
     """Normalize FTP targets to the expected structure."""
@@ -80,7 +159,12 @@ def sanitize_ftp_targets(targets, strict=False):
     if not isinstance(targets, list):
         targets = []
 
-    for index in range(FTP_TARGET_SLOTS):
+    if len(targets) > MAX_FTP_TARGETS:
+        if strict:
+            raise ValueError(f'At most {MAX_FTP_TARGETS} FTP targets can be configured')
+        targets = targets[:MAX_FTP_TARGETS]
+
+    for index in range(max(FTP_TARGET_SLOTS, len(targets))):
         target = targets[index] if index < len(targets) else {}
         if not isinstance(target, dict):
             target = {}
@@ -104,10 +188,37 @@ def sanitize_ftp_targets(targets, strict=False):
         if not strict and not (1 <= port <= 65535):
             port = DEFAULT_FTP_PORT
 
-        normalized.append({
+        entry = {
             'host': host,
             'port': port
-        })
+        }
+
+        probe = str(target.get('probe', 'tcp') or 'tcp').strip().lower()
+        if probe not in FTP_PROBE_MODES:
+            if strict:
+                raise ValueError(
+                    f"FTP target {index + 1} probe must be one of: {', '.join(FTP_PROBE_MODES)}")
+            probe = 'tcp'
+
+        if probe == 'ftp':
+            throughput_value = target.get('throughput_kb', 0)
+            try:
+                throughput_kb = int(throughput_value or 0)
+            except (TypeError, ValueError):
+                if strict:
+                    raise ValueError(f'FTP target {index + 1} throughput_kb must be a number')
+                throughput_kb = 0
+            if strict and not (0 <= throughput_kb <= FTP_THROUGHPUT_MAX_KB):
+                raise ValueError(
+                    f'FTP target {index + 1} throughput_kb must be between 0 and {FTP_THROUGHPUT_MAX_KB}')
+            entry.update({
+                'probe': 'ftp',
+                'username': str(target.get('username', '') or '').strip() or 'anonymous',
+                'password_env': str(target.get('password_env', '') or '').strip(),
+                'throughput_kb': min(max(throughput_kb, 0), FTP_THROUGHPUT_MAX_KB)
+            })
+
+        normalized.append(entry)
 
     return normalized
 
@@ -123,6 +234,32 @@ def sanitize_ping_interval(value, default_value):
         return default_value
 
 
+def format_utc_timestamp(epoch_seconds):
+    """ISO-8601 UTC timestamp with a ``Z`` suffix for an epoch time."""
+    return (datetime.fromtimestamp(epoch_seconds, timezone.utc)
+            .replace(tzinfo=None).isoformat() + 'Z')
+
+
+def sanitize_non_negative_float(value, default_value):
+    """Convert a setting to a finite number >= 0, falling back to default on error."""
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        return default_value
+    if not math.isfinite(number) or number < 0:
+        return default_value
+    return number
+
+
+def sanitize_positive_int(value, default_value):
+    """Convert a setting to a positive integer, falling back to default on error."""
+    try:
+        number = int(value)
+    except (TypeError, ValueError):
+        return default_value
+    return number if number > 0 else default_value
+
+
 def validate_ping_interval(value):
     """Validate and return a positive ping interval."""
     try:
@@ -246,6 +383,471 @@ def interpret_resend_response_success(response_obj, raw_text):
     return evaluate_json(parsed)
 
 
+class ResendSessionPool:
+    """Keep warm keep-alive HTTP sessions for each resend target origin.
+
+    Sessions are rebuilt whenever the configured resend server or endpoint
+    changes. Connection counters come from the underlying urllib3 pools so
+    reuse can be verified (requests - connections opened = reused requests).
+    """
+
+    def __init__(self, pool_maxsize=RESEND_POOL_MAXSIZE):
+        self.lock = threading.Lock()
+        self.pool_maxsize = pool_maxsize
+        self.sessions = {}
+        self.config_key = None
+        self.stats = {
+            'requests': 0,
+            'errors': 0,
+            'rebuilds': 0,
+            'retired_connections': 0,
+            'retired_pool_requests': 0
+        }
+
+    def configure(self, server, endpoint):
+        """Rebuild sessions if the resend target settings changed."""
+        config_key = (server or '', endpoint or '')
+        with self.lock:
+            if config_key == self.config_key:
+                return
+            if self.config_key is not None:
+                self.stats['rebuilds'] += 1
+            self.config_key = config_key
+            self._close_sessions_locked()
+
+    def close(self):
+        with self.lock:
+            self._close_sessions_locked()
+
+    def _close_sessions_locked(self):
+        for session in self.sessions.values():
+            connections, pool_requests = self._pool_counters(session)
+            self.stats['retired_connections'] += connections
+            self.stats['retired_pool_requests'] += pool_requests
+            session.close()
+        self.sessions.clear()
+
+    @staticmethod
+    def _origin(url):
+        parsed = urlsplit(url)
+        return f"{parsed.scheme}://{parsed.netloc}".lower()
+
+    def _get_session(self, url):
+        origin = self._origin(url)
+        with self.lock:
+            session = self.sessions.get(origin)
+            if session is None:
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=1,
+                                      pool_maxsize=self.pool_maxsize,
+                                      max_retries=0)
+                session.mount('http://', adapter)
+                session.mount('https://', adapter)
+                self.sessions[origin] = session
+            return session
+
+    def post(self, url, **kwargs):
+        """POST through the pooled session for the URL's origin."""
+        session = self._get_session(url)
+        with self.lock:
+            self.stats['requests'] += 1
+        try:
+            return session.post(url, **kwargs)
+        except requests.RequestException:
+            with self.lock:
+                self.stats['errors'] += 1
+            raise
+
+    @staticmethod
+    def _pool_counters(session):
+        connections = 0
+        pool_requests = 0
+        for adapter in set(session.adapters.values()):
+            poolmanager = getattr(adapter, 'poolmanager', None)
+            if poolmanager is None:
+                continue
+            for key in list(poolmanager.pools.keys()):
+                pool = poolmanager.pools.get(key)
+                if pool is None:
+                    continue
+                connections += getattr(pool, 'num_connections', 0)
+                pool_requests += getattr(pool, 'num_requests', 0)
+        return connections, pool_requests
+
+    def get_stats(self):
+        """Return request and connection-reuse counters per origin."""
+        with self.lock:
+            stats = dict(self.stats)
+            origins = {}
+            total_connections = stats['retired_connections']
+            total_pool_requests = stats['retired_pool_requests']
+            for origin, session in self.sessions.items():
+                connections, pool_requests = self._pool_counters(session)
+                total_connections += connections
+                total_pool_requests += pool_requests
+                origins[origin] = {
+                    'connections_opened': connections,
+                    'requests': pool_requests,
+                    'reused_requests': max(0, pool_requests - connections)
+                }
+
+        stats.update({
+            'origins': origins,
+            'connections_opened': total_connections,
+            'reused_requests': max(0, total_pool_requests - total_connections),
+            'pool_maxsize': self.pool_maxsize
+        })
+        return stats
+
+
+class ResendOutcomeWriter:
+    """Write-behind appender for ``[Dashboard-resend-handler]`` outcome lines.
+
+    Request threads enqueue lines and return immediately; a single writer
+    thread batches them into the transmission log through one open handle.
+    The lines are an audit trail only (overrides come from the resend ledger),
+    so parses never wait on them. The handle is closed after a short idle
+    period so the upstream writer can rotate.
+    """
+
+    _STOP = object()
+
+    def __init__(self, flush_policy=DEFAULT_RESEND_LOG_FLUSH_POLICY):
+        self.lock = threading.Lock()
+        # Serializes handle use between a draining writer and its successor.
+        self.write_lock = threading.Lock()
+        self.queue = queue.Queue()
+        self.thread = None
+        self.flush_policy = flush_policy
+        self.handle = None
+        self.handle_path = None
+        self.handle_identity = None
+        self.stats = {
+            'lines_written': 0,
+            'batches': 0,
+            'largest_batch': 0,
+            'fsyncs': 0,
+            'opens': 0,
+            'errors': 0
+        }
+
+    def configure(self, flush_policy):
+        with self.lock:
+            self.flush_policy = flush_policy
+
+    def submit(self, log_path, line):
+        """Queue one log line for the writer thread."""
+        with self.lock:
+            if self.thread is None or not self.thread.is_alive():
+                self.thread = threading.Thread(target=self._run, args=(self.queue,),
+                                               name='resend-log-writer',
+                                               daemon=True)
+                self.thread.start()
+            self.queue.put((log_path, line))
+
+    def drain(self, timeout=RESEND_LOG_DRAIN_TIMEOUT):
+        """Flush queued lines, close the handle and stop the writer thread.
+
+        The stopping writer is detached under the lock together with its
+        queue, so a ``submit`` racing with the drain starts a fresh writer
+        instead of queueing behind the stop marker. Draining is therefore safe
+        on every server stop, not just at process exit.
+        """
+        with self.lock:
+            thread = self.thread
+            if thread is None or not thread.is_alive():
+                return True
+            self.queue.put(self._STOP)
+            self.queue = queue.Queue()
+            self.thread = None
+        thread.join(timeout)
+        return not thread.is_alive()
+
+    def _run(self, work_queue):
+        stop_requested = False
+        while not stop_requested:
+            try:
+                item = work_queue.get(timeout=RESEND_LOG_IDLE_CLOSE_SECONDS)
+            except queue.Empty:
+                with self.write_lock:
+                    self._close_handle()
+                continue
+
+            batch = []
+            deadline = time.monotonic() + RESEND_LOG_BATCH_WINDOW
+            while True:
+                if item is self._STOP:
+                    stop_requested = True
+                    break
+                batch.append(item)
+                if len(batch) >= RESEND_LOG_BATCH_MAX_LINES:
+                    break
+                remaining = deadline - time.monotonic()
+                try:
+                    item = (work_queue.get(timeout=remaining) if remaining > 0
+                            else work_queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            if batch:
+                with self.write_lock:
+                    self._write_batch(batch)
+
+        with self.write_lock:
+            self._close_handle()
+
+    def _write_batch(self, batch):
+        grouped = OrderedDict()
+        for log_path, line in batch:
+            grouped.setdefault(log_path, []).append(line)
+
+        for log_path, items in grouped.items():
+            try:
+                handle = self._get_handle(log_path)
+                handle.write(''.join(items))
+                handle.flush()
+                if self.flush_policy == 'fsync':
+                    os.fsync(handle.fileno())
+                    self.stats['fsyncs'] += 1
+            except OSError:
+                logger.exception("Failed to append %d resend outcome(s) to %s",
+                                 len(items), log_path)
+                self.stats['errors'] += 1
+                self._close_handle()
+            else:
+                self.stats['lines_written'] += len(items)
+
+        self.stats['batches'] += 1
+        self.stats['largest_batch'] = max(self.stats['largest_batch'], len(batch))
+
+    @staticmethod
+    def _file_identity(stat_result):
+        return (stat_result.st_dev, stat_result.st_ino)
+
+    def _get_handle(self, log_path):
+        if self.handle is not None:
+            try:
+                current_identity = self._file_identity(os.stat(log_path))
+            except OSError:
+                current_identity = None
+            # Reopen after the upstream writer rotates the file or when the
+            # logs directory changes.
+            if log_path != self.handle_path or current_identity != self.handle_identity:
+                self._close_handle()
+
+        if self.handle is None:
+            try:
+                os.makedirs(os.path.dirname(log_path), exist_ok=True)
+            except OSError:
+                pass
+            self.handle = open(log_path, 'a', encoding='utf-8')
+            self.handle_path = log_path
+            self.handle_identity = self._file_identity(os.fstat(self.handle.fileno()))
+            self.stats['opens'] += 1
+        return self.handle
+
+    def _close_handle(self):
+        if self.handle is None:
+            return
+        try:
+            self.handle.close()
+        except OSError:
+            pass
+        self.handle = None
+        self.handle_path = None
+        self.handle_identity = None
+
+    def get_stats(self):
+        with self.lock:
+            stats = dict(self.stats)
+            stats.update({
+                'queued': self.queue.qsize(),
+                'flush_policy': self.flush_policy,
+                'writer_running': bool(self.thread and self.thread.is_alive())
+            })
+        return stats
+
+
+def iter_logged_resend_results(logs_dir):
+    """Yield ``resend_result`` payloads from the transmission logs, oldest first."""
+    pattern = os.path.join(logs_dir, "Transmission.log*")
+    for candidate in sorted(glob.glob(pattern), key=os.path.getmtime):
+        try:
+            with open(candidate, 'r', encoding='utf-8') as handle:
+                for line in handle:
+                    if ('Dashboard-resend-handler' not in line or
+                            'resend_result' not in line):
+                        continue
+                    try:
+                        _, json_blob = line.split('resend_result', 1)
+                        payload = json.loads(json_blob.strip())
+                    except ValueError:
+                        continue
+                    if isinstance(payload, dict) and payload.get('id_scan'):
+                        yield payload
+        except (IOError, UnicodeDecodeError):
+            logger.warning("Skipping unreadable log %s while importing resend results",
+                           candidate)
+
+
+class ResendLedger:
+    """Append-only SQLite ledger of resend outcomes.
+
+    The ledger is the source of truth for resend overrides. It is loaded once
+    into an ``id_scan -> latest outcome`` map and updated in place on every
+    resend; ``version`` changes whenever the map does so callers can fold it
+    into cache keys. A new ledger is seeded from existing ``resend_result``
+    lines in the transmission logs, and the map is rebuilt from those lines
+    alone when the database cannot be opened.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.connection = None
+        self.path = None
+        self.latest = {}
+        self.fallback = False
+        self.version = 0
+        self.stats = {
+            'loaded': 0,
+            'imported': 0,
+            'recorded': 0,
+            'errors': 0
+        }
+
+    def configure(self, logs_dir):
+        """Open (or create) the ledger stored in ``logs_dir``."""
+        ledger_path = os.path.join(logs_dir, RESEND_LEDGER_FILENAME)
+        with self.lock:
+            if ledger_path == self.path and self.connection is not None:
+                return
+            self._close_locked()
+            self.path = ledger_path
+            try:
+                os.makedirs(logs_dir, exist_ok=True)
+                self.connection = sqlite3.connect(ledger_path, check_same_thread=False)
+                self._initialize_locked(logs_dir)
+            except (OSError, sqlite3.Error):
+                logger.exception("Failed to open resend ledger at %s; falling back to "
+                                 "resend_result lines in the logs", ledger_path)
+                self.stats['errors'] += 1
+                self._close_locked()
+                self._load_from_logs_locked(logs_dir)
+            self.version += 1
+
+    def _load_from_logs_locked(self, logs_dir):
+        """Rebuild the latest-outcome map from the audit lines in the logs.
+
+        Used when SQLite is unavailable; outcomes recorded meanwhile still
+        reach the logs through the resend log writer, so they survive a
+        restart in this mode too.
+        """
+        latest = {}
+        for payload in iter_logged_resend_results(logs_dir):
+            latest[payload['id_scan']] = payload
+        self.latest = latest
+        self.fallback = True
+        self.stats['loaded'] = len(latest)
+
+    def _initialize_locked(self, logs_dir):
+        connection = self.connection
+        connection.execute('PRAGMA journal_mode=WAL')
+        connection.execute('PRAGMA synchronous=NORMAL')
+        connection.execute(
+            'CREATE TABLE IF NOT EXISTS resend_outcomes ('
+            ' seq INTEGER PRIMARY KEY AUTOINCREMENT,'
+            ' id_scan TEXT NOT NULL,'
+            ' payload TEXT NOT NULL)'
+        )
+        connection.execute(
+            'CREATE TABLE IF NOT EXISTS ledger_meta (key TEXT PRIMARY KEY, value TEXT)'
+        )
+        connection.commit()
+
+        imported = connection.execute(
+            "SELECT value FROM ledger_meta WHERE key = 'imported_from_logs'"
+        ).fetchone()
+        if not imported:
+            rows = [
+                (payload['id_scan'], json.dumps(payload, ensure_ascii=False))
+                for payload in iter_logged_resend_results(logs_dir)
+            ]
+            with connection:
+                connection.executemany(
+                    'INSERT INTO resend_outcomes (id_scan, payload) VALUES (?, ?)', rows)
+                connection.execute(
+                    "INSERT OR REPLACE INTO ledger_meta (key, value) "
+                    "VALUES ('imported_from_logs', ?)",
+                    (datetime.now(timezone.utc).strftime('%Y-%m-%d %H:%M:%S'),)
+                )
+            self.stats['imported'] += len(rows)
+
+        latest = {}
+        for id_scan, payload_text in connection.execute(
+                'SELECT id_scan, payload FROM resend_outcomes ORDER BY seq'):
+            try:
+                latest[id_scan] = json.loads(payload_text)
+            except ValueError:
+                continue
+        self.latest = latest
+        self.stats['loaded'] = len(latest)
+
+    def _close_locked(self):
+        if self.connection is not None:
+            try:
+                self.connection.close()
+            except sqlite3.Error:
+                pass
+        self.connection = None
+        self.latest = {}
+        self.fallback = False
+
+    def close(self):
+        with self.lock:
+            self._close_locked()
+
+    def record(self, payload):
+        """Persist one outcome and make it the latest for its ``id_scan``."""
+        id_scan = payload.get('id_scan')
+        if not id_scan:
+            return
+        with self.lock:
+            self.latest[id_scan] = payload
+            self.version += 1
+            self.stats['recorded'] += 1
+            if self.connection is None:
+                return
+            try:
+                with self.connection:
+                    self.connection.execute(
+                        'INSERT INTO resend_outcomes (id_scan, payload) VALUES (?, ?)',
+                        (id_scan, json.dumps(payload, ensure_ascii=False))
+                    )
+            except sqlite3.Error:
+                logger.exception("Failed to record resend outcome for %s", id_scan)
+                self.stats['errors'] += 1
+
+    def get_overrides(self):
+        with self.lock:
+            return dict(self.latest)
+
+    def get_version(self):
+        with self.lock:
+            return self.version
+
+    def get_stats(self):
+        with self.lock:
+            stats = dict(self.stats)
+            stats.update({
+                'path': self.path,
+                'open': self.connection is not None,
+                'source': 'logs' if self.fallback else 'sqlite',
+                'scans': len(self.latest),
+                'version': self.version
+            })
+        return stats
+
+
 def build_initial_ftp_status_cache(targets):
     """Create an initial FTP status cache from configured targets."""
     statuses = []
@@ -279,7 +881,21 @@ def load_settings():
         ],
         'ftp_ping_interval': DEFAULT_FTP_PING_INTERVAL,
         'resend_server': '',
-        'resend_endpoint': ''
+        'resend_endpoint': '',
+        'query_cache_max_entries': DEFAULT_QUERY_CACHE_MAX_ENTRIES,
+        'query_cache_max_mb': DEFAULT_QUERY_CACHE_MAX_MB,
+        'max_concurrent_scans': DEFAULT_MAX_CONCURRENT_SCANS,
+        'max_concurrent_exports': DEFAULT_MAX_CONCURRENT_EXPORTS,
+        'admission_queue_size': DEFAULT_ADMISSION_QUEUE_SIZE,
+        'admission_queue_timeout': DEFAULT_ADMISSION_QUEUE_TIMEOUT,
+        'request_deadline_seconds': DEFAULT_REQUEST_DEADLINE_SECONDS,
+        'bulk_resend_concurrency': DEFAULT_BULK_RESEND_CONCURRENCY,
+        'bulk_resend_rate_limit': DEFAULT_BULK_RESEND_RATE_LIMIT,
+        'resend_log_flush_policy': DEFAULT_RESEND_LOG_FLUSH_POLICY,
+        'auto_retry_enabled': False,
+        'server_timing_enabled': True,
+        'auto_retry_workers': DEFAULT_AUTO_RETRY_WORKERS,
+        'auto_retry_max_attempts': DEFAULT_AUTO_RETRY_MAX_ATTEMPTS
     }
 
     if os.path.exists(SETTINGS_FILE):
@@ -304,6 +920,31 @@ def load_settings():
                 settings['resend_endpoint'] = str(
                     settings.get('resend_endpoint', '') or ''
                 ).strip()
+                for key in ('query_cache_max_entries', 'query_cache_max_mb',
+                            'max_concurrent_scans', 'max_concurrent_exports',
+                            'admission_queue_timeout', 'request_deadline_seconds',
+                            'bulk_resend_concurrency', 'auto_retry_workers',
+                            'auto_retry_max_attempts'):
+                    settings[key] = sanitize_positive_int(
+                        settings.get(key), default_settings[key]
+                    )
+                settings['auto_retry_enabled'] = settings.get('auto_retry_enabled') is True
+                settings['server_timing_enabled'] = settings.get('server_timing_enabled') is not False
+                settings['auto_retry_workers'] = min(settings['auto_retry_workers'],
+                                                     AUTO_RETRY_MAX_WORKERS)
+                settings['bulk_resend_concurrency'] = min(settings['bulk_resend_concurrency'],
+                                                          BULK_RESEND_MAX_CONCURRENCY)
+                settings['bulk_resend_rate_limit'] = sanitize_non_negative_float(
+                    settings.get('bulk_resend_rate_limit'),
+                    default_settings['bulk_resend_rate_limit']
+                )
+                if settings.get('resend_log_flush_policy') not in RESEND_LOG_FLUSH_POLICIES:
+                    settings['resend_log_flush_policy'] = DEFAULT_RESEND_LOG_FLUSH_POLICY
+                try:
+                    settings['admission_queue_size'] = max(
+                        0, int(settings.get('admission_queue_size')))
+                except (TypeError, ValueError):
+                    settings['admission_queue_size'] = default_settings['admission_queue_size']
                 return settings
         except (json.JSONDecodeError, IOError):
             pass
@@ -343,10 +984,653 @@ with ftp_status_lock:
     ftp_status_cache = build_initial_ftp_status_cache(
         app_settings['ftp_targets'])
 
-configure_ping_logger(app_settings['logs_directory'])
+resend_sessions = ResendSessionPool()
+resend_sessions.configure(app_settings['resend_server'],
+                          app_settings['resend_endpoint'])
+
+resend_log_writer = ResendOutcomeWriter(app_settings['resend_log_flush_policy'])
+atexit.register(resend_log_writer.drain)
+
+resend_ledger = ResendLedger()
+resend_ledger.configure(app_settings['logs_directory'])
+atexit.register(resend_ledger.close)
+
+async def _probe_tcp_target(host, port, timeout):
+    """Time a non-blocking TCP connect; returns ``(status, error, connect_ms)``."""
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout
+    sock = None
+    try:
+        addresses = await asyncio.wait_for(
+            loop.getaddrinfo(host, port, type=socket.SOCK_STREAM), timeout)
+        family, sock_type, proto, _, address = addresses[0]
+        sock = socket.socket(family, sock_type, proto)
+        sock.setblocking(False)
+        started = time.perf_counter()
+        await asyncio.wait_for(loop.sock_connect(sock, address),
+                               max(0.0, deadline - loop.time()))
+        return 'online', None, (time.perf_counter() - started) * 1000.0
+    except asyncio.TimeoutError:
+        return 'offline', 'timed out', None
+    except OSError as exc:
+        return 'offline', str(exc), None
+    finally:
+        if sock is not None:
+            sock.close()
+
+
+def probe_tcp_targets(targets, timeout=FTP_CONNECT_TIMEOUT):
+    """Probe ``[(host, port), ...]`` concurrently.
+
+    One call costs roughly the slowest probe (bounded by ``timeout``) rather
+    than the sum of all probes. Results are returned in input order.
+    """
+    if not targets:
+        return []
+
+    async def probe_all():
+        return await asyncio.gather(*(
+            _probe_tcp_target(host, port, timeout) for host, port in targets
+        ))
+
+    return asyncio.run(probe_all())
+
+
+def probe_ftp_protocol(host, port, username='anonymous', password='', throughput_kb=0,
+                       timeout=FTP_PROTOCOL_TIMEOUT):
+    """Log in over FTP and time each round-trip.
+
+    Returns banner, login and NOOP timings in milliseconds. When
+    ``throughput_kb`` is set, a throwaway file of that size is uploaded in
+    binary mode and deleted straight after, and the upload rate is reported
+    in KB/s. ``status`` is ``'ok'`` or ``'failed'``; on failure ``phase``
+    names the step that broke.
+    """
+    result = {
+        'status': 'failed',
+        'phase': None,
+        'error': None,
+        'banner_ms': None,
+        'login_ms': None,
+        'noop_ms': None,
+        'upload_kb': throughput_kb or None,
+        'upload_ms': None,
+        'upload_kbps': None,
+        'delete_ms': None
+    }
+    ftp = ftplib.FTP(timeout=timeout)
+    phase = 'banner'
+    try:
+        started = time.perf_counter()
+        ftp.connect(host, port, timeout=timeout)
+        result['banner_ms'] = round((time.perf_counter() - started) * 1000.0, 2)
+
+        phase = 'login'
+        started = time.perf_counter()
+        ftp.login(username, password)
+        result['login_ms'] = round((time.perf_counter() - started) * 1000.0, 2)
+
+        phase = 'noop'
+        started = time.perf_counter()
+        ftp.voidcmd('NOOP')
+        result['noop_ms'] = round((time.perf_counter() - started) * 1000.0, 2)
+
+        if throughput_kb:
+            phase = 'upload'
+            remote_name = f'{FTP_THROUGHPUT_FILE_PREFIX}-{uuid.uuid4().hex[:12]}.bin'
+            payload = io.BytesIO(os.urandom(throughput_kb * 1024))
+            deleted = False
+            try:
+                started = time.perf_counter()
+                ftp.storbinary(f'STOR {remote_name}', payload)
+                elapsed = time.perf_counter() - started
+                result['upload_ms'] = round(elapsed * 1000.0, 2)
+                result['upload_kbps'] = round(throughput_kb / max(elapsed, 1e-6), 1)
+
+                phase = 'delete'
+                started = time.perf_counter()
+                ftp.delete(remote_name)
+                deleted = True
+                result['delete_ms'] = round((time.perf_counter() - started) * 1000.0, 2)
+            finally:
+                if not deleted:
+                    # A failed STOR can still leave a partial file behind.
+                    try:
+                        ftp.delete(remote_name)
+                    except ftplib.all_errors:
+                        pass
+
+        result['status'] = 'ok'
+    except ftplib.all_errors as exc:
+        result['phase'] = phase
+        result['error'] = str(exc).strip() or exc.__class__.__name__
+    finally:
+        if ftp.sock is not None:
+            try:
+                ftp.quit()
+            except ftplib.all_errors:
+                pass
+        ftp.close()
+
+    return result
+
+
+class LatencyHistogram:
+    """Connect-latency statistics for one probe target.
+
+    Lifetime samples go into fixed millisecond buckets (the last bucket is
+    open-ended); the most recent ``window`` samples are kept for exact
+    percentiles and jitter (mean absolute change between consecutive samples).
+    """
+
+    def __init__(self, bucket_bounds=FTP_LATENCY_BUCKETS_MS, window=FTP_LATENCY_WINDOW):
+        self.bucket_bounds = bucket_bounds
+        self.bucket_counts = [0] * (len(bucket_bounds) + 1)
+        self.samples = deque(maxlen=window)
+        self.count = 0
+        self.failures = 0
+        self.total_ms = 0.0
+        self.last_ms = None
+
+    def record(self, latency_ms):
+        self.bucket_counts[bisect.bisect_left(self.bucket_bounds, latency_ms)] += 1
+        self.samples.append(latency_ms)
+        self.count += 1
+        self.total_ms += latency_ms
+        self.last_ms = latency_ms
+
+    def record_failure(self):
+        self.failures += 1
+
+    @staticmethod
+    def _percentile(ordered, fraction):
+        """Nearest-rank percentile of an already sorted, non-empty list."""
+        rank = max(0, math.ceil(fraction * len(ordered)) - 1)
+        return ordered[min(rank, len(ordered) - 1)]
+
+    def snapshot(self):
+        samples = list(self.samples)
+        window = {'samples': len(samples)}
+        if samples:
+            ordered = sorted(samples)
+            jitter = None
+            if len(samples) > 1:
+                jitter = sum(abs(current - previous)
+                             for previous, current in zip(samples, samples[1:])) / (len(samples) - 1)
+            window.update({
+                'p50_ms': round(self._percentile(ordered, 0.50), 2),
+                'p95_ms': round(self._percentile(ordered, 0.95), 2),
+                'p99_ms': round(self._percentile(ordered, 0.99), 2),
+                'min_ms': round(ordered[0], 2),
+                'max_ms': round(ordered[-1], 2),
+                'mean_ms': round(sum(samples) / len(samples), 2),
+                'jitter_ms': round(jitter, 2) if jitter is not None else None
+            })
+
+        buckets = [{'le_ms': bound, 'count': count}
+                   for bound, count in zip(self.bucket_bounds, self.bucket_counts)]
+        buckets.append({'le_ms': None, 'count': self.bucket_counts[-1]})
+        return {
+            'count': self.count,
+            'failures': self.failures,
+            'last_ms': round(self.last_ms, 2) if self.last_ms is not None else None,
+            'mean_ms': round(self.total_ms / self.count, 2) if self.count else None,
+            'window': window,
+            'buckets': buckets
+        }
+
+
+PING_STATUS_CODES = {'unknown': 0, 'online': 1, 'offline': 2}
+
+
+class PingHistoryStore:
+    """Fixed-size binary ring buffers for FTP probe history.
+
+    One preallocated file holds three rings: raw probes, per-minute
+    aggregates and per-hour aggregates. Raw records are
+    ``(timestamp, target_id, status, connect_ms)``; aggregates are
+    ``(bucket_start, target_id, probes, online, rtt_count, rtt_sum, rtt_min,
+    rtt_max)``. Completed minutes are folded into hours, so older history
+    survives at coarser resolution after the raw ring wraps. Results are
+    submitted from the monitor thread and written by a background writer.
+    Target ids map to ``host:port`` keys in a small JSON sidecar.
+    """
+
+    MAGIC = b'PHRB'
+    VERSION = 1
+    HEADER_FORMAT = '<4sH'
+    TIER_HEADER_FORMAT = '<HIII'
+    HEADER_SIZE = 64
+    RAW_FORMAT = struct.Struct('<dHBxf')
+    AGGREGATE_FORMAT = struct.Struct('<dHxxIIIdff')
+    TIERS = (
+        ('raw', RAW_FORMAT, PING_HISTORY_RAW_CAPACITY, None),
+        ('minute', AGGREGATE_FORMAT, PING_HISTORY_MINUTE_CAPACITY, 60),
+        ('hour', AGGREGATE_FORMAT, PING_HISTORY_HOUR_CAPACITY, 3600),
+    )
+    _STOP = object()
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.queue = queue.Queue()
+        self.thread = None
+        self.path = None
+        self.targets_path = None
+        self.handle = None
+        self.target_ids = {}
+        self.tiers = {}
+        self.open_buckets = {'minute': {}, 'hour': {}}
+        # Start of the buckets in open_buckets, and the newest timestamp
+        # appended to each ring; records never go in below these.
+        self.open_starts = {'minute': None, 'hour': None}
+        self.last_timestamps = {}
+        self.stats = {'records_written': 0, 'aggregates_written': 0,
+                      'clamped': 0, 'errors': 0}
+
+    def configure(self, logs_dir):
+        """Open (or create) the history file in ``logs_dir``."""
+        self.close()
+        history_path = os.path.join(os.path.abspath(logs_dir), PING_HISTORY_FILENAME)
+        with self.lock:
+            self.path = history_path
+            self.targets_path = history_path + '.targets.json'
+            try:
+                os.makedirs(os.path.dirname(history_path), exist_ok=True)
+                self._open_locked()
+            except (OSError, struct.error, ValueError):
+                logger.exception("Failed to open ping history store at %s", history_path)
+                self.stats['errors'] += 1
+                self.handle = None
+                return
+            self.thread = threading.Thread(target=self._run, name='ping-history-writer',
+                                           daemon=True)
+            self.thread.start()
+
+    def _layout(self):
+        offset = self.HEADER_SIZE
+        layout = {}
+        for name, record_format, capacity, _ in self.TIERS:
+            # ``written`` counts appends since the file was opened; readers
+            # compare it against their snapshot to spot overwritten slots.
+            layout[name] = {'offset': offset, 'format': record_format,
+                            'capacity': capacity, 'head': 0, 'count': 0, 'written': 0}
+            offset += record_format.size * capacity
+        return layout, offset
+
+    def _open_locked(self):
+        layout, total_size = self._layout()
+        handle = None
+        if os.path.exists(self.path):
+            handle = open(self.path, 'r+b')
+            header = handle.read(self.HEADER_SIZE)
+            magic, version = struct.unpack_from(self.HEADER_FORMAT, header, 0)
+            valid = magic == self.MAGIC and version == self.VERSION
+            position = struct.calcsize(self.HEADER_FORMAT)
+            for name, record_format, capacity, _ in self.TIERS:
+                record_size, stored_capacity, head, count = struct.unpack_from(
+                    self.TIER_HEADER_FORMAT, header, position)
+                position += struct.calcsize(self.TIER_HEADER_FORMAT)
+                if (record_size != record_format.size or stored_capacity != capacity or
+                        head >= capacity or count > capacity):
+                    valid = False
+                layout[name]['head'] = head
+                layout[name]['count'] = count
+            if not valid:
+                logger.warning("Ping history file %s has an unexpected layout; recreating it",
+                               self.path)
+                handle.close()
+                handle = None
+                layout, total_size = self._layout()
+
+        if handle is None:
+            handle = open(self.path, 'w+b')
+            handle.truncate(total_size)
+
+        self.handle = handle
+        self.tiers = layout
+        self._write_header_locked()
+        self.last_timestamps = {}
+        for name, tier in layout.items():
+            tier['written'] = tier['count']
+            if tier['count']:
+                self.last_timestamps[name] = self._read_records(
+                    handle, tier, tier['count'] - 1, tier['count'])[0][0]
+
+        self.target_ids = {}
+        try:
+            with open(self.targets_path, 'r', encoding='utf-8') as targets_handle:
+                self.target_ids = {str(key): int(value)
+                                   for key, value in json.load(targets_handle).items()}
+        except (IOError, ValueError, AttributeError):
+            self.target_ids = {}
+
+    def _write_header_locked(self):
+        header = bytearray(self.HEADER_SIZE)
+        struct.pack_into(self.HEADER_FORMAT, header, 0, self.MAGIC, self.VERSION)
+        position = struct.calcsize(self.HEADER_FORMAT)
+        for name, record_format, capacity, _ in self.TIERS:
+            tier = self.tiers[name]
+            struct.pack_into(self.TIER_HEADER_FORMAT, header, position,
+                             record_format.size, capacity, tier['head'], tier['count'])
+            position += struct.calcsize(self.TIER_HEADER_FORMAT)
+        self.handle.seek(0)
+        self.handle.write(header)
+
+    def submit(self, poll_time, statuses):
+        """Queue one poll's results for the writer thread."""
+        if self.thread is None or not self.thread.is_alive():
+            return
+        samples = [
+            (f"{status['host']}:{status['port']}",
+             PING_STATUS_CODES.get(status.get('status'), 0),
+             status.get('connect_ms'))
+            for status in statuses if status.get('host')
+        ]
+        if samples:
+            self.queue.put((poll_time, samples))
+
+    def close(self):
+        """Flush open aggregates, stop the writer and close the file."""
+        thread = self.thread
+        if thread is not None and thread.is_alive():
+            self.queue.put(self._STOP)
+            thread.join(timeout=5)
+        with self.lock:
+            if self.handle is not None:
+                # Minutes first: flushing them folds into the open hours.
+                self._flush_open_locked('minute')
+                self._flush_open_locked('hour')
+                try:
+                    self._write_header_locked()
+                    self.handle.close()
+                except OSError:
+                    pass
+            self.handle = None
+            self.thread = None
+
+    def _run(self):
+        while True:
+            item = self.queue.get()
+            if item is self._STOP:
+                break
+            batch = [item]
+            stop_requested = False
+            while True:
+                try:
+                    item = self.queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is self._STOP:
+                    stop_requested = True
+                    break
+                batch.append(item)
+            try:
+                self._write_batch(batch)
+            except Exception as exc:  # pragma: no cover - defensive logging
+                logger.exception('Failed to persist ping history: %s', exc)
+                with self.lock:
+                    self.stats['errors'] += 1
+            if stop_requested:
+                break
+
+    def _target_id_locked(self, target_key):
+        target_id = self.target_ids.get(target_key)
+        if target_id is None:
+            target_id = len(self.target_ids) + 1
+            self.target_ids[target_key] = target_id
+            try:
+                with open(self.targets_path, 'w', encoding='utf-8') as targets_handle:
+                    json.dump(self.target_ids, targets_handle, indent=2)
+            except IOError:
+                logger.exception("Failed to save ping history target map %s",
+                                 self.targets_path)
+        return target_id
+
+    def _append_locked(self, tier_name, packed, timestamp):
+        tier = self.tiers[tier_name]
+        record_size = tier['format'].size
+        self.handle.seek(tier['offset'] + tier['head'] * record_size)
+        self.handle.write(packed)
+        tier['head'] = (tier['head'] + 1) % tier['capacity']
+        tier['count'] = min(tier['count'] + 1, tier['capacity'])
+        tier['written'] += 1
+        self.last_timestamps[tier_name] = timestamp
+
+    def _ordered_timestamp_locked(self, tier_name, timestamp):
+        """Clamp ``timestamp`` so the tier's ring stays sorted for ``read_range``."""
+        floor = self.last_timestamps.get(tier_name)
+        if floor is not None and timestamp < floor:
+            self.stats['clamped'] += 1
+            return floor
+        return timestamp
+
+    def _emit_aggregate_locked(self, tier_name, target_id, bucket):
+        self._append_locked(tier_name, self.AGGREGATE_FORMAT.pack(
+            bucket['start'], target_id, bucket['probes'], bucket['online'],
+            bucket['rtt_count'], bucket['rtt_sum'],
+            bucket['rtt_min'] if bucket['rtt_count'] else 0.0,
+            bucket['rtt_max'] if bucket['rtt_count'] else 0.0), bucket['start'])
+        self.stats['aggregates_written'] += 1
+        if tier_name == 'minute':
+            self._fold_locked('hour', target_id, bucket)
+
+    def _flush_open_locked(self, tier_name):
+        """Emit every target's open bucket for a tier, in target order."""
+        open_buckets = self.open_buckets[tier_name]
+        for target_id in sorted(open_buckets):
+            self._emit_aggregate_locked(tier_name, target_id, open_buckets[target_id])
+        open_buckets.clear()
+        self.open_starts[tier_name] = None
+
+    def _fold_locked(self, tier_name, target_id, sample):
+        """Add a sample (or a finer aggregate) to the open bucket for a tier.
+
+        All targets share one open bucket start per tier. When a sample
+        crosses into a later bucket, every target's open bucket is emitted
+        first, so aggregates reach the ring in time order whatever each
+        target's probe cadence is.
+        """
+        width = PING_HISTORY_TIER_SECONDS[tier_name]
+        bucket_start = sample['start'] - sample['start'] % width
+        open_start = self.open_starts[tier_name]
+        if open_start is not None and bucket_start > open_start:
+            self._flush_open_locked(tier_name)
+        elif open_start is not None:
+            bucket_start = open_start
+        bucket_start = self._ordered_timestamp_locked(tier_name, bucket_start)
+        self.open_starts[tier_name] = bucket_start
+        open_buckets = self.open_buckets[tier_name]
+        bucket = open_buckets.get(target_id)
+        if bucket is None:
+            bucket = open_buckets[target_id] = {
+                'start': bucket_start, 'probes': 0, 'online': 0, 'rtt_count': 0,
+                'rtt_sum': 0.0, 'rtt_min': math.inf, 'rtt_max': 0.0
+            }
+        bucket['probes'] += sample['probes']
+        bucket['online'] += sample['online']
+        bucket['rtt_count'] += sample['rtt_count']
+        bucket['rtt_sum'] += sample['rtt_sum']
+        if sample['rtt_count']:
+            bucket['rtt_min'] = min(bucket['rtt_min'], sample['rtt_min'])
+            bucket['rtt_max'] = max(bucket['rtt_max'], sample['rtt_max'])
+
+    def _write_batch(self, batch):
+        with self.lock:
+            if self.handle is None:
+                return
+            for poll_time, samples in batch:
+                poll_time = self._ordered_timestamp_locked('raw', poll_time)
+                for target_key, status_code, connect_ms in samples:
+                    target_id = self._target_id_locked(target_key)
+                    self._append_locked('raw', self.RAW_FORMAT.pack(
+                        poll_time, target_id, status_code,
+                        connect_ms if connect_ms is not None else math.nan), poll_time)
+                    self.stats['records_written'] += 1
+                    has_rtt = connect_ms is not None
+                    self._fold_locked('minute', target_id, {
+                        'start': poll_time,
+                        'probes': 1,
+                        'online': 1 if status_code == PING_STATUS_CODES['online'] else 0,
+                        'rtt_count': 1 if has_rtt else 0,
+                        'rtt_sum': connect_ms if has_rtt else 0.0,
+                        'rtt_min': connect_ms if has_rtt else 0.0,
+                        'rtt_max': connect_ms if has_rtt else 0.0
+                    })
+            self._write_header_locked()
+            self.handle.flush()
+
+    def _read_records(self, handle, tier, start_index, stop_index):
+        """Read logical records ``[start_index, stop_index)`` of a tier snapshot."""
+        record_format = tier['format']
+        first_physical = (tier['head'] - tier['count']) % tier['capacity']
+        records = []
+        index = start_index
+        while index < stop_index:
+            physical = (first_physical + index) % tier['capacity']
+            run = min(stop_index - index, tier['capacity'] - physical)
+            handle.seek(tier['offset'] + physical * record_format.size)
+            chunk = handle.read(run * record_format.size)
+            records.extend(record_format.iter_unpack(chunk))
+            index += run
+        return records
+
+    def _overwritten_records(self, tier_name, tier):
+        """Return how many of the oldest records in a tier snapshot are gone.
+
+        The writer keeps appending while a reader works from its snapshot;
+        once the ring is full each append replaces the oldest slot.
+        """
+        with self.lock:
+            appended = self.tiers[tier_name]['written'] - tier['written']
+        return max(0, appended - (tier['capacity'] - tier['count']))
+
+    def _lower_bound(self, handle, tier_name, tier, timestamp):
+        """Binary search for the first logical record at or after ``timestamp``.
+
+        Overwritten slots no longer belong to the snapshot and sort as older
+        than everything in it.
+        """
+        low, high = 0, tier['count']
+        while low < high:
+            middle = (low + high) // 2
+            record = self._read_records(handle, tier, middle, middle + 1)[0]
+            if (record[0] < timestamp or
+                    middle < self._overwritten_records(tier_name, tier)):
+                low = middle + 1
+            else:
+                high = middle
+        return low
+
+    def read_range(self, tier_name, start, end, target_id=None):
+        """Return records of one tier with ``start <= timestamp < end``.
+
+        The start position is found by binary search over the ring, so the
+        cost depends on the size of the requested range, not the file. The
+        minute and hour tiers include their still-open buckets.
+        """
+        with self.lock:
+            if self.handle is None:
+                return []
+            self.handle.flush()
+            tier = dict(self.tiers[tier_name])
+            open_records = []
+            if tier_name in self.open_buckets:
+                pending = [(tier_name, self.open_buckets[tier_name])]
+                if tier_name == 'hour':
+                    # Minutes still being filled have not been folded yet.
+                    pending.insert(0, ('minute', self.open_buckets['minute']))
+                for _, buckets in pending:
+                    for bucket_target, bucket in buckets.items():
+                        open_records.append((
+                            bucket['start'], bucket_target, bucket['probes'],
+                            bucket['online'], bucket['rtt_count'], bucket['rtt_sum'],
+                            bucket['rtt_min'] if bucket['rtt_count'] else 0.0,
+                            bucket['rtt_max'] if bucket['rtt_count'] else 0.0))
+
+        records = []
+        with open(self.path, 'rb') as handle:
+            index = self._lower_bound(handle, tier_name, tier, start)
+            while index < tier['count']:
+                stop_index = min(tier['count'], index + PING_HISTORY_READ_CHUNK)
+                chunk = self._read_records(handle, tier, index, stop_index)
+                # Drop slots the writer reused while the chunk was being read;
+                # what remains is still in time order.
+                overwritten = self._overwritten_records(tier_name, tier)
+                if overwritten > index:
+                    chunk = chunk[overwritten - index:]
+                for record in chunk:
+                    if record[0] >= end:
+                        index = tier['count']
+                        break
+                    if target_id is None or record[1] == target_id:
+                        records.append(record)
+                else:
+                    index = stop_index
+
+        records.extend(record for record in open_records
+                       if start <= record[0] < end and
+                       (target_id is None or record[1] == target_id))
+        return records
+
+    def get_targets(self):
+        with self.lock:
+            return dict(self.target_ids)
+
+    def get_stats(self):
+        with self.lock:
+            stats = dict(self.stats)
+            stats.update({
+                'path': self.path,
+                'open': self.handle is not None,
+                'targets': dict(self.target_ids),
+                'tiers': {name: {'count': tier['count'], 'capacity': tier['capacity']}
+                          for name, tier in self.tiers.items()},
+                'queued': self.queue.qsize()
+            })
+        return stats
+
+
+class AdaptiveProbeInterval:
+    """Probe cadence for one target, derived from the configured interval.
+
+    A status change (or a first result of offline) drops the interval to a
+    fast cadence so flaps and recoveries are seen quickly. Each unchanged
+    result then stretches it by ``FTP_PROBE_BACKOFF_GROWTH``. Offline targets
+    settle at half the configured interval; stable online targets settle
+    slightly above it, which pays for the extra probes around transitions.
+    """
+
+    def __init__(self, base_interval):
+        self.base_interval = base_interval
+        self.interval = base_interval
+        self.last_status = None
+
+    def update(self, status):
+        """Record a probe result and return the delay before the next probe."""
+        fast_interval = max(FTP_PROBE_MIN_INTERVAL,
+                            self.base_interval / FTP_PROBE_FAST_DIVISOR)
+        changed = self.last_status is not None and status != self.last_status
+        if changed or (self.last_status is None and status != 'online'):
+            self.interval = fast_interval
+        else:
+            factor = FTP_PROBE_STABLE_FACTOR if status == 'online' else FTP_PROBE_OFFLINE_FACTOR
+            ceiling = max(fast_interval, self.base_interval * factor)
+            self.interval = min(ceiling, self.interval * FTP_PROBE_BACKOFF_GROWTH)
+        self.last_status = status
+        return self.interval
+
+    @staticmethod
+    def jittered(interval):
+        """Spread probes so many targets do not fire in lockstep."""
+        return interval * random.uniform(1 - FTP_PROBE_JITTER, 1 + FTP_PROBE_JITTER)
+
 
 class FTPStatusMonitor:
-    """Background worker to monitor FTP endpoint availability."""
+    """Background worker to monitor FTP endpoint availability.
+
+    Each configured target runs on its own adaptive cadence from a heap of
+    due times; targets that fall due together are probed concurrently.
+    """
 
     def __init__(self):
         self.thread = None
@@ -355,6 +1639,19 @@ class FTPStatusMonitor:
             'ftp_targets': sanitize_ftp_targets([]),
             'ftp_ping_interval': DEFAULT_FTP_PING_INTERVAL
         }
+        self.latency_lock = threading.Lock()
+        # Scheduled and manual polls take turns so poll times, cache updates
+        # and ping history submissions happen in one order.
+        self.probe_lock = threading.Lock()
+        self.latency = {}
+        self.cadence = {}
+        self.probe_counts = {'scheduled': 0, 'manual': 0}
+        # ftplib probes run here, off the scheduler and request threads;
+        # polls report the latest finished result for each (host, port).
+        self.protocol_executor = ThreadPoolExecutor(max_workers=FTP_PROTOCOL_MAX_WORKERS,
+                                                    thread_name_prefix='ftp-protocol-probe')
+        self.protocol_results = {}
+        self.protocol_inflight = set()
 
     def start(self, settings):
         """Start monitoring with the provided settings."""
@@ -373,6 +1670,16 @@ class FTPStatusMonitor:
             'ftp_ping_interval': ftp_interval
         }
 
+        configured = {(target['host'], target['port']) for target in ftp_targets}
+        with self.latency_lock:
+            for key in list(self.latency):
+                if key not in configured:
+                    del self.latency[key]
+            for key in list(self.protocol_results):
+                if key not in configured:
+                    del self.protocol_results[key]
+            self.cadence = {}
+
         self.stop_event.clear()
         self.thread = threading.Thread(target=self.run, daemon=True)
         self.thread.start()
@@ -387,15 +1694,65 @@ class FTPStatusMonitor:
 
     def run(self):
         """Run the monitoring loop until stopped."""
+        targets = sanitize_ftp_targets(self.settings.get('ftp_targets'))
+        base_interval = self._get_interval()
+
+        try:
+            self._poll_once()
+        except Exception as exc:  # pragma: no cover - defensive logging
+            logger.exception("Unexpected error while polling FTP targets: %s", exc)
+
+        schedule = []
+        sequence = 0
+        now = time.monotonic()
+        with ftp_status_lock:
+            initial_statuses = list(ftp_status_cache)
+        for index, target in enumerate(targets):
+            if not target['host']:
+                continue
+            cadence = AdaptiveProbeInterval(base_interval)
+            status = initial_statuses[index]['status'] if index < len(initial_statuses) else None
+            delay = cadence.update(status) if status in ('online', 'offline') else base_interval
+            with self.latency_lock:
+                self.cadence[index] = cadence
+            heapq.heappush(schedule, (now + cadence.jittered(delay), sequence, index))
+            sequence += 1
+
         while not self.stop_event.is_set():
+            if not schedule:
+                self.stop_event.wait()
+                break
+            delay = schedule[0][0] - time.monotonic()
+            if delay > 0 and self.stop_event.wait(delay):
+                break
+
+            due_indexes = []
+            horizon = time.monotonic() + FTP_PROBE_BATCH_WINDOW
+            while schedule and schedule[0][0] <= horizon:
+                due_indexes.append(heapq.heappop(schedule)[2])
+
             try:
-                self._poll_once()
+                statuses = self._probe_indexes(due_indexes)
             except Exception as exc:  # pragma: no cover - defensive logging
                 logger.exception("Unexpected error while polling FTP targets: %s", exc)
-
-            interval = self._get_interval()
-            if self.stop_event.wait(interval):
-                break
+                statuses = {}
+
+            now = time.monotonic()
+            next_intervals = {}
+            with self.latency_lock:
+                self.probe_counts['scheduled'] += len(due_indexes)
+                for index in due_indexes:
+                    cadence = self.cadence[index]
+                    status = statuses.get(index, {}).get('status', 'offline')
+                    next_intervals[index] = cadence.update(status)
+                    heapq.heappush(schedule, (now + cadence.jittered(next_intervals[index]),
+                                              sequence, index))
+                    sequence += 1
+
+            with ftp_status_lock:
+                for index, interval in next_intervals.items():
+                    if index < len(ftp_status_cache):
+                        ftp_status_cache[index]['probe_interval'] = round(interval, 1)
 
     def _get_interval(self):
         interval = self.settings.get('ftp_ping_interval',
@@ -408,168 +1765,939 @@ class FTPStatusMonitor:
         return max(5, interval)
 
     def _poll_once(self):
-        timestamp = datetime.utcnow().isoformat() + 'Z'
         targets = sanitize_ftp_targets(self.settings.get('ftp_targets'))
-        statuses = []
+        self._probe_indexes(range(len(targets)))
+        with ftp_status_lock:
+            return list(ftp_status_cache)
 
-        for index, target in enumerate(targets, start=1):
+    def _probe_indexes(self, indexes):
+        """Probe the targets at ``indexes`` and update their cache entries."""
+        with self.probe_lock:
+            return self._probe_indexes_locked(indexes)
+
+    def _probe_indexes_locked(self, indexes):
+        poll_time = time.time()
+        timestamp = format_utc_timestamp(poll_time)
+        targets = sanitize_ftp_targets(self.settings.get('ftp_targets'))
+        statuses = {}
+
+        configured = [(targets[index]['host'], targets[index]['port'])
+                      for index in indexes if targets[index]['host']]
+        probe_results = dict(zip(configured, probe_tcp_targets(configured)))
+        protocol_results = self._probe_protocols(
+            [targets[index] for index in indexes
+             if targets[index].get('probe') == 'ftp'
+             and probe_results.get((targets[index]['host'], targets[index]['port']),
+                                   ('offline',))[0] == 'online'])
+
+        for index in indexes:
+            target = targets[index]
             host = target['host']
             port = target['port']
             status = 'unconfigured'
             error_message = None
+            connect_ms = None
 
             if host:
-                try:
-                    with socket.create_connection((host, port), timeout=5):
-                        status = 'online'
-                except Exception as exc:  # pragma: no cover - network dependent
-                    status = 'offline'
-                    error_message = str(exc)
+                status, error_message, connect_ms = probe_results[(host, port)]
+                self._record_latency(host, port, connect_ms)
+                if error_message:
                     logger.warning(
                         "FTP status check failed for %s:%s - %s",
-                        host, port, exc
+                        host, port, error_message
                     )
 
-            statuses.append({
-                'name': f'FTP Server {index}',
+            with self.latency_lock:
+                cadence = self.cadence.get(index)
+                probe_interval = round(cadence.interval, 1) if cadence else None
+
+            statuses[index] = {
+                'name': f'FTP Server {index + 1}',
                 'host': host,
                 'port': port,
                 'status': status,
                 'error': error_message,
+                'connect_ms': round(connect_ms, 2) if connect_ms is not None else None,
+                'probe_interval': probe_interval,
                 'last_checked': timestamp
-            })
+            }
+            if target.get('probe') == 'ftp':
+                statuses[index]['ftp_probe'] = protocol_results.get((host, port))
 
         global ftp_status_cache
         with ftp_status_lock:
-            ftp_status_cache = statuses
-
-        self._write_ping_log(statuses, timestamp)
+            updated_cache = list(ftp_status_cache[:len(targets)])
+            for index, status in sorted(statuses.items()):
+                if index < len(updated_cache):
+                    updated_cache[index] = status
+                elif index == len(updated_cache):
+                    updated_cache.append(status)
+            ftp_status_cache = updated_cache
+
+        ping_history.submit(poll_time, list(statuses.values()))
         return statuses
 
-    def _write_ping_log(self, statuses, timestamp):
-        """Persist the latest FTP ping results to a rotating log file."""
-        if not ping_logger.handlers:
-            configure_ping_logger(app_settings.get('logs_directory', 'logs'))
-            if not ping_logger.handlers:
-                return
-
-        payload = {
-            'timestamp': timestamp,
-            'results': [
-                {
-                    'host': status.get('host'),
-                    'port': status.get('port'),
-                    'status': status.get('status'),
-                    'error': status.get('error')
-                }
-                for status in statuses
-            ]
-        }
-
+    def _probe_protocols(self, targets):
+        """Start ftplib probes for ``targets`` and return the latest finished ones.
+
+        A login (and optional upload) can take several seconds, so neither the
+        scheduler nor a manual ping waits for it: probes run on
+        ``protocol_executor``, a target already being probed is not started
+        again, and the result lands in the status cache when it finishes.
+        Keyed by ``(host, port)``; ``None`` until a target's first probe ends.
+        """
+        results = {}
+        with self.latency_lock:
+            for target in targets:
+                key = (target['host'], target['port'])
+                results[key] = self.protocol_results.get(key)
+                if key not in self.protocol_inflight:
+                    self.protocol_inflight.add(key)
+                    self.protocol_executor.submit(self._run_protocol_probe, target)
+        return results
+
+    def _run_protocol_probe(self, target):
+        key = (target['host'], target['port'])
+        password_env = target.get('password_env')
+        password = os.environ.get(password_env, '') if password_env else ''
         try:
-            ping_logger.info(json.dumps(payload, ensure_ascii=False))
+            result = probe_ftp_protocol(target['host'], target['port'],
+                                        username=target.get('username', 'anonymous'),
+                                        password=password,
+                                        throughput_kb=target.get('throughput_kb', 0))
         except Exception as exc:  # pragma: no cover - defensive logging
-            logger.exception('Failed to persist ping status log: %s', exc)
-
+            logger.exception("FTP protocol probe crashed for %s:%s: %s", key[0], key[1], exc)
+            with self.latency_lock:
+                self.protocol_inflight.discard(key)
+            return
+
+        if result['status'] != 'ok':
+            logger.warning("FTP protocol probe failed for %s:%s during %s - %s",
+                           key[0], key[1], result['phase'], result['error'])
+        with self.latency_lock:
+            self.protocol_results[key] = result
+            self.protocol_inflight.discard(key)
+        with ftp_status_lock:
+            for status in ftp_status_cache:
+                if (status.get('host'), status.get('port')) == key and 'ftp_probe' in status:
+                    status['ftp_probe'] = result
+
+    def _record_latency(self, host, port, connect_ms):
+        with self.latency_lock:
+            histogram = self.latency.get((host, port))
+            if histogram is None:
+                histogram = self.latency[(host, port)] = LatencyHistogram()
+            if connect_ms is None:
+                histogram.record_failure()
+            else:
+                histogram.record(connect_ms)
+
+    def get_latency_stats(self, host, port):
+        with self.latency_lock:
+            histogram = self.latency.get((host, port))
+            return histogram.snapshot() if histogram else None
+
+    def attach_latency(self, statuses):
+        """Add connect-latency statistics to a list of status entries."""
+        for status in statuses:
+            if status.get('host'):
+                status['latency'] = self.get_latency_stats(status['host'], status['port'])
+        return statuses
 
     def poll_now(self):
         """Perform a synchronous FTP status check and return the latest result."""
         statuses = self._poll_once()
+        with self.latency_lock:
+            self.probe_counts['manual'] += sum(1 for status in statuses if status.get('host'))
         return copy.deepcopy(statuses)
 
+    def get_probe_counts(self):
+        """Return how many probes the scheduler and manual pings have run."""
+        with self.latency_lock:
+            return dict(self.probe_counts)
 
-class LogParser:
-    def __init__(self, logs_dir="logs"):
-        self.logs_dir = logs_dir
-        
-    def get_log_files(self):
-        """Get all log files sorted by modification time (newest first)"""
-        pattern = os.path.join(self.logs_dir, "Transmission.log*")
-        log_files = glob.glob(pattern)
-        return sorted(log_files, key=os.path.getmtime, reverse=True)
-    
-    def _collect_resend_overrides(self):
-        """Collect resend overrides from all log files."""
-        overrides = {}
-        for candidate in self.get_log_files():
-            try:
-                with open(candidate, 'r', encoding='utf-8') as override_handle:
-                    for line in override_handle:
-                        if ('Dashboard-resend-handler' not in line or
-                                'resend_result' not in line):
-                            continue
-                        try:
-                            _, json_blob = line.split('resend_result', 1)
-                            override_payload = json.loads(json_blob.strip())
-                            override_id = (override_payload or {}).get('id_scan')
-                            if override_id and override_id not in overrides:
-                                overrides[override_id] = override_payload
-                        except (ValueError, json.JSONDecodeError):
-                            continue
-            except IOError:
-                continue
-        return overrides
 
-    def parse_log_file(self, file_path, global_overrides=None):
-        """Parse a single log file and extract JSON data"""
-        data = []
-        provisional_entries = {}
-        completed_task_ids = set()
-        known_containers = {}
-        known_upload_metadata = {}
-        resend_overrides = dict(global_overrides or {})
+class ParseDeadlineExceeded(Exception):
+    """Raised when a log parse runs past the current request deadline."""
 
-        container_token_pattern = re.compile(r'^[A-Z0-9\-]+$')
 
-        def normalize_timestamp(value):
-            """Return timestamps in the standard '%Y-%m-%d %H:%M:%S' format."""
-            if not value:
-                return value
-            if isinstance(value, datetime):
-                return value.strftime('%Y-%m-%d %H:%M:%S')
-            if isinstance(value, str):
-                text = value.strip()
-                if not text:
-                    return text
-                candidate = text.replace('T', ' ').rstrip('Z').strip()
-                for fmt in ('%Y-%m-%d %H:%M:%S.%f', '%Y-%m-%d %H:%M:%S'):
-                    try:
-                        dt_obj = datetime.strptime(candidate, fmt)
-                        return dt_obj.strftime('%Y-%m-%d %H:%M:%S')
-                    except ValueError:
-                        continue
-                try:
-                    dt_obj = datetime.fromisoformat(candidate)
-                    return dt_obj.strftime('%Y-%m-%d %H:%M:%S')
-                except ValueError:
-                    return candidate
-            return value
+request_deadline_state = threading.local()
 
-        def sanitize_container_value(value):
-            """Return a normalized container number or empty string if invalid."""
-            if value is None:
-                return ''
-            container_value = str(value).strip()
-            if not container_value:
-                return ''
-            if container_value.lower() == 'failed!':
-                return ''
-            container_value = container_value.upper()
-            if len(container_value) < 4:
-                return ''
-            if not any(ch.isdigit() for ch in container_value):
-                return ''
-            if not any(ch.isalpha() for ch in container_value):
-                return ''
-            if not container_token_pattern.match(container_value):
-                return ''
-            return container_value
 
-        def remember_container(entry_id, container_value):
-            """Persist sanitized container numbers for reuse across retries."""
-            if not entry_id:
-                return
-            container_value = sanitize_container_value(container_value)
+def set_parse_deadline(seconds):
+    """Set a deadline for log parsing performed on the current thread."""
+    request_deadline_state.deadline = (time.monotonic() + seconds
+                                       if seconds else None)
+
+
+def clear_parse_deadline():
+    request_deadline_state.deadline = None
+
+
+def parse_deadline_remaining():
+    """Return seconds left before the current deadline, or None if unbounded."""
+    deadline = getattr(request_deadline_state, 'deadline', None)
+    if deadline is None:
+        return None
+    return deadline - time.monotonic()
+
+
+def check_parse_deadline():
+    """Abort the current parse if the request deadline has passed."""
+    remaining = parse_deadline_remaining()
+    if remaining is not None and remaining <= 0:
+        raise ParseDeadlineExceeded('Log parsing exceeded the request deadline')
+
+
+server_timing_state = threading.local()
+
+
+class ServerTiming:
+    """Phase durations for one request, emitted as a ``Server-Timing`` header.
+
+    Repeated phases (such as ``parse`` across several log files) accumulate.
+    """
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.phases = OrderedDict()
+
+    def add(self, name, elapsed_ms):
+        self.phases[name] = self.phases.get(name, 0.0) + elapsed_ms
+
+    def header_value(self):
+        metrics = [f'{name};dur={elapsed_ms:.2f}' for name, elapsed_ms in self.phases.items()]
+        metrics.append(f'total;dur={(time.perf_counter() - self.started) * 1000.0:.2f}')
+        return ', '.join(metrics)
+
+
+def start_server_timing():
+    server_timing_state.timing = ServerTiming()
+
+
+def finish_server_timing():
+    """Detach and return the current thread's timing, if any."""
+    timing = getattr(server_timing_state, 'timing', None)
+    server_timing_state.timing = None
+    return timing
+
+
+def server_timing_mark():
+    """Return a start mark, or None when this thread is not collecting timings."""
+    if getattr(server_timing_state, 'timing', None) is None:
+        return None
+    return time.perf_counter()
+
+
+def server_timing_record(name, mark):
+    """Charge the time since ``mark`` to ``name``; returns a new mark."""
+    if mark is None:
+        return None
+    timing = getattr(server_timing_state, 'timing', None)
+    if timing is None:
+        return None
+    now = time.perf_counter()
+    timing.add(name, (now - mark) * 1000.0)
+    return now
+
+
+class AdmissionLimiter:
+    """Bound concurrent executions of a heavy endpoint with a short wait queue."""
+
+    def __init__(self, name, max_concurrent, max_waiting, wait_timeout):
+        self.name = name
+        self.condition = threading.Condition()
+        self.max_concurrent = max_concurrent
+        self.max_waiting = max_waiting
+        self.wait_timeout = wait_timeout
+        self.active = 0
+        self.waiting = 0
+        self.stats = {
+            'admitted': 0,
+            'queued': 0,
+            'rejected': 0,
+            'timed_out': 0,
+            'deadline_exceeded': 0
+        }
+
+    def configure(self, max_concurrent, max_waiting, wait_timeout):
+        with self.condition:
+            self.max_concurrent = max(1, int(max_concurrent))
+            self.max_waiting = max(0, int(max_waiting))
+            self.wait_timeout = max(0, float(wait_timeout))
+            self.condition.notify_all()
+
+    def acquire(self):
+        """Admit the caller, waiting in the queue if allowed. Returns False when shed."""
+        with self.condition:
+            if self.active < self.max_concurrent:
+                self.active += 1
+                self.stats['admitted'] += 1
+                return True
+
+            if self.waiting >= self.max_waiting:
+                self.stats['rejected'] += 1
+                return False
+
+            self.waiting += 1
+            self.stats['queued'] += 1
+            deadline = time.monotonic() + self.wait_timeout
+            try:
+                while self.active >= self.max_concurrent:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self.stats['timed_out'] += 1
+                        return False
+                    self.condition.wait(remaining)
+                self.active += 1
+                self.stats['admitted'] += 1
+                return True
+            finally:
+                self.waiting -= 1
+
+    def acquire_background(self):
+        """Wait, without queue limit or timeout, for a slot for background work."""
+        with self.condition:
+            while self.active >= self.max_concurrent:
+                self.condition.wait()
+            self.active += 1
+            self.stats['admitted'] += 1
+
+    def release(self):
+        with self.condition:
+            self.active -= 1
+            self.condition.notify()
+
+    def record_deadline_exceeded(self):
+        with self.condition:
+            self.stats['deadline_exceeded'] += 1
+
+    @property
+    def retry_after(self):
+        """Suggested Retry-After value in whole seconds."""
+        return max(1, int(round(self.wait_timeout or 1)))
+
+    def get_stats(self):
+        with self.condition:
+            stats = dict(self.stats)
+            stats.update({
+                'active': self.active,
+                'waiting': self.waiting,
+                'max_concurrent': self.max_concurrent,
+                'max_waiting': self.max_waiting,
+                'wait_timeout': self.wait_timeout
+            })
+        return stats
+
+
+class SingleFlight:
+    """Coalesce concurrent calls that share a key into one computation."""
+
+    class Call:
+        __slots__ = ('event', 'result', 'error')
+
+        def __init__(self):
+            self.event = threading.Event()
+            self.result = None
+            self.error = None
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.calls = {}
+        self.stats = {
+            'calls': 0,
+            'executions': 0,
+            'coalesced': 0,
+            'errors': 0,
+            'retried': 0
+        }
+
+    def do(self, key, func):
+        """Run ``func`` once per key; concurrent callers share its result.
+
+        Followers re-raise a copy of the leader's error. When the leader ran
+        out of its own parse deadline, followers with time left retry instead.
+        """
+        with self.lock:
+            self.stats['calls'] += 1
+
+        while True:
+            with self.lock:
+                call = self.calls.get(key)
+                leader = call is None
+                if leader:
+                    call = self.Call()
+                    self.calls[key] = call
+                    self.stats['executions'] += 1
+                else:
+                    self.stats['coalesced'] += 1
+
+            if leader:
+                break
+            if not call.event.wait(parse_deadline_remaining()):
+                raise ParseDeadlineExceeded('Timed out waiting for a shared log parse')
+            if call.error is None:
+                return call.result
+            if isinstance(call.error, ParseDeadlineExceeded):
+                remaining = parse_deadline_remaining()
+                if remaining is None or remaining > 0:
+                    with self.lock:
+                        self.stats['retried'] += 1
+                    continue
+            raise self._copy_error(call.error) from call.error
+
+        try:
+            call.result = func()
+        except Exception as exc:
+            call.error = exc
+            with self.lock:
+                self.stats['errors'] += 1
+            raise
+        finally:
+            with self.lock:
+                self.calls.pop(key, None)
+            call.event.set()
+
+        return call.result
+
+    @staticmethod
+    def _copy_error(error):
+        """Return a fresh exception for one follower, so none share an instance."""
+        try:
+            return copy.copy(error)
+        except Exception:
+            return RuntimeError(f'Shared log parse failed: {error}')
+
+    def get_stats(self):
+        """Return a snapshot of the coalescing counters."""
+        with self.lock:
+            stats = dict(self.stats)
+            stats['in_flight'] = len(self.calls)
+        return stats
+
+
+def estimate_result_size(rows):
+    """Approximate the serialized size of a result list by sampling rows."""
+    if not rows:
+        return 0
+    step = max(1, len(rows) // 64)
+    sample = rows[::step][:64]
+    sample_bytes = sum(
+        len(json.dumps(row, ensure_ascii=False, default=str)) for row in sample
+    )
+    return int(sample_bytes / len(sample) * len(rows))
+
+
+class QueryResultCache:
+    """Bounded LRU cache of filtered parse results.
+
+    Keys are scoped by logs directory and carry the directory signature they
+    were computed for; storing a result for a new signature drops every entry
+    of the same scope that was computed against an older one.
+    """
+
+    def __init__(self, max_entries=DEFAULT_QUERY_CACHE_MAX_ENTRIES,
+                 max_bytes=DEFAULT_QUERY_CACHE_MAX_MB * 1024 * 1024):
+        self.lock = threading.Lock()
+        self.entries = OrderedDict()
+        self.signatures = {}
+        self.total_bytes = 0
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.stats = {
+            'hits': 0,
+            'misses': 0,
+            'evictions': 0,
+            'invalidations': 0
+        }
+
+    def configure(self, max_entries, max_bytes):
+        """Apply new limits, evicting entries if the cache is now too large."""
+        with self.lock:
+            self.max_entries = max(1, int(max_entries))
+            self.max_bytes = max(1, int(max_bytes))
+            self._evict()
+
+    def get(self, scope, signature, args):
+        key = (scope, signature, args)
+        with self.lock:
+            item = self.entries.get(key)
+            if item is None:
+                self.stats['misses'] += 1
+                return None
+            self.entries.move_to_end(key)
+            self.stats['hits'] += 1
+            return item[0]
+
+    def put(self, scope, signature, args, value):
+        size = estimate_result_size(value)
+        with self.lock:
+            if self.signatures.get(scope) != signature:
+                self.signatures[scope] = signature
+                for stale_key in [k for k in self.entries if k[0] == scope and k[1] != signature]:
+                    _, stale_size = self.entries.pop(stale_key)
+                    self.total_bytes -= stale_size
+                    self.stats['invalidations'] += 1
+
+            if size > self.max_bytes:
+                return
+
+            key = (scope, signature, args)
+            previous = self.entries.pop(key, None)
+            if previous is not None:
+                self.total_bytes -= previous[1]
+            self.entries[key] = (value, size)
+            self.total_bytes += size
+            self._evict()
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.signatures.clear()
+            self.total_bytes = 0
+
+    def _evict(self):
+        while self.entries and (len(self.entries) > self.max_entries or
+                                self.total_bytes > self.max_bytes):
+            _, (_, size) = self.entries.popitem(last=False)
+            self.total_bytes -= size
+            self.stats['evictions'] += 1
+
+    def get_stats(self):
+        """Return hit/miss/eviction counters and current occupancy."""
+        with self.lock:
+            stats = dict(self.stats)
+            lookups = stats['hits'] + stats['misses']
+            stats.update({
+                'entries': len(self.entries),
+                'approx_bytes': self.total_bytes,
+                'max_entries': self.max_entries,
+                'max_bytes': self.max_bytes,
+                'hit_rate': round(stats['hits'] / lookups, 4) if lookups else 0.0
+            })
+        return stats
+
+
+class RequestMetrics:
+    """Request and log-parse counters rendered by the ``/metrics`` endpoint.
+
+    Histograms keep one count per bucket bound plus an overflow slot; the
+    exposition turns them into cumulative ``le`` buckets.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.in_flight = 0
+        self.requests = {}
+        self.durations = {}
+        self.parse_duration = self._new_histogram(PARSE_DURATION_BUCKETS_SECONDS)
+        self.parse_totals = {'files': 0, 'lines': 0, 'bytes': 0}
+        self.last_parse_lines_per_second = 0.0
+
+    @staticmethod
+    def _new_histogram(bounds):
+        return {'bounds': bounds, 'counts': [0] * (len(bounds) + 1), 'sum': 0.0, 'count': 0}
+
+    @staticmethod
+    def _observe(histogram, value):
+        histogram['counts'][bisect.bisect_left(histogram['bounds'], value)] += 1
+        histogram['sum'] += value
+        histogram['count'] += 1
+
+    def begin_request(self):
+        with self.lock:
+            self.in_flight += 1
+
+    def end_request(self):
+        with self.lock:
+            self.in_flight = max(0, self.in_flight - 1)
+
+    def observe_request(self, route, method, status_code, seconds):
+        with self.lock:
+            key = (route, method, str(status_code))
+            self.requests[key] = self.requests.get(key, 0) + 1
+            histogram = self.durations.get((route, method))
+            if histogram is None:
+                histogram = self.durations[(route, method)] = self._new_histogram(
+                    HTTP_LATENCY_BUCKETS_SECONDS)
+            self._observe(histogram, seconds)
+
+    def observe_parse(self, seconds, lines, bytes_read):
+        with self.lock:
+            self._observe(self.parse_duration, seconds)
+            self.parse_totals['files'] += 1
+            self.parse_totals['lines'] += lines
+            self.parse_totals['bytes'] += bytes_read
+            if seconds > 0:
+                self.last_parse_lines_per_second = lines / seconds
+
+    def snapshot(self):
+        with self.lock:
+            return {
+                'in_flight': self.in_flight,
+                'requests': dict(self.requests),
+                'durations': {key: copy.deepcopy(value) for key, value in self.durations.items()},
+                'parse_duration': copy.deepcopy(self.parse_duration),
+                'parse_totals': dict(self.parse_totals),
+                'last_parse_lines_per_second': self.last_parse_lines_per_second
+            }
+
+
+PARSE_PROFILE_CATEGORIES = ('send_message_handler', 'upload_data', 'center_response',
+                            'resend_audit', 'other')
+
+
+class ParseProfileSession:
+    """Per-file collector used by ``parse_log_file`` while profiling is on.
+
+    Each line is attributed to a category from cheap byte markers that mirror
+    the parser's branches; its time runs until the next line starts, so it
+    covers every branch taken for that line. Wrapped helpers are timed
+    individually. ``parse_log_file`` merges it into its profiler once the
+    resend overrides have been applied.
+    """
+
+    def __init__(self):
+        self.categories = {name: {'lines': 0, 'matched': 0, 'bytes': 0, 'seconds': 0.0}
+                           for name in PARSE_PROFILE_CATEGORIES}
+        self.functions = {}
+        self.pending = None
+        self.line_matched = False
+
+    @staticmethod
+    def categorize(raw_line):
+        if b'Dashboard-resend-handler' in raw_line and b'resend_result' in raw_line:
+            return 'resend_audit'
+        if b'Task.py-send_message_handler' in raw_line and b'json_data is' in raw_line:
+            return 'send_message_handler'
+        if b'Task.py-build_upload_data' in raw_line or b'XmlParse.py-parse_xml' in raw_line:
+            return 'upload_data'
+        if b'response text:' in raw_line and b'center response:' in raw_line:
+            return 'center_response'
+        return 'other'
+
+    def timed(self, name, func, marks_match=False):
+        stats = self.functions.setdefault(name, {'calls': 0, 'seconds': 0.0})
+
+        def wrapper(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                result = func(*args, **kwargs)
+            finally:
+                stats['calls'] += 1
+                stats['seconds'] += time.perf_counter() - started
+            if marks_match and result:
+                self.line_matched = True
+            return result
+        return wrapper
+
+    def begin_line(self, raw_line, entry_count):
+        now = time.perf_counter()
+        self._close_line(now, entry_count)
+        self.pending = (self.categorize(raw_line), len(raw_line), now, entry_count)
+        self.line_matched = False
+
+    def _close_line(self, now, entry_count):
+        if self.pending is None:
+            return
+        category, size, started, entries_before = self.pending
+        stats = self.categories[category]
+        stats['lines'] += 1
+        stats['bytes'] += size
+        stats['seconds'] += now - started
+        if self.line_matched or entry_count > entries_before:
+            stats['matched'] += 1
+        self.pending = None
+
+    def end_lines(self, entry_count):
+        self._close_line(time.perf_counter(), entry_count)
+
+
+class ParseProfiler:
+    """Cumulative per-category and per-function parse costs across files."""
+
+    def __init__(self, enabled=False):
+        self.lock = threading.Lock()
+        self.enabled = enabled
+        self.reset()
+
+    def reset(self):
+        with self.lock:
+            self.files = 0
+            self.categories = {name: {'lines': 0, 'matched': 0, 'bytes': 0, 'seconds': 0.0}
+                               for name in PARSE_PROFILE_CATEGORIES}
+            self.functions = {}
+
+    def session(self):
+        """Return a collector for one file, or None when profiling is off."""
+        return ParseProfileSession() if self.enabled else None
+
+    def merge(self, session):
+        with self.lock:
+            self.files += 1
+            for name, stats in session.categories.items():
+                totals = self.categories[name]
+                for key, value in stats.items():
+                    totals[key] += value
+            for name, stats in session.functions.items():
+                totals = self.functions.setdefault(name, {'calls': 0, 'seconds': 0.0})
+                totals['calls'] += stats['calls']
+                totals['seconds'] += stats['seconds']
+
+    def snapshot(self):
+        with self.lock:
+            categories = copy.deepcopy(self.categories)
+            functions = copy.deepcopy(self.functions)
+            files = self.files
+            enabled = self.enabled
+
+        total_lines = sum(stats['lines'] for stats in categories.values())
+        total_matched = sum(stats['matched'] for stats in categories.values())
+        total_seconds = sum(stats['seconds'] for stats in categories.values())
+        for stats in categories.values():
+            stats['skipped'] = stats['lines'] - stats['matched']
+            stats['share_of_time'] = (round(stats['seconds'] / total_seconds, 4)
+                                      if total_seconds else None)
+            stats['us_per_line'] = (round(stats['seconds'] * 1e6 / stats['lines'], 2)
+                                    if stats['lines'] else None)
+            stats['seconds'] = round(stats['seconds'], 6)
+        for stats in functions.values():
+            stats['us_per_call'] = (round(stats['seconds'] * 1e6 / stats['calls'], 2)
+                                    if stats['calls'] else None)
+            stats['seconds'] = round(stats['seconds'], 6)
+
+        return {
+            'enabled': enabled,
+            'files': files,
+            'lines': total_lines,
+            'matched_lines': total_matched,
+            'skipped_lines': total_lines - total_matched,
+            'bytes': sum(stats['bytes'] for stats in categories.values()),
+            'line_seconds': round(total_seconds, 6),
+            'categories': categories,
+            'functions': dict(sorted(functions.items(),
+                                     key=lambda item: item[1]['seconds'], reverse=True))
+        }
+
+
+class RowVersionTracker:
+    """Track per-row generations so clients can fetch only changed entries."""
+
+    def __init__(self, change_log_limit=DELTA_CHANGE_LOG_LIMIT):
+        self.lock = threading.Lock()
+        # Generations start from a wall-clock base so numbers handed out by a
+        # previous process (or a previous logs directory) always fall below
+        # the valid range and trigger a full resync instead of a bogus delta.
+        self.base_generation = int(time.time() * 1000)
+        self.generation = self.base_generation
+        self.oldest_valid_generation = self.base_generation
+        self.change_log_limit = max(1, int(change_log_limit))
+        self.fingerprints = {}
+        self.rows = {}
+        self.change_log = []
+
+    @staticmethod
+    def _fingerprint(row):
+        return hash(json.dumps(row, sort_keys=True, ensure_ascii=False, default=str))
+
+    def observe(self, rows):
+        """Record a freshly built snapshot and return its generation."""
+        with self.lock:
+            next_generation = self.generation + 1
+            changes = []
+            current_rows = {}
+
+            for row in rows:
+                row_id = row.get('id_scan')
+                if not row_id:
+                    continue
+                current_rows[row_id] = row
+                fingerprint = self._fingerprint(row)
+                if self.fingerprints.get(row_id) != fingerprint:
+                    self.fingerprints[row_id] = fingerprint
+                    changes.append((next_generation, row_id, False))
+
+            for row_id in list(self.fingerprints):
+                if row_id not in current_rows:
+                    del self.fingerprints[row_id]
+                    changes.append((next_generation, row_id, True))
+
+            self.rows = current_rows
+            if changes:
+                self.generation = next_generation
+                self.change_log.extend(changes)
+                self._prune_change_log()
+
+            return self.generation
+
+    def _prune_change_log(self):
+        if len(self.change_log) <= self.change_log_limit:
+            return
+        drop_count = len(self.change_log) - self.change_log_limit // 2
+        self.oldest_valid_generation = self.change_log[drop_count - 1][0]
+        del self.change_log[:drop_count]
+
+    def changes_since(self, since):
+        """Return (generation, upserted rows, removed ids) or None if a full resync is required."""
+        with self.lock:
+            if since < self.oldest_valid_generation or since > self.generation:
+                return None
+
+            start = bisect.bisect_left(self.change_log, (since + 1,))
+            latest = {}
+            for _, row_id, removed in self.change_log[start:]:
+                latest[row_id] = removed
+
+            upserts = []
+            removed_ids = []
+            for row_id, removed in latest.items():
+                row = self.rows.get(row_id)
+                if removed or row is None:
+                    removed_ids.append(row_id)
+                else:
+                    upserts.append(row)
+
+            return self.generation, upserts, removed_ids
+
+
+def classify_scan_line(line):
+    """Return ``(id_scan, kind)`` for log lines that belong to a single scan.
+
+    Recognizes upload data, send_message_handler payloads, center responses,
+    setState calls and dashboard resend results; other lines return None.
+    """
+    if 'Dashboard-resend-handler' in line and 'resend_result' in line:
+        try:
+            _, json_blob = line.split('resend_result', 1)
+            override_id = (json.loads(json_blob.strip()) or {}).get('id_scan')
+        except (ValueError, AttributeError):
+            return None
+        return (str(override_id), 'resend_result') if override_id else None
+
+    if 'Task.py-send_message_handler' in line:
+        if 'json_data is' in line:
+            match = SCAN_LINE_PICNO_PATTERN.search(line)
+            return (match.group(1), 'send_message_handler') if match else None
+        if 'center response:' in line:
+            match = SCAN_LINE_CENTER_PATTERN.search(line)
+            if match and match.group(1).strip():
+                return match.group(1).strip(), 'center_response'
+        return None
+
+    if 'Task.py-build_upload_data' in line or 'XmlParse.py-parse_xml' in line:
+        match = SCAN_LINE_TASK_PATTERN.search(line)
+        return (match.group(1), 'upload') if match else None
+
+    if 'setState' in line:
+        match = SCAN_LINE_STATE_PATTERN.search(line)
+        return (match.group(1), 'set_state') if match else None
+
+    return None
+
+
+def decode_log_line(raw_line):
+    """Decode a binary log line the way text-mode reading would."""
+    line = raw_line.decode('utf-8')
+    if line.endswith('\r\n'):
+        line = line[:-2] + '\n'
+    return line
+
+
+class LogParser:
+    def __init__(self, logs_dir="logs"):
+        self.logs_dir = logs_dir
+        self._version_trackers = {}
+        self._version_trackers_lock = threading.Lock()
+        self._entry_indexes = {}
+        self._entry_indexes_lock = threading.Lock()
+        self._line_index = {}
+        self._line_index_lock = threading.Lock()
+        
+    def get_log_files(self):
+        """Get all log files sorted by modification time (newest first)"""
+        pattern = os.path.join(self.logs_dir, "Transmission.log*")
+        log_files = glob.glob(pattern)
+        return sorted(log_files, key=os.path.getmtime, reverse=True)
+    
+    def get_directory_signature(self):
+        """Return a cheap fingerprint (name, size, mtime) of the current log files."""
+        signature = []
+        pattern = os.path.join(self.logs_dir, "Transmission.log*")
+        for file_path in glob.glob(pattern):
+            try:
+                stat_result = os.stat(file_path)
+            except OSError:
+                continue
+            signature.append((os.path.basename(file_path),
+                              stat_result.st_size,
+                              stat_result.st_mtime_ns))
+        # Resend outcomes live in the ledger, not in the scanned logs.
+        return tuple(sorted(signature)) + (('resend-ledger', resend_ledger.get_version()),)
+
+    def parse_log_file(self, file_path, resend_overrides=None, profiler=None):
+        """Parse a single log file and extract JSON data.
+
+        The file's parse costs are merged into ``profiler`` when it is
+        enabled; it defaults to the global ``parse_profiler``.
+        """
+        data = []
+        provisional_entries = {}
+        completed_task_ids = set()
+        known_containers = {}
+        known_upload_metadata = {}
+        resend_overrides = resend_overrides or {}
+
+        container_token_pattern = re.compile(r'^[A-Z0-9\-]+$')
+
+        def normalize_timestamp(value):
+            """Return timestamps in the standard '%Y-%m-%d %H:%M:%S' format."""
+            if not value:
+                return value
+            if isinstance(value, datetime):
+                return value.strftime('%Y-%m-%d %H:%M:%S')
+            if isinstance(value, str):
+                text = value.strip()
+                if not text:
+                    return text
+                candidate = text.replace('T', ' ').rstrip('Z').strip()
+                for fmt in ('%Y-%m-%d %H:%M:%S.%f', '%Y-%m-%d %H:%M:%S'):
+                    try:
+                        dt_obj = datetime.strptime(candidate, fmt)
+                        return dt_obj.strftime('%Y-%m-%d %H:%M:%S')
+                    except ValueError:
+                        continue
+                try:
+                    dt_obj = datetime.fromisoformat(candidate)
+                    return dt_obj.strftime('%Y-%m-%d %H:%M:%S')
+                except ValueError:
+                    return candidate
+            return value
+
+        def sanitize_container_value(value):
+            """Return a normalized container number or empty string if invalid."""
+            if value is None:
+                return ''
+            container_value = str(value).strip()
+            if not container_value:
+                return ''
+            if container_value.lower() == 'failed!':
+                return ''
+            container_value = container_value.upper()
+            if len(container_value) < 4:
+                return ''
+            if not any(ch.isdigit() for ch in container_value):
+                return ''
+            if not any(ch.isalpha() for ch in container_value):
+                return ''
+            if not container_token_pattern.match(container_value):
+                return ''
+            return container_value
+
+        def remember_container(entry_id, container_value):
+            """Persist sanitized container numbers for reuse across retries."""
+            if not entry_id:
+                return
+            container_value = sanitize_container_value(container_value)
             if not container_value:
                 return
             known_containers[entry_id] = container_value
@@ -991,24 +3119,58 @@ class LogParser:
 
             sync_entry_container(task_no, container_no)
 
+        decode_line = decode_log_line
+        classify_line = classify_scan_line
+        extract_upload = extract_upload_info
+        update_provisional = update_provisional_entry
+        load_response_json = json.loads
+        apply_override = apply_resend_override
+        profiler = profiler or parse_profiler
+        profile = profiler.session()
+        if profile is not None:
+            decode_line = profile.timed('decode_log_line', decode_log_line)
+            classify_line = profile.timed('classify_scan_line', classify_scan_line)
+            extract_upload = profile.timed('extract_upload_info', extract_upload_info,
+                                           marks_match=True)
+            update_provisional = profile.timed('update_provisional_entry', update_provisional_entry)
+            load_response_json = profile.timed('center_response_json', json.loads)
+            apply_override = profile.timed('apply_resend_override', apply_resend_override)
+
+        line_ids = {}
+        parse_started = time.perf_counter()
+        timing_mark = server_timing_mark()
+        line_number = -1
         try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                for line in f:
+            file_stat = os.stat(file_path)
+            with open(file_path, 'rb') as f:
+                offset = 0
+                indexed_size = 0
+                for line_number, raw_line in enumerate(f):
+                    if not line_number % PARSE_DEADLINE_CHECK_LINES:
+                        check_parse_deadline()
+
+                    line_offset = offset
+                    offset += len(raw_line)
+                    complete_line = raw_line.endswith(b'\n')
+                    if complete_line:
+                        indexed_size = offset
+                    if profile is not None:
+                        profile.begin_line(raw_line, len(data))
+                    line = decode_line(raw_line)
+
+                    scan_ref = classify_line(line)
+                    if scan_ref and complete_line:
+                        # A partial last line is indexed once it is finished.
+                        line_ids.setdefault(scan_ref[0], array('q')).append(line_offset)
+
                     if ('Dashboard-resend-handler' in line and
                             'resend_result' in line):
-                        try:
-                            _, json_blob = line.split('resend_result', 1)
-                            override_payload = json.loads(json_blob.strip())
-                            override_id = (override_payload or {}).get('id_scan')
-                            if override_id:
-                                resend_overrides[override_id] = override_payload
-                        except (ValueError, json.JSONDecodeError):
-                            pass
+                        # Audit copy only; overrides come from the resend ledger.
                         continue
 
-                    upload_info = extract_upload_info(line)
+                    upload_info = extract_upload(line)
                     if upload_info:
-                        update_provisional_entry(upload_info)
+                        update_provisional(upload_info)
                         continue
 
                     # Look for lines with response text (both success and failure)
@@ -1023,7 +3185,7 @@ class LogParser:
                             json_str = line[json_start:].strip()
                             
                             # Parse the JSON
-                            response_data = json.loads(json_str)
+                            response_data = load_response_json(json_str)
                             
                             # Extract timestamp from log line
                             pattern = r'(\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2})'
@@ -1257,12 +3419,22 @@ class LogParser:
                             continue
         except IOError as e:
             print(f"Error reading file {file_path}: {e}")
+        else:
+            self._store_line_index(file_path, file_stat, indexed_size, line_ids)
+            request_metrics.observe_parse(time.perf_counter() - parse_started,
+                                          line_number + 1, offset)
+        if profile is not None:
+            profile.end_lines(len(data))
+        timing_mark = server_timing_record('parse', timing_mark)
 
         for entry in data:
-            apply_resend_override(entry)
+            apply_override(entry)
 
         for provisional in provisional_entries.values():
-            apply_resend_override(provisional)
+            apply_override(provisional)
+        if profile is not None:
+            profiler.merge(profile)
+        server_timing_record('overrides', timing_mark)
 
         data.extend(provisional_entries.values())
 
@@ -1314,23 +3486,182 @@ class LogParser:
                 count += 1
         return count
     
+    def get_version_tracker(self, log_file=None):
+        """Return the row version tracker for the given log file scope.
+
+        Only the whole directory and names of existing log files get a kept
+        tracker; ``log_file`` comes from the query string, so any other value
+        receives a throwaway tracker rather than growing the map.
+        """
+        with self._version_trackers_lock:
+            tracker = self._version_trackers.get(log_file)
+            if tracker is not None:
+                return tracker
+
+        known_files = None
+        if log_file is not None:
+            known_files = {os.path.basename(path) for path in self.get_log_files()}
+            if log_file not in known_files:
+                return RowVersionTracker()
+
+        with self._version_trackers_lock:
+            if known_files is not None:
+                # Drop trackers of files that have rotated away.
+                for stale in [name for name in self._version_trackers
+                              if name is not None and name not in known_files]:
+                    del self._version_trackers[stale]
+            return self._version_trackers.setdefault(log_file, RowVersionTracker())
+
+    def get_entry(self, id_scan, log_file=None):
+        """Return the deduplicated entry for ``id_scan`` via an id index.
+
+        The index is built from ``get_all_data`` and kept across appends: when
+        the log files have only grown, the line index names the scans touched
+        by the new lines and only those are marked stale. Looking up a stale
+        scan, or any change other than growth, rebuilds the index. The
+        returned entry is shared and must not be mutated.
+        """
+        id_scan = str(id_scan or '').strip()
+        if not id_scan:
+            return None
+
+        signature = self.get_directory_signature()
+        with self._entry_indexes_lock:
+            indexed = self._entry_indexes.get(log_file)
+
+        if indexed is not None and indexed['signature'] != signature:
+            indexed = self._extend_entry_index(indexed, signature)
+            with self._entry_indexes_lock:
+                self._entry_indexes[log_file] = indexed
+
+        if indexed is None or id_scan in indexed['stale']:
+            indexed = self._build_entry_index(signature, log_file)
+            with self._entry_indexes_lock:
+                self._entry_indexes[log_file] = indexed
+
+        return indexed['entries'].get(id_scan)
+
+    def _build_entry_index(self, signature, log_file):
+        overrides = resend_ledger.get_overrides()
+        entries = self.get_all_data(log_file=log_file)
+        index = {}
+        for entry in entries:
+            entry_id = str(entry.get('id_scan', '')).strip()
+            if entry_id:
+                index.setdefault(entry_id, entry)
+        # Offsets past the last complete line are treated as unseen, so a
+        # line that was half written during the parse counts as new later.
+        files = {
+            os.path.join(self.logs_dir, name): self._complete_line_end(
+                os.path.join(self.logs_dir, name), size)
+            for name, size, _ in signature[:-1]
+        }
+        return {'signature': signature, 'files': files, 'overrides': overrides,
+                'entries': index, 'stale': frozenset()}
+
+    def _extend_entry_index(self, indexed, signature):
+        """Carry an entry index over appended lines, or return None to rebuild."""
+        paths = {os.path.join(self.logs_dir, name): size
+                 for name, size, _ in signature[:-1]}
+        if paths.keys() != indexed['files'].keys():
+            return None
+
+        stale = set(indexed['stale'])
+        files = {}
+        for path, size in paths.items():
+            previous_end = indexed['files'][path]
+            if size < previous_end:
+                return None
+            record = self._refresh_line_index_record(path)
+            if record is None or record['size'] < previous_end:
+                return None
+            for entry_id, offsets in record['ids'].items():
+                if offsets and offsets[-1] >= previous_end:
+                    stale.add(entry_id)
+            files[path] = record['size']
+
+        overrides = resend_ledger.get_overrides()
+        previous_overrides = indexed['overrides']
+        stale.update(entry_id for entry_id in overrides.keys() | previous_overrides.keys()
+                     if overrides.get(entry_id) != previous_overrides.get(entry_id))
+
+        return {'signature': signature, 'files': files, 'overrides': overrides,
+                'entries': indexed['entries'], 'stale': frozenset(stale)}
+
+    @staticmethod
+    def _complete_line_end(file_path, size):
+        """Return the offset just past the last newline before ``size``."""
+        window = min(size, ENTRY_INDEX_TAIL_WINDOW)
+        try:
+            with open(file_path, 'rb') as handle:
+                handle.seek(size - window)
+                tail = handle.read(window)
+        except OSError:
+            return 0
+        newline = tail.rfind(b'\n')
+        return size - window + newline + 1 if newline >= 0 else 0
+
+    @staticmethod
+    def _entry_matches(entry, status_filter=None, search_term=None):
+        """Return True when an entry passes the status and search filters."""
+        if status_filter and entry['status'] != status_filter:
+            return False
+        if search_term:
+            search_term = search_term.lower()
+            if (search_term not in entry['id_scan'].lower() and
+                    search_term not in entry['container_no'].lower()):
+                return False
+        return True
+
     def get_all_data(self, status_filter=None, search_term=None, 
                      log_file=None):
-        """Get all data from all log files with optional filtering"""
+        """Get all data from all log files with optional filtering.
+
+        Concurrent calls with the same filters and directory state share a
+        single parse; the returned list is shared and must not be mutated.
+        """
+        mark = server_timing_mark()
+        signature = self.get_directory_signature()
+        server_timing_record('list', mark)
+        args = (status_filter, search_term, log_file)
+
+        cached = query_result_cache.get(self.logs_dir, signature, args)
+        if cached is not None:
+            return cached
+
+        def load_and_cache():
+            result = self._load_all_data(status_filter, search_term, log_file)
+            query_result_cache.put(self.logs_dir, signature, args, result)
+            return result
+
+        return log_data_single_flight.do((self.logs_dir, signature, args),
+                                         load_and_cache)
+
+    def _load_all_data(self, status_filter=None, search_term=None,
+                       log_file=None, profiler=None):
+        """Parse, deduplicate and filter entries from the log files.
+
+        ``profiler`` replaces the global ``parse_profiler`` for this pass.
+        """
         all_data = []
         
+        mark = server_timing_mark()
         log_files = self.get_log_files()
-        global_resend_overrides = self._collect_resend_overrides()
+        mark = server_timing_record('list', mark)
+        resend_overrides = resend_ledger.get_overrides()
+        server_timing_record('overrides', mark)
         
         # Filter by specific log file if specified
         if log_file:
             log_files = [f for f in log_files 
                         if os.path.basename(f) == log_file]
         
+        # parse_log_file charges its own parse and overrides phases.
         for file_path in log_files:
-            file_data = self.parse_log_file(file_path, global_resend_overrides)
+            file_data = self.parse_log_file(file_path, resend_overrides, profiler)
             all_data.extend(file_data)
         
+        mark = server_timing_mark()
         # Remove duplicates based on ID scan (keep the latest one)
         seen_ids = set()
         unique_data = []
@@ -1342,25 +3673,131 @@ class LogParser:
             if entry['id_scan'] and entry['id_scan'] not in seen_ids:
                 seen_ids.add(entry['id_scan'])
                 unique_data.append(entry)
+
+        self.get_version_tracker(log_file).observe(unique_data)
+        mark = server_timing_record('dedupe', mark)
         
         # Apply filters after deduplication
-        if status_filter:
-            unique_data = [entry for entry in unique_data 
-                          if entry['status'] == status_filter]
-        
-        if search_term:
-            search_term = search_term.lower()
-            unique_data = [entry for entry in unique_data if 
-                          search_term in entry['id_scan'].lower() or 
-                          search_term in entry['container_no'].lower()]
+        if status_filter or search_term:
+            unique_data = [entry for entry in unique_data
+                           if self._entry_matches(entry, status_filter, search_term)]
+            server_timing_record('filter', mark)
         
         return unique_data
 
-    def find_json_payload(self, task_no, log_file=None):
-        """Locate the original JSON payload for a given task by scanning the logs."""
-        if not task_no:
+    def get_data_delta(self, since=None, status_filter=None, search_term=None,
+                       log_file=None):
+        """Return entries changed since a client generation.
+
+        Without ``since`` (or when the generation is unknown or too old) the
+        full filtered dataset is returned with ``delta`` set to False.
+        """
+        tracker = self.get_version_tracker(log_file)
+
+        if since is not None:
+            self.get_all_data(log_file=log_file)
+            changes = tracker.changes_since(since)
+            if changes is not None:
+                mark = server_timing_mark()
+                generation, changed_rows, removed_ids = changes
+                upserts = []
+                for entry in changed_rows:
+                    if self._entry_matches(entry, status_filter, search_term):
+                        upserts.append(entry)
+                    else:
+                        # Rows that no longer match the filter (e.g. NOK -> OK
+                        # after a resend) disappear from the client's table.
+                        removed_ids.append(entry['id_scan'])
+                server_timing_record('filter', mark)
+                return {
+                    'delta': True,
+                    'generation': generation,
+                    'data': upserts,
+                    'removed': removed_ids
+                }
+
+        if tracker.generation == tracker.base_generation:
+            # Prime the tracker so the first delta request does not resend
+            # every row as a change.
+            self.get_all_data(log_file=log_file)
+
+        # Read the generation before loading data so a concurrent refresh can
+        # only cause changes to be re-sent, never skipped.
+        generation = tracker.generation
+        data = self.get_all_data(status_filter, search_term, log_file)
+        return {
+            'delta': False,
+            'generation': generation,
+            'data': data,
+            'removed': []
+        }
+
+    def _store_line_index(self, file_path, file_stat, indexed_size, line_ids):
+        record = {
+            'size': indexed_size,
+            'mtime_ns': file_stat.st_mtime_ns,
+            'ids': line_ids
+        }
+        with self._line_index_lock:
+            self._line_index[file_path] = record
+        return record
+
+    def _refresh_line_index(self, file_path):
+        """Bring the line index for one file up to date and return its id map.
+
+        Files that only grew since the last pass are indexed from the previous
+        end offset; anything else (rotation, truncation) is rebuilt in full.
+        """
+        record = self._refresh_line_index_record(file_path)
+        return record['ids'] if record else {}
+
+    def _refresh_line_index_record(self, file_path):
+        """Like ``_refresh_line_index`` but return the whole stored record."""
+        try:
+            file_stat = os.stat(file_path)
+        except OSError:
+            return None
+
+        with self._line_index_lock:
+            indexed = self._line_index.get(file_path)
+
+        if (indexed and indexed['size'] == file_stat.st_size and
+                indexed['mtime_ns'] == file_stat.st_mtime_ns):
+            return indexed
+
+        if indexed and file_stat.st_size >= indexed['size']:
+            start_offset = indexed['size']
+            line_ids = {key: array('q', offsets) for key, offsets in indexed['ids'].items()}
+        else:
+            start_offset = 0
+            line_ids = {}
+
+        offset = start_offset
+        try:
+            with open(file_path, 'rb') as handle:
+                handle.seek(start_offset)
+                for raw_line in handle:
+                    if not raw_line.endswith(b'\n'):
+                        # Partial line still being written upstream.
+                        break
+                    line_offset = offset
+                    offset += len(raw_line)
+                    try:
+                        scan_ref = classify_scan_line(decode_log_line(raw_line))
+                    except UnicodeDecodeError:
+                        continue
+                    if scan_ref:
+                        line_ids.setdefault(scan_ref[0], array('q')).append(line_offset)
+        except IOError:
             return None
 
+        return self._store_line_index(file_path, file_stat, offset, line_ids)
+
+    def get_line_refs(self, id_scan, log_file=None):
+        """Return ``[(file_path, offset), ...]`` for every indexed line of a scan.
+
+        Files are ordered newest first, offsets ascending within each file.
+        """
         log_files = self.get_log_files()
         if log_file:
             log_files = [
@@ -1368,44 +3805,208 @@ class LogParser:
                 if os.path.basename(f) == os.path.basename(log_file)
             ]
 
+        refs = []
         for file_path in log_files:
-            try:
-                with open(file_path, 'r', encoding='utf-8') as handle:
-                    for line in handle:
-                        if ('Task.py-send_message_handler' not in line or
-                                'json_data is' not in line or
-                                task_no not in line):
-                            continue
+            offsets = self._refresh_line_index(file_path).get(id_scan)
+            if offsets:
+                refs.extend((file_path, offset) for offset in offsets)
+        return refs
+
+    @staticmethod
+    def read_line_at(file_path, offset):
+        """Read the single log line starting at ``offset``."""
+        try:
+            with open(file_path, 'rb') as handle:
+                handle.seek(offset)
+                return decode_log_line(handle.readline()).rstrip('\n')
+        except (IOError, UnicodeDecodeError):
+            return None
 
-                        decoded_line = unescape(line)
-                        url_match = re.search(r'url is\s*([^,]+)', decoded_line, re.IGNORECASE)
-                        json_match = re.search(r'json_data is (.*)$', decoded_line, re.IGNORECASE)
-                        if not json_match:
-                            continue
+    def get_scan_trail(self, id_scan, log_file=None, limit=MAX_ENTRY_TRAIL_LINES):
+        """Return the raw log lines mentioning a scan, oldest first."""
+        trail = []
+        refs = self.get_line_refs(id_scan, log_file)
+        # get_log_files is newest first; present the trail chronologically.
+        for file_path in reversed(list(dict.fromkeys(path for path, _ in refs))):
+            for path, offset in refs:
+                if path != file_path:
+                    continue
+                line = self.read_line_at(path, offset)
+                if line is None:
+                    continue
+                scan_ref = classify_scan_line(line)
+                timestamp_match = re.search(r'(\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2})', line)
+                trail.append({
+                    'file': os.path.basename(path),
+                    'offset': offset,
+                    'kind': scan_ref[1] if scan_ref else None,
+                    'timestamp': timestamp_match.group(1) if timestamp_match else None,
+                    'line': line
+                })
+                if len(trail) >= limit:
+                    return trail
+        return trail
 
-                        raw_payload = json_match.group(1).strip()
-                        parsed_payload = None
-                        try:
-                            parsed_payload = ast.literal_eval(raw_payload)
-                        except (ValueError, SyntaxError):
-                            try:
-                                parsed_payload = json.loads(raw_payload)
-                            except json.JSONDecodeError:
-                                parsed_payload = None
-
-                        return {
-                            'post_url': url_match.group(1).strip() if url_match else None,
-                            'payload': parsed_payload,
-                            'payload_raw': raw_payload
-                        }
-            except IOError:
+    def find_json_payload(self, task_no, log_file=None):
+        """Locate the original JSON payload for a given task via the line index."""
+        if not task_no:
+            return None
+
+        for file_path, offset in self.get_line_refs(task_no, log_file):
+            line = self.read_line_at(file_path, offset)
+            if (not line or 'Task.py-send_message_handler' not in line or
+                    'json_data is' not in line or task_no not in line):
                 continue
 
+            decoded_line = unescape(line)
+            url_match = re.search(r'url is\s*([^,]+)', decoded_line, re.IGNORECASE)
+            json_match = re.search(r'json_data is (.*)$', decoded_line, re.IGNORECASE)
+            if not json_match:
+                continue
+
+            raw_payload = json_match.group(1).strip()
+            parsed_payload = None
+            try:
+                parsed_payload = ast.literal_eval(raw_payload)
+            except (ValueError, SyntaxError):
+                try:
+                    parsed_payload = json.loads(raw_payload)
+                except json.JSONDecodeError:
+                    parsed_payload = None
+
+            return {
+                'post_url': url_match.group(1).strip() if url_match else None,
+                'payload': parsed_payload,
+                'payload_raw': raw_payload
+            }
+
         return None
 
+# Shared across parser instances so counters survive settings changes
+log_data_single_flight = SingleFlight()
+query_result_cache = QueryResultCache()
+request_metrics = RequestMetrics()
+parse_profiler = ParseProfiler()
+
+
+def configure_query_cache(settings):
+    """Apply query cache limits from settings."""
+    query_result_cache.configure(
+        sanitize_positive_int(settings.get('query_cache_max_entries'),
+                              DEFAULT_QUERY_CACHE_MAX_ENTRIES),
+        sanitize_positive_int(settings.get('query_cache_max_mb'),
+                              DEFAULT_QUERY_CACHE_MAX_MB) * 1024 * 1024
+    )
+
+
+configure_query_cache(app_settings)
+
+admission_limiters = {
+    'scan': AdmissionLimiter('scan', DEFAULT_MAX_CONCURRENT_SCANS,
+                             DEFAULT_ADMISSION_QUEUE_SIZE,
+                             DEFAULT_ADMISSION_QUEUE_TIMEOUT),
+    'export': AdmissionLimiter('export', DEFAULT_MAX_CONCURRENT_EXPORTS,
+                               DEFAULT_ADMISSION_QUEUE_SIZE,
+                               DEFAULT_ADMISSION_QUEUE_TIMEOUT)
+}
+
+
+def clamp_admission_limits(max_scans, max_exports, queue_size,
+                           threads=WAITRESS_THREADS):
+    """Fit the heavy-endpoint limits inside the server's worker thread pool.
+
+    Admitted and queued requests both hold a Waitress thread, so scans, exports
+    and both wait queues together must leave ``RESERVED_LIGHTWEIGHT_THREADS``
+    free for lightweight APIs, plus ``BULK_RESEND_MAX_STREAMS`` for bulk
+    resends. Concurrency is kept first, then queue depth.
+    """
+    budget = max(2, threads - RESERVED_LIGHTWEIGHT_THREADS - BULK_RESEND_MAX_STREAMS)
+    max_scans = max(1, min(max_scans, budget - 1))
+    max_exports = max(1, min(max_exports, budget - max_scans))
+    queue_size = max(0, min(queue_size, (budget - max_scans - max_exports) // 2))
+    return max_scans, max_exports, queue_size
+
+
+def configure_admission_limits(settings):
+    """Apply per-endpoint concurrency limits from settings."""
+    requested = (
+        sanitize_positive_int(settings.get('max_concurrent_scans'),
+                              DEFAULT_MAX_CONCURRENT_SCANS),
+        sanitize_positive_int(settings.get('max_concurrent_exports'),
+                              DEFAULT_MAX_CONCURRENT_EXPORTS),
+        settings.get('admission_queue_size', DEFAULT_ADMISSION_QUEUE_SIZE)
+    )
+    max_scans, max_exports, queue_size = clamp_admission_limits(*requested)
+    if (max_scans, max_exports, queue_size) != requested:
+        logger.warning(
+            "Admission limits (scans=%s, exports=%s, queue=%s) exceed %s server threads; "
+            "using scans=%s, exports=%s, queue=%s", *requested, WAITRESS_THREADS,
+            max_scans, max_exports, queue_size)
+    queue_timeout = sanitize_positive_int(settings.get('admission_queue_timeout'),
+                                          DEFAULT_ADMISSION_QUEUE_TIMEOUT)
+    admission_limiters['scan'].configure(max_scans, queue_size, queue_timeout)
+    admission_limiters['export'].configure(max_exports, queue_size, queue_timeout)
+
+
+configure_admission_limits(app_settings)
+
+
+def service_unavailable(message, retry_after):
+    """Build a 503 JSON response carrying a Retry-After header."""
+    response = jsonify({'error': message})
+    response.status_code = 503
+    response.headers['Retry-After'] = str(retry_after)
+    return response
+
+
+def admission_controlled(limiter_name):
+    """Limit concurrent executions of a view and bound its parse time.
+
+    Requests beyond the limiter's concurrency and wait queue are shed with
+    ``503 Retry-After``; admitted requests run under the configured request
+    deadline so a runaway parse cannot pin a worker thread indefinitely.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            limiter = admission_limiters[limiter_name]
+            mark = server_timing_mark()
+            admitted = limiter.acquire()
+            server_timing_record('admission', mark)
+            if not admitted:
+                return service_unavailable(
+                    'Server is busy, please retry shortly', limiter.retry_after)
+
+            set_parse_deadline(sanitize_positive_int(
+                app_settings.get('request_deadline_seconds'),
+                DEFAULT_REQUEST_DEADLINE_SECONDS))
+            release_on_close = False
+            try:
+                response = view(*args, **kwargs)
+                # A streamed body is produced after the view returns; keep the
+                # slot until the server has finished sending it.
+                if isinstance(response, Response) and response.is_streamed:
+                    response.call_on_close(limiter.release)
+                    release_on_close = True
+                return response
+            except ParseDeadlineExceeded as exc:
+                limiter.record_deadline_exceeded()
+                logger.warning("Request to %s aborted: %s", request.path, exc)
+                return service_unavailable(str(exc), limiter.retry_after)
+            finally:
+                clear_parse_deadline()
+                if not release_on_close:
+                    limiter.release()
+        return wrapper
+    return decorator
+
 # Initialize log parser with settings
 log_parser = LogParser(app_settings['logs_directory'])
 
+ping_history = PingHistoryStore()
+ping_history.configure(app_settings['logs_directory'])
+atexit.register(ping_history.close)
+
 # Start FTP monitoring thread
 ftp_monitor = FTPStatusMonitor()
 ftp_monitor.start(app_settings)
@@ -1418,121 +4019,237 @@ def dashboard():
 
 
 @app.route('/api/data')
+@admission_controlled('scan')
 def get_data():
     """API endpoint to get log data"""
     status_filter = request.args.get('status')
     search_term = request.args.get('search')
     log_file = request.args.get('log_file')
     
-    data = log_parser.get_all_data(status_filter, search_term, log_file)
-    
-    return jsonify({
-        'data': data,
-        'total': len(data)
-    })
+    since_param = request.args.get('since')
 
+    since = None
+    if since_param not in (None, ''):
+        try:
+            since = int(since_param)
+        except ValueError:
+            return jsonify({'error': 'since must be an integer generation'}), 400
 
-@app.route('/api/resend', methods=['POST'])
-def resend_payload():
-    """API endpoint to resend payload data for a specific scan."""
-    request_payload = request.get_json(silent=True) or {}
-    id_scan = str(request_payload.get('id_scan') or '').strip()
-    log_file = request_payload.get('log_file')
+    result = log_parser.get_data_delta(since, status_filter, search_term, log_file)
+    data = result['data']
 
-    if not id_scan:
-        return jsonify({'error': 'id_scan is required'}), 400
+    response = {
+        'data': data,
+        'total': len(data),
+        'generation': result['generation'],
+        'delta': result['delta']
+    }
+    if result['delta']:
+        response['removed'] = result['removed']
 
-    if log_file:
-        log_file = str(log_file).strip()
-        if not log_file:
-            log_file = None
+    mark = server_timing_mark()
+    response = jsonify(response)
+    server_timing_record('serialize', mark)
+    return response
 
-    server_value = app_settings.get('resend_server', '')
-    endpoint_value = app_settings.get('resend_endpoint', '')
 
-    try:
-        target_url = build_resend_url(server_value, endpoint_value)
-    except ValueError as exc:
-        return jsonify({'error': str(exc)}), 400
+class ResendSpans:
+    """Wall-clock split of one resend into named phases, in milliseconds.
 
-    try:
-        entries = (log_parser.get_all_data(log_file=log_file)
-                   if log_file else log_parser.get_all_data())
-    except Exception as exc:  # pragma: no cover - defensive logging
-        logger.exception("Failed to load log data for resend request: %s", exc)
-        return jsonify({'error': 'Failed to load log data'}), 500
+    ``lap(phase)`` charges the time since the previous mark to ``phase``;
+    ``resume()`` moves the mark without charging anything (for example past
+    a rate-limit wait).
+    """
 
-    entry = next(
-        (item for item in entries
-         if str(item.get('id_scan', '')).strip() == id_scan),
-        None
-    )
+    def __init__(self):
+        self.phases = {}
+        self.mark = time.perf_counter()
 
-    if not entry:
-        return jsonify({'error': f'ID scan {id_scan} was not found'}), 404
+    def lap(self, phase):
+        now = time.perf_counter()
+        self.phases[phase] = self.phases.get(phase, 0.0) + (now - self.mark) * 1000.0
+        self.mark = now
 
-    def log_resend_outcome(entry_data, log_file_hint, status_value, response_obj=None, response_text_value='', target_url_value=None):
-        """Append resend outcome details (success or failure) to the transmission log."""
-        try:
-            logs_dir = app_settings.get('logs_directory', 'logs')
-        except Exception:
-            logs_dir = 'logs'
+    def resume(self):
+        self.mark = time.perf_counter()
 
-        log_filename = 'Transmission.log'
-        log_path = os.path.join(logs_dir, log_filename)
+    def total_ms(self):
+        return sum(self.phases.values())
 
-        timestamp = datetime.utcnow()
-        line_timestamp = timestamp.strftime('%Y-%m-%d %H:%M:%S,%f')[:-3]
 
-        payload_timestamp = timestamp.strftime('%Y-%m-%d %H:%M:%S')
+class ResendTelemetry:
+    """Per-target resend latency histograms and sliding-window outcome rates.
 
-        payload = {
-            'id_scan': entry_data.get('id_scan'),
-            'status': status_value,
-            'http_status': getattr(response_obj, 'status_code', None),
-            'target_url': target_url_value,
-            'response_text': response_text_value,
-            'log_file': log_filename,
-            'timestamp': payload_timestamp
+    Every phase (plus the total) feeds a ``LatencyHistogram``. Outcomes are
+    kept with their POST time and the time spent locally, so each window can
+    say whether slow resends were spent waiting on the downstream service or
+    inside the dashboard.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.targets = OrderedDict()
+
+    def record(self, target_url, spans, outcome):
+        target = str(target_url or 'unknown')
+        phases = dict(spans.phases)
+        total_ms = sum(phases.values())
+        post_ms = phases.get('post', 0.0)
+        now = time.monotonic()
+        with self.lock:
+            state = self.targets.get(target)
+            if state is None:
+                state = {
+                    'phases': {phase: LatencyHistogram(RESEND_LATENCY_BUCKETS_MS, RESEND_LATENCY_WINDOW)
+                               for phase in RESEND_PHASES + ('total',)},
+                    'outcomes': {},
+                    'events': deque(maxlen=RESEND_TELEMETRY_MAX_EVENTS)
+                }
+                self.targets[target] = state
+                while len(self.targets) > RESEND_TELEMETRY_MAX_TARGETS:
+                    self.targets.popitem(last=False)
+            else:
+                self.targets.move_to_end(target)
+
+            for phase, elapsed_ms in phases.items():
+                histogram = state['phases'].get(phase)
+                if histogram is not None:
+                    histogram.record(elapsed_ms)
+            state['phases']['total'].record(total_ms)
+            state['outcomes'][outcome] = state['outcomes'].get(outcome, 0) + 1
+            state['events'].append((now, outcome, total_ms, post_ms))
+            self._trim(state['events'], now)
+
+    @staticmethod
+    def _trim(events, now):
+        horizon = now - max(RESEND_TELEMETRY_WINDOWS)
+        while events and events[0][0] < horizon:
+            events.popleft()
+
+    @staticmethod
+    def _summarize_window(events):
+        total = len(events)
+        successes = sum(1 for _, outcome, _, _ in events if outcome == 'success')
+        by_outcome = {}
+        for _, outcome, _, _ in events:
+            by_outcome[outcome] = by_outcome.get(outcome, 0) + 1
+        summary = {
+            'requests': total,
+            'successes': successes,
+            'failures': total - successes,
+            'success_rate': round(successes / total, 4) if total else None,
+            'by_outcome': by_outcome
         }
+        if total:
+            ordered = sorted(total_ms for _, _, total_ms, _ in events)
+            post_total = sum(post_ms for _, _, _, post_ms in events)
+            local_total = sum(total_ms for _, _, total_ms, _ in events) - post_total
+            summary.update({
+                'p50_ms': round(LatencyHistogram._percentile(ordered, 0.50), 2),
+                'p95_ms': round(LatencyHistogram._percentile(ordered, 0.95), 2),
+                'p99_ms': round(LatencyHistogram._percentile(ordered, 0.99), 2),
+                'mean_downstream_ms': round(post_total / total, 2),
+                'mean_dashboard_ms': round(local_total / total, 2)
+            })
+        return summary
+
+    def snapshot(self, target_url=None):
+        now = time.monotonic()
+        with self.lock:
+            keys = [target_url] if target_url is not None else list(self.targets)
+            targets = {}
+            for key in keys:
+                state = self.targets.get(key)
+                if state is None:
+                    continue
+                self._trim(state['events'], now)
+                events = list(state['events'])
+                targets[key] = {
+                    'phases': {phase: histogram.snapshot()
+                               for phase, histogram in state['phases'].items()},
+                    'outcomes': dict(state['outcomes']),
+                    'windows': {
+                        f'{window}s': self._summarize_window(
+                            [event for event in events if now - event[0] <= window])
+                        for window in RESEND_TELEMETRY_WINDOWS
+                    }
+                }
+        return targets
 
-        try:
-            os.makedirs(os.path.dirname(log_path), exist_ok=True)
-        except OSError:
-            pass
 
+resend_telemetry = ResendTelemetry()
+
+
+def log_resend_outcome(entry_data, log_file_hint, status_value, response_obj=None, response_text_value='', target_url_value=None):
+    """Record a resend outcome in the ledger and queue its audit log line."""
+    try:
+        logs_dir = app_settings.get('logs_directory', 'logs')
+    except Exception:
+        logs_dir = 'logs'
+
+    log_filename = 'Transmission.log'
+    log_path = os.path.join(logs_dir, log_filename)
+
+    timestamp = datetime.utcnow()
+    line_timestamp = timestamp.strftime('%Y-%m-%d %H:%M:%S,%f')[:-3]
+
+    payload_timestamp = timestamp.strftime('%Y-%m-%d %H:%M:%S')
+
+    payload = {
+        'id_scan': entry_data.get('id_scan'),
+        'status': status_value,
+        'http_status': getattr(response_obj, 'status_code', None),
+        'target_url': target_url_value,
+        'response_text': response_text_value,
+        'log_file': log_filename,
+        'timestamp': payload_timestamp
+    }
+
+    resend_ledger.record(payload)
+    resend_log_writer.submit(
+        log_path,
+        f"{line_timestamp} INFO [Dashboard-resend-handler] resend_result "
+        f"{json.dumps(payload, ensure_ascii=False)}\n"
+    )
+
+
+def coerce_resend_payload(value):
+    if isinstance(value, (dict, list)):
+        return value
+    if isinstance(value, str):
         try:
-            with open(log_path, 'a', encoding='utf-8') as handle:
-                handle.write(
-                    f"{line_timestamp} INFO [Dashboard-resend-handler] resend_result "
-                    f"{json.dumps(payload, ensure_ascii=False)}\n"
-                )
-        except OSError:
-            logger.exception("Failed to append resend outcome to %s", log_path)
+            return json.loads(value)
+        except json.JSONDecodeError:
+            try:
+                return ast.literal_eval(value)
+            except (ValueError, SyntaxError):
+                return None
+    return None
+
+
+def execute_resend(entry, log_file, target_url, spans=None):
+    """Resend one parsed entry and record the outcome.
 
+    ``entry`` must be a private copy; it is enriched with any payload details
+    recovered from the logs. ``spans`` carries phase timings from the caller
+    (such as the entry lookup); the remaining phases are added here and the
+    result is reported to ``resend_telemetry``. Returns a
+    ``(response_body, http_status)`` tuple.
+    """
+    if spans is None:
+        spans = ResendSpans()
+    spans.resume()
+    id_scan = entry.get('id_scan')
     raw_data = entry.get('raw_data') or {}
     json_payload = raw_data.get('json_payload')
     payload_raw = raw_data.get('json_payload_raw')
     post_url = raw_data.get('post_url')
 
-    def coerce_payload(value):
-        if isinstance(value, (dict, list)):
-            return value
-        if isinstance(value, str):
-            try:
-                return json.loads(value)
-            except json.JSONDecodeError:
-                try:
-                    return ast.literal_eval(value)
-                except (ValueError, SyntaxError):
-                    return None
-        return None
-
     if isinstance(json_payload, str):
-        json_payload = coerce_payload(json_payload)
+        json_payload = coerce_resend_payload(json_payload)
 
     if not isinstance(json_payload, (dict, list)):
-        json_payload = coerce_payload(payload_raw)
+        json_payload = coerce_resend_payload(payload_raw)
 
     fallback_payload = None
     if not isinstance(json_payload, (dict, list)) or not post_url:
@@ -1551,7 +4268,7 @@ def resend_payload():
                 raw_data['post_url'] = post_url
 
     if not isinstance(json_payload, (dict, list)):
-        json_payload = coerce_payload(payload_raw)
+        json_payload = coerce_resend_payload(payload_raw)
 
     if isinstance(json_payload, (dict, list)):
         raw_data['json_payload'] = json_payload
@@ -1567,16 +4284,15 @@ def resend_payload():
         else:
             payload_raw = None
 
-    if not isinstance(json_payload, (dict, list)) and not isinstance(payload_raw, str):
-        return jsonify({
-            'error': 'No resend payload is available for this entry'
-        }), 400
-
     if fallback_payload and fallback_payload.get('post_url'):
         target_url = fallback_payload['post_url']
 
-    if not post_url:
-        post_url = None
+    spans.lap('payload')
+    if not isinstance(json_payload, (dict, list)) and not isinstance(payload_raw, str):
+        resend_telemetry.record(target_url, spans, 'no_payload')
+        return {
+            'error': 'No resend payload is available for this entry'
+        }, 400
 
     try:
         request_kwargs = {
@@ -1590,11 +4306,12 @@ def resend_payload():
                 'Content-Type': 'application/json'
             }
 
-        response = requests.post(
+        response = resend_sessions.post(
             target_url,
             **request_kwargs
         )
     except requests.RequestException as exc:
+        spans.lap('post')
         logger.exception("Failed to resend data for %s: %s", id_scan, exc)
         log_resend_outcome(
             entry,
@@ -1604,8 +4321,11 @@ def resend_payload():
             response_text_value=str(exc),
             target_url_value=target_url
         )
-        return jsonify({'error': f'Failed to send data: {exc}'}), 500
+        spans.lap('log')
+        resend_telemetry.record(target_url, spans, 'transport_error')
+        return {'error': f'Failed to send data: {exc}'}, 500
 
+    spans.lap('post')
     full_response_text = response.text or ''
     response_text_preview = full_response_text
     if len(response_text_preview) > MAX_REMOTE_RESPONSE_PREVIEW:
@@ -1613,6 +4333,7 @@ def resend_payload():
 
     resend_success = interpret_resend_response_success(response, full_response_text)
     outcome_status = 'SUCCESS' if resend_success else 'FAILED'
+    spans.lap('classify')
     log_resend_outcome(
         entry,
         log_file,
@@ -1621,12 +4342,877 @@ def resend_payload():
         response_text_value=response_text_preview.replace('\n', '\\n'),
         target_url_value=target_url
     )
+    spans.lap('log')
+    if resend_success:
+        telemetry_outcome = 'success'
+    elif response.status_code >= 400:
+        telemetry_outcome = 'http_error'
+    else:
+        telemetry_outcome = 'rejected'
+    resend_telemetry.record(target_url, spans, telemetry_outcome)
 
-    return jsonify({
+    return {
         'success': resend_success,
         'status_code': response.status_code,
         'response_text': response_text_preview,
         'target_url': target_url
+    }, 200
+
+
+resend_inflight_lock = threading.Lock()
+resend_inflight_ids = set()
+
+
+def claim_resend(id_scan):
+    """Mark a scan as being resent; returns False if another resend owns it."""
+    with resend_inflight_lock:
+        if id_scan in resend_inflight_ids:
+            return False
+        resend_inflight_ids.add(id_scan)
+        return True
+
+
+def release_resend(id_scan):
+    with resend_inflight_lock:
+        resend_inflight_ids.discard(id_scan)
+
+
+class RateLimiter:
+    """Space calls evenly so no more than ``rate`` start per second."""
+
+    def __init__(self, rate):
+        self.lock = threading.Lock()
+        self.interval = 1.0 / rate if rate else 0.0
+        self.next_slot = time.monotonic()
+
+    def wait(self, stop_event=None):
+        if not self.interval:
+            return True
+        with self.lock:
+            now = time.monotonic()
+            slot = max(now, self.next_slot)
+            self.next_slot = slot + self.interval
+        delay = slot - time.monotonic()
+        if delay > 0:
+            if stop_event is not None:
+                return not stop_event.wait(delay)
+            time.sleep(delay)
+        return True
+
+
+def normalize_log_file_param(log_file):
+    if log_file:
+        log_file = str(log_file).strip()
+    return log_file or None
+
+
+@app.route('/api/resend', methods=['POST'])
+@admission_controlled('scan')
+def resend_payload():
+    """API endpoint to resend payload data for a specific scan."""
+    request_payload = request.get_json(silent=True) or {}
+    id_scan = str(request_payload.get('id_scan') or '').strip()
+    log_file = normalize_log_file_param(request_payload.get('log_file'))
+
+    if not id_scan:
+        return jsonify({'error': 'id_scan is required'}), 400
+
+    server_value = app_settings.get('resend_server', '')
+    endpoint_value = app_settings.get('resend_endpoint', '')
+
+    try:
+        target_url = build_resend_url(server_value, endpoint_value)
+    except ValueError as exc:
+        return jsonify({'error': str(exc)}), 400
+
+    spans = ResendSpans()
+    try:
+        entry = log_parser.get_entry(id_scan, log_file)
+    except ParseDeadlineExceeded:
+        raise
+    except Exception as exc:  # pragma: no cover - defensive logging
+        logger.exception("Failed to load log data for resend request: %s", exc)
+        return jsonify({'error': 'Failed to load log data'}), 500
+    spans.lap('lookup')
+
+    if not entry:
+        return jsonify({'error': f'ID scan {id_scan} was not found'}), 404
+
+    if not claim_resend(id_scan):
+        return jsonify({'error': f'A resend for {id_scan} is already in progress'}), 409
+
+    try:
+        # Parsed entries are shared between concurrent requests; work on a copy.
+        body, status_code = execute_resend(copy.deepcopy(entry), log_file, target_url, spans)
+    finally:
+        release_resend(id_scan)
+
+    return jsonify(body), status_code
+
+
+def select_bulk_resend_entries(entries, id_scans=None, filters=None):
+    """Resolve bulk resend targets from explicit ids or a status/time filter."""
+    if id_scans:
+        by_id = {str(entry.get('id_scan', '')).strip(): entry for entry in entries}
+        selected = []
+        missing = []
+        seen = set()
+        for raw_id in id_scans:
+            id_scan = str(raw_id or '').strip()
+            if not id_scan or id_scan in seen:
+                continue
+            seen.add(id_scan)
+            entry = by_id.get(id_scan)
+            if entry is None:
+                missing.append(id_scan)
+            else:
+                selected.append(entry)
+        return selected, missing
+
+    filters = filters or {}
+    status_value = filters.get('status')
+    if status_value not in BULK_RESEND_STATUS_FILTERS:
+        raise ValueError('filter.status must be one of: '
+                         + ', '.join(BULK_RESEND_STATUS_FILTERS))
+    time_from = parse_time_bound(filters.get('from'))
+    time_to = parse_time_bound(filters.get('to'))
+
+    selected = []
+    for entry in entries:
+        if status_value != 'any' and entry.get('status') != status_value:
+            continue
+        if time_from or time_to:
+            try:
+                scan_time = datetime.strptime(str(entry.get('scan_time') or ''),
+                                              '%Y-%m-%d %H:%M:%S')
+            except ValueError:
+                # 'N/A' or empty: the scan cannot be placed inside the window.
+                continue
+            if time_from and scan_time < time_from:
+                continue
+            if time_to and scan_time > time_to:
+                continue
+        selected.append(entry)
+    return selected, []
+
+
+def parse_time_bound(value):
+    """Parse a 'YYYY-MM-DD[ HH:MM[:SS]]' filter bound, or return None when unset."""
+    if not value:
+        return None
+    text = str(value).strip().replace('T', ' ').rstrip('Z')
+    for fmt in ('%Y-%m-%d %H:%M:%S', '%Y-%m-%d %H:%M', '%Y-%m-%d'):
+        try:
+            return datetime.strptime(text, fmt)
+        except ValueError:
+            continue
+    raise ValueError(f'Invalid time bound: {value}')
+
+
+bulk_resend_limiter = AdmissionLimiter('bulk_resend', BULK_RESEND_MAX_STREAMS, 0, 0)
+
+
+@app.route('/api/resend/bulk', methods=['POST'])
+def resend_bulk():
+    """API endpoint to resend many scans with bounded concurrency.
+
+    Accepts either ``id_scans`` or a ``filter`` (a required ``status`` of
+    ``OK``, ``NOK`` or ``any``, plus optional ``from``/``to`` scan-time bounds)
+    and streams newline-delimited JSON progress: a ``start`` record, one
+    ``item`` record per scan as it completes, and a final ``summary``.
+    """
+    request_payload = request.get_json(silent=True) or {}
+    if not isinstance(request_payload, dict):
+        return jsonify({'error': 'Invalid JSON payload'}), 400
+
+    id_scans = request_payload.get('id_scans')
+    filters = request_payload.get('filter')
+    log_file = normalize_log_file_param(request_payload.get('log_file'))
+
+    if id_scans is not None and not isinstance(id_scans, list):
+        return jsonify({'error': 'id_scans must be a list'}), 400
+    if filters is not None and not isinstance(filters, dict):
+        return jsonify({'error': 'filter must be an object'}), 400
+    if not id_scans and filters is None:
+        return jsonify({'error': 'Provide id_scans or a filter'}), 400
+
+    try:
+        concurrency = int(request_payload.get(
+            'concurrency', app_settings.get('bulk_resend_concurrency', DEFAULT_BULK_RESEND_CONCURRENCY)))
+        rate_limit = float(request_payload.get(
+            'rate_limit', app_settings.get('bulk_resend_rate_limit', DEFAULT_BULK_RESEND_RATE_LIMIT)))
+    except (TypeError, ValueError):
+        return jsonify({'error': 'concurrency and rate_limit must be numbers'}), 400
+    if not 1 <= concurrency <= BULK_RESEND_MAX_CONCURRENCY:
+        return jsonify({
+            'error': f'concurrency must be between 1 and {BULK_RESEND_MAX_CONCURRENCY}'
+        }), 400
+    if rate_limit < 0:
+        return jsonify({'error': 'rate_limit must not be negative'}), 400
+
+    try:
+        target_url = build_resend_url(app_settings.get('resend_server', ''),
+                                      app_settings.get('resend_endpoint', ''))
+    except ValueError as exc:
+        return jsonify({'error': str(exc)}), 400
+
+    if not bulk_resend_limiter.acquire():
+        return service_unavailable('Another bulk resend is already running',
+                                   DEFAULT_ADMISSION_QUEUE_TIMEOUT)
+
+    # Resolving targets is a full log scan, so it shares the scan slots.
+    scan_limiter = admission_limiters['scan']
+    if not scan_limiter.acquire():
+        bulk_resend_limiter.release()
+        return service_unavailable('Server is busy, please retry shortly',
+                                   scan_limiter.retry_after)
+
+    try:
+        set_parse_deadline(sanitize_positive_int(
+            app_settings.get('request_deadline_seconds'),
+            DEFAULT_REQUEST_DEADLINE_SECONDS))
+        try:
+            entries = log_parser.get_all_data(log_file=log_file)
+            selected, missing = select_bulk_resend_entries(entries, id_scans, filters)
+        finally:
+            clear_parse_deadline()
+            scan_limiter.release()
+    except ParseDeadlineExceeded as exc:
+        scan_limiter.record_deadline_exceeded()
+        bulk_resend_limiter.release()
+        return service_unavailable(str(exc), DEFAULT_ADMISSION_QUEUE_TIMEOUT)
+    except ValueError as exc:
+        bulk_resend_limiter.release()
+        return jsonify({'error': str(exc)}), 400
+    except Exception:
+        bulk_resend_limiter.release()
+        raise
+
+    if len(selected) > BULK_RESEND_MAX_ITEMS:
+        bulk_resend_limiter.release()
+        return jsonify({
+            'error': f'Bulk resend is limited to {BULK_RESEND_MAX_ITEMS} entries per request'
+        }), 400
+
+    # Private copies: execute_resend enriches entries with recovered payloads.
+    selected = [copy.deepcopy(entry) for entry in selected]
+    stop_event = threading.Event()
+    rate_limiter = RateLimiter(rate_limit)
+
+    def resend_one(entry):
+        id_scan = entry.get('id_scan')
+        if not claim_resend(id_scan):
+            return {'id_scan': id_scan, 'result': 'skipped',
+                    'error': 'A resend for this scan is already in progress'}
+        try:
+            if not rate_limiter.wait(stop_event):
+                return {'id_scan': id_scan, 'result': 'cancelled'}
+            body, status_code = execute_resend(entry, log_file, target_url)
+        except Exception as exc:  # pragma: no cover - defensive logging
+            logger.exception("Bulk resend failed for %s: %s", id_scan, exc)
+            body, status_code = {'error': str(exc)}, 500
+        finally:
+            release_resend(id_scan)
+
+        item = {'id_scan': id_scan, 'http_status': status_code}
+        item.update(body)
+        item['result'] = 'succeeded' if body.get('success') else 'failed'
+        return item
+
+    def generate():
+        summary = {'succeeded': 0, 'failed': 0, 'skipped': 0, 'cancelled': 0,
+                   'missing': len(missing)}
+        executor = ThreadPoolExecutor(max_workers=concurrency,
+                                      thread_name_prefix='bulk-resend')
+        try:
+            yield json.dumps({'type': 'start', 'total': len(selected),
+                              'missing': missing, 'target_url': target_url}) + '\n'
+            futures = [executor.submit(resend_one, entry) for entry in selected]
+            for completed, future in enumerate(as_completed(futures), 1):
+                item = future.result()
+                summary[item['result']] += 1
+                item.update({'type': 'item', 'completed': completed})
+                yield json.dumps(item, ensure_ascii=False, default=str) + '\n'
+            yield json.dumps({'type': 'summary', **summary}) + '\n'
+        finally:
+            stop_event.set()
+            executor.shutdown(wait=True, cancel_futures=True)
+
+    response = Response(stream_with_context(generate()),
+                        mimetype='application/x-ndjson')
+    response.call_on_close(bulk_resend_limiter.release)
+    return response
+
+
+def ftp_downstream_offline():
+    """Return True when every configured FTP target last reported offline."""
+    with ftp_status_lock:
+        statuses = [status.get('status') for status in ftp_status_cache
+                    if status.get('status') != 'unconfigured']
+    return bool(statuses) and all(status == 'offline' for status in statuses)
+
+
+class CircuitBreaker:
+    """Consecutive-failure circuit breaker with a single half-open probe.
+
+    ``closed`` lets everything through. ``threshold`` consecutive failures
+    open the breaker for ``cooldown`` seconds, after which one probe is let
+    through (``half_open``); its result closes or re-opens the breaker. A
+    ``hold`` keeps the breaker open regardless (e.g. downstream offline).
+    """
+
+    def __init__(self, threshold=AUTO_RETRY_BREAKER_THRESHOLD,
+                 cooldown=AUTO_RETRY_BREAKER_COOLDOWN):
+        self.lock = threading.Lock()
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self.state = 'closed'
+        self.consecutive_failures = 0
+        self.opened_at = None
+        self.probe_inflight = False
+        self.hold_reason = None
+        self.trips = 0
+
+    def acquire(self):
+        """Return True if one more call may go through right now."""
+        with self.lock:
+            if self.hold_reason:
+                return False
+            if self.state == 'open':
+                if time.monotonic() - self.opened_at < self.cooldown:
+                    return False
+                self.state = 'half_open'
+            if self.state == 'half_open':
+                if self.probe_inflight:
+                    return False
+                self.probe_inflight = True
+            return True
+
+    def release(self):
+        """Give back an acquired slot without recording an outcome."""
+        with self.lock:
+            self.probe_inflight = False
+
+    def record_success(self):
+        with self.lock:
+            self.consecutive_failures = 0
+            self.probe_inflight = False
+            self.state = 'closed'
+            self.opened_at = None
+
+    def record_failure(self):
+        with self.lock:
+            self.consecutive_failures += 1
+            self.probe_inflight = False
+            if (self.state == 'half_open' or
+                    self.consecutive_failures >= self.threshold):
+                if self.state != 'open':
+                    self.trips += 1
+                self.state = 'open'
+                self.opened_at = time.monotonic()
+
+    def hold(self, reason):
+        """Keep the breaker open while ``reason`` is set; None lifts the hold."""
+        with self.lock:
+            if reason and not self.hold_reason:
+                self.trips += 1
+            elif not reason and self.hold_reason and self.state == 'closed':
+                # Probe carefully once the downstream is back.
+                self.state = 'half_open'
+            self.hold_reason = reason
+
+    def reset(self):
+        with self.lock:
+            self.state = 'closed'
+            self.consecutive_failures = 0
+            self.opened_at = None
+            self.probe_inflight = False
+
+    def get_stats(self):
+        with self.lock:
+            state = 'open' if self.hold_reason else self.state
+            retry_in = None
+            if self.state == 'open' and not self.hold_reason:
+                retry_in = max(0.0, self.cooldown - (time.monotonic() - self.opened_at))
+            return {
+                'state': state,
+                'hold_reason': self.hold_reason,
+                'consecutive_failures': self.consecutive_failures,
+                'threshold': self.threshold,
+                'cooldown_seconds': self.cooldown,
+                'retry_in_seconds': round(retry_in, 1) if retry_in is not None else None,
+                'trips': self.trips
+            }
+
+
+class AutoRetryQueue:
+    """Durable queue that resends NOK scans with per-item exponential backoff.
+
+    Items live in ``resend_retry_queue.sqlite3`` in the logs directory so a
+    restart picks up where it left off. When enabled, a dispatcher thread
+    periodically enqueues current NOK scans, hands due items to a small worker
+    pool and stops dispatching while the circuit breaker is open.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.connection = None
+        self.path = None
+        self.enabled = False
+        self.workers = DEFAULT_AUTO_RETRY_WORKERS
+        self.max_attempts = DEFAULT_AUTO_RETRY_MAX_ATTEMPTS
+        self.breaker = CircuitBreaker()
+        self.stop_event = threading.Event()
+        self.thread = None
+        self.executor = None
+        self.inflight = set()
+        self.last_sweep = None
+        self.pause_reason = None
+        self.recent_outcomes = deque()
+        self.stats = {
+            'enqueued': 0,
+            'attempts': 0,
+            'succeeded': 0,
+            'failed': 0,
+            'abandoned': 0,
+            'resolved': 0,
+            'sweeps': 0,
+            'errors': 0
+        }
+
+    def configure(self, settings):
+        """Apply settings, (re)opening the queue store and worker pool.
+
+        Called from the settings request, so it never waits on in-flight
+        resends: the running dispatcher and pool are told to stop and retired
+        in the background while the new configuration starts immediately.
+        """
+        self._retire(wait=False)
+
+        queue_path = os.path.join(settings.get('logs_directory', 'logs'),
+                                  AUTO_RETRY_QUEUE_FILENAME)
+        with self.lock:
+            self.workers = sanitize_positive_int(
+                settings.get('auto_retry_workers'), DEFAULT_AUTO_RETRY_WORKERS)
+            self.max_attempts = sanitize_positive_int(
+                settings.get('auto_retry_max_attempts'), DEFAULT_AUTO_RETRY_MAX_ATTEMPTS)
+            self.enabled = bool(settings.get('auto_retry_enabled'))
+            if queue_path != self.path:
+                self._close_locked()
+                self.path = queue_path
+            if self.connection is None:
+                try:
+                    os.makedirs(os.path.dirname(queue_path), exist_ok=True)
+                    self.connection = sqlite3.connect(queue_path, check_same_thread=False)
+                    self.connection.execute('PRAGMA journal_mode=WAL')
+                    self.connection.execute(
+                        'CREATE TABLE IF NOT EXISTS retry_queue ('
+                        ' id_scan TEXT PRIMARY KEY,'
+                        ' log_file TEXT,'
+                        " state TEXT NOT NULL DEFAULT 'pending',"
+                        ' attempts INTEGER NOT NULL DEFAULT 0,'
+                        ' next_attempt_at REAL NOT NULL,'
+                        ' enqueued_at REAL NOT NULL,'
+                        ' updated_at REAL NOT NULL,'
+                        ' last_http_status INTEGER,'
+                        ' last_error TEXT)'
+                    )
+                    self.connection.execute(
+                        'CREATE INDEX IF NOT EXISTS retry_queue_due '
+                        'ON retry_queue (state, next_attempt_at)'
+                    )
+                    self.connection.commit()
+                except (OSError, sqlite3.Error):
+                    logger.exception("Failed to open auto-retry queue at %s", queue_path)
+                    self.stats['errors'] += 1
+                    self._close_locked()
+
+        if self.enabled and self.connection is not None:
+            self.start()
+
+    def _close_locked(self):
+        if self.connection is not None:
+            try:
+                self.connection.close()
+            except sqlite3.Error:
+                pass
+        self.connection = None
+
+    def start(self):
+        stop_event = threading.Event()
+        executor = ThreadPoolExecutor(max_workers=self.workers,
+                                      thread_name_prefix='auto-retry')
+        thread = threading.Thread(target=self._run, args=(stop_event, executor),
+                                  name='auto-retry-dispatcher', daemon=True)
+        with self.lock:
+            self.stop_event, self.executor, self.thread = stop_event, executor, thread
+        thread.start()
+
+    def stop(self):
+        """Stop dispatching and wait for in-flight resends to finish."""
+        self._retire(wait=True)
+
+    def _retire(self, wait):
+        """Detach the running dispatcher and pool and shut them down.
+
+        In-flight scans stay in ``inflight`` until their worker finishes, so a
+        successor started meanwhile neither re-dispatches them nor exceeds the
+        worker budget.
+        """
+        with self.lock:
+            stop_event, thread, executor = self.stop_event, self.thread, self.executor
+            self.stop_event = threading.Event()
+            self.thread = None
+            self.executor = None
+        stop_event.set()
+
+        def finish():
+            if thread and thread.is_alive():
+                thread.join(timeout=5 if wait else None)
+            if executor is not None:
+                executor.shutdown(wait=True, cancel_futures=True)
+
+        if wait:
+            finish()
+        elif thread or executor:
+            threading.Thread(target=finish, name='auto-retry-retire', daemon=True).start()
+
+    def close(self):
+        self.stop()
+        with self.lock:
+            self._close_locked()
+
+    def _execute(self, sql, parameters=()):
+        with self.lock:
+            if self.connection is None:
+                return None
+            with self.connection:
+                return self.connection.execute(sql, parameters)
+
+    def enqueue(self, id_scans, log_file=None, revive=False):
+        """Queue scans for retry; returns how many were added or revived.
+
+        Scans already queued are left alone. ``revive`` also resets scans
+        that previously ran out of attempts.
+        """
+        now = time.time()
+        conflict_clause = 'DO NOTHING'
+        if revive:
+            conflict_clause = (
+                "DO UPDATE SET state = 'pending', attempts = 0, "
+                "next_attempt_at = excluded.next_attempt_at, "
+                "updated_at = excluded.updated_at, last_error = NULL "
+                "WHERE retry_queue.state = 'abandoned'"
+            )
+        added = 0
+        with self.lock:
+            if self.connection is None:
+                return 0
+            with self.connection:
+                for id_scan in id_scans:
+                    cursor = self.connection.execute(
+                        'INSERT INTO retry_queue '
+                        '(id_scan, log_file, next_attempt_at, enqueued_at, updated_at) '
+                        f'VALUES (?, ?, ?, ?, ?) ON CONFLICT (id_scan) {conflict_clause}',
+                        (id_scan, log_file, now, now, now)
+                    )
+                    added += cursor.rowcount
+            self.stats['enqueued'] += added
+        return added
+
+    def sweep(self):
+        """Enqueue every scan currently reported as NOK."""
+        entries = log_parser.get_all_data(status_filter='NOK')
+        added = self.enqueue(entry['id_scan'] for entry in entries if entry.get('id_scan'))
+        with self.lock:
+            self.stats['sweeps'] += 1
+            self.last_sweep = time.time()
+        return added
+
+    @staticmethod
+    def backoff_delay(attempts):
+        """Exponential backoff with +/-20% jitter, capped at the max delay."""
+        delay = min(AUTO_RETRY_MAX_DELAY, AUTO_RETRY_BASE_DELAY * (2 ** max(0, attempts - 1)))
+        return delay * random.uniform(0.8, 1.2)
+
+    def _run(self, stop_event, executor):
+        next_sweep = time.monotonic()
+        while not stop_event.is_set():
+            try:
+                if time.monotonic() >= next_sweep:
+                    next_sweep = time.monotonic() + AUTO_RETRY_SWEEP_INTERVAL
+                    self.sweep()
+                self._dispatch_due(stop_event, executor)
+            except Exception as exc:  # pragma: no cover - defensive logging
+                logger.exception("Auto-retry dispatcher error: %s", exc)
+                with self.lock:
+                    self.stats['errors'] += 1
+            stop_event.wait(AUTO_RETRY_POLL_INTERVAL)
+
+    def _dispatch_due(self, stop_event, executor):
+        self.breaker.hold('downstream_offline' if ftp_downstream_offline() else None)
+
+        try:
+            target_url = build_resend_url(app_settings.get('resend_server', ''),
+                                          app_settings.get('resend_endpoint', ''))
+        except ValueError as exc:
+            self.pause_reason = str(exc)
+            return
+        self.pause_reason = None
+
+        with self.lock:
+            free_slots = self.workers - len(self.inflight)
+            if free_slots <= 0 or self.connection is None:
+                return
+            placeholders = ','.join('?' * len(self.inflight))
+            inflight_clause = f'AND id_scan NOT IN ({placeholders}) ' if self.inflight else ''
+            rows = self.connection.execute(
+                "SELECT id_scan, log_file, attempts FROM retry_queue "
+                f"WHERE state = 'pending' AND next_attempt_at <= ? {inflight_clause}"
+                "ORDER BY next_attempt_at LIMIT ?",
+                (time.time(), *self.inflight, free_slots)
+            ).fetchall()
+
+        for id_scan, log_file, attempts in rows:
+            if stop_event.is_set() or not self.breaker.acquire():
+                break
+            with self.lock:
+                self.inflight.add(id_scan)
+            try:
+                future = executor.submit(self._process, id_scan, log_file, attempts,
+                                         target_url)
+            except RuntimeError:
+                # The pool was retired while this dispatcher was finishing.
+                self._forget_dispatch(id_scan)
+                break
+            future.add_done_callback(partial(self._dispatch_done, id_scan))
+
+    def _dispatch_done(self, id_scan, future):
+        # Retiring a pool cancels work that has not started yet.
+        if future.cancelled():
+            self._forget_dispatch(id_scan)
+
+    def _forget_dispatch(self, id_scan):
+        """Undo a dispatch whose work will never run."""
+        self.breaker.release()
+        with self.lock:
+            self.inflight.discard(id_scan)
+
+    def _process(self, id_scan, log_file, attempts, target_url):
+        try:
+            self._attempt(id_scan, log_file, attempts, target_url)
+        except Exception as exc:  # pragma: no cover - defensive logging
+            logger.exception("Auto-retry failed for %s: %s", id_scan, exc)
+            self.breaker.release()
+            with self.lock:
+                self.stats['errors'] += 1
+        finally:
+            with self.lock:
+                self.inflight.discard(id_scan)
+
+    def _attempt(self, id_scan, log_file, attempts, target_url):
+        spans = ResendSpans()
+        entry = log_parser.get_entry(id_scan, log_file)
+        spans.lap('lookup')
+        if not entry or entry.get('status') != 'NOK':
+            # Resolved elsewhere (manual resend, late upload) or gone.
+            self.breaker.release()
+            self._execute('DELETE FROM retry_queue WHERE id_scan = ?', (id_scan,))
+            with self.lock:
+                self.stats['resolved'] += 1
+            return
+
+        if not claim_resend(id_scan):
+            self.breaker.release()
+            self._execute('UPDATE retry_queue SET next_attempt_at = ?, updated_at = ? '
+                          'WHERE id_scan = ?',
+                          (time.time() + AUTO_RETRY_BASE_DELAY, time.time(), id_scan))
+            return
+        try:
+            body, status_code = execute_resend(copy.deepcopy(entry), log_file, target_url, spans)
+        finally:
+            release_resend(id_scan)
+
+        now = time.time()
+        with self.lock:
+            self.stats['attempts'] += 1
+            self.recent_outcomes.append(now)
+            while self.recent_outcomes and now - self.recent_outcomes[0] > AUTO_RETRY_THROUGHPUT_WINDOW:
+                self.recent_outcomes.popleft()
+
+        if body.get('success'):
+            self.breaker.record_success()
+            self._execute('DELETE FROM retry_queue WHERE id_scan = ?', (id_scan,))
+            with self.lock:
+                self.stats['succeeded'] += 1
+            return
+
+        attempts += 1
+        error_text = body.get('error') or body.get('response_text') or ''
+        # A missing payload will never succeed; everything else counts
+        # against the downstream.
+        retryable = status_code != 400
+        if retryable:
+            self.breaker.record_failure()
+        else:
+            self.breaker.release()
+
+        if not retryable or attempts >= self.max_attempts:
+            self._execute("UPDATE retry_queue SET state = 'abandoned', attempts = ?, "
+                          'updated_at = ?, last_http_status = ?, last_error = ? '
+                          'WHERE id_scan = ?',
+                          (attempts, now, body.get('status_code') or status_code,
+                           error_text[:MAX_REMOTE_RESPONSE_PREVIEW], id_scan))
+            with self.lock:
+                self.stats['failed'] += 1
+                self.stats['abandoned'] += 1
+            return
+
+        self._execute('UPDATE retry_queue SET attempts = ?, next_attempt_at = ?, '
+                      'updated_at = ?, last_http_status = ?, last_error = ? '
+                      'WHERE id_scan = ?',
+                      (attempts, now + self.backoff_delay(attempts), now,
+                       body.get('status_code') or status_code,
+                       error_text[:MAX_REMOTE_RESPONSE_PREVIEW], id_scan))
+        with self.lock:
+            self.stats['failed'] += 1
+
+    def list_items(self, state=None, limit=100):
+        sql = ('SELECT id_scan, log_file, state, attempts, next_attempt_at, enqueued_at, '
+               'updated_at, last_http_status, last_error FROM retry_queue ')
+        parameters = []
+        if state:
+            sql += 'WHERE state = ? '
+            parameters.append(state)
+        sql += 'ORDER BY next_attempt_at LIMIT ?'
+        parameters.append(limit)
+        columns = ('id_scan', 'log_file', 'state', 'attempts', 'next_attempt_at',
+                   'enqueued_at', 'updated_at', 'last_http_status', 'last_error')
+        with self.lock:
+            if self.connection is None:
+                return []
+            rows = self.connection.execute(sql, parameters).fetchall()
+        return [dict(zip(columns, row)) for row in rows]
+
+    def get_stats(self):
+        with self.lock:
+            depth = {'pending': 0, 'abandoned': 0}
+            next_attempt_at = None
+            if self.connection is not None:
+                for state, count in self.connection.execute(
+                        'SELECT state, COUNT(*) FROM retry_queue GROUP BY state'):
+                    depth[state] = count
+                next_attempt_at = self.connection.execute(
+                    "SELECT MIN(next_attempt_at) FROM retry_queue WHERE state = 'pending'"
+                ).fetchone()[0]
+            now = time.time()
+            recent = sum(1 for stamp in self.recent_outcomes
+                         if now - stamp <= AUTO_RETRY_THROUGHPUT_WINDOW)
+            stats = {
+                'enabled': self.enabled,
+                'running': bool(self.thread and self.thread.is_alive()),
+                'workers': self.workers,
+                'max_attempts': self.max_attempts,
+                'inflight': len(self.inflight),
+                'depth': depth,
+                'next_attempt_at': next_attempt_at,
+                'last_sweep': self.last_sweep,
+                'pause_reason': self.pause_reason,
+                'attempts_per_minute': round(recent * 60.0 / AUTO_RETRY_THROUGHPUT_WINDOW, 2),
+                'counters': dict(self.stats),
+                'path': self.path
+            }
+        stats['breaker'] = self.breaker.get_stats()
+        return stats
+
+
+auto_retry_queue = AutoRetryQueue()
+auto_retry_queue.configure(app_settings)
+atexit.register(auto_retry_queue.close)
+
+
+@app.route('/api/retry-queue')
+def get_retry_queue():
+    """API endpoint exposing auto-retry depth, throughput and breaker state."""
+    stats = auto_retry_queue.get_stats()
+    state_filter = request.args.get('state') or None
+    try:
+        limit = min(1000, max(0, int(request.args.get('limit', 100))))
+    except (TypeError, ValueError):
+        return jsonify({'error': 'limit must be an integer'}), 400
+    stats['items'] = auto_retry_queue.list_items(state_filter, limit) if limit else []
+    return jsonify(stats)
+
+
+@app.route('/api/retry-queue', methods=['POST'])
+def enqueue_retry():
+    """API endpoint to queue scans for automatic retry.
+
+    Send ``{"id_scans": [...]}`` to queue (or revive) specific scans, or
+    ``{"sweep": true}`` to queue every current NOK scan.
+    """
+    request_payload = request.get_json(silent=True) or {}
+    if not isinstance(request_payload, dict):
+        return jsonify({'error': 'Invalid JSON payload'}), 400
+
+    id_scans = request_payload.get('id_scans')
+    if id_scans is not None:
+        if not isinstance(id_scans, list):
+            return jsonify({'error': 'id_scans must be a list'}), 400
+        id_scans = [str(value).strip() for value in id_scans if str(value or '').strip()]
+        added = auto_retry_queue.enqueue(
+            id_scans, normalize_log_file_param(request_payload.get('log_file')), revive=True)
+    elif request_payload.get('sweep'):
+        added = auto_retry_queue.sweep()
+    else:
+        return jsonify({'error': 'Provide id_scans or sweep'}), 400
+
+    return jsonify({'added': added, 'queue': auto_retry_queue.get_stats()})
+
+
+@app.route('/api/retry-queue/breaker/reset', methods=['POST'])
+def reset_retry_breaker():
+    """API endpoint to close the auto-retry circuit breaker manually."""
+    auto_retry_queue.breaker.reset()
+    return jsonify(auto_retry_queue.breaker.get_stats())
+
+
+@app.route('/api/resend/pool-stats')
+def get_resend_pool_stats():
+    """API endpoint exposing resend connection pool and outcome log counters."""
+    stats = resend_sessions.get_stats()
+    stats['outcome_log'] = resend_log_writer.get_stats()
+    stats['ledger'] = resend_ledger.get_stats()
+    return jsonify(stats)
+
+
+@app.route('/api/resend/telemetry')
+def get_resend_telemetry():
+    """API endpoint exposing per-target resend phase latencies and outcome rates."""
+    target = request.args.get('target')
+    target = str(target).strip() if target else None
+    return jsonify({
+        'phases': list(RESEND_PHASES),
+        'windows_seconds': list(RESEND_TELEMETRY_WINDOWS),
+        'targets': resend_telemetry.snapshot(target)
+    })
+
+
+@app.route('/api/entry/<id_scan>/lines')
+def get_entry_lines(id_scan):
+    """API endpoint returning the raw log trail for one scan."""
+    id_scan = str(id_scan or '').strip()
+    if not id_scan:
+        return jsonify({'error': 'id_scan is required'}), 400
+
+    log_file = normalize_log_file_param(request.args.get('log_file'))
+    lines = log_parser.get_scan_trail(id_scan, log_file)
+
+    return jsonify({
+        'id_scan': id_scan,
+        'lines': lines,
+        'total': len(lines),
+        'truncated': len(lines) >= MAX_ENTRY_TRAIL_LINES
     })
 
 
@@ -1639,6 +5225,7 @@ def get_log_files():
 
 
 @app.route('/api/stats')
+@admission_controlled('scan')
 def get_stats():
     """API endpoint to get statistics"""
     all_data = log_parser.get_all_data()
@@ -1671,91 +5258,706 @@ def get_stats():
     })
 
 
-@app.route('/api/export/excel')
-def export_excel():
-    """API endpoint to export data to Excel"""
-    status_filter = request.args.get('status', 'OK')
-    search_term = request.args.get('search')
-    log_file = request.args.get('log_file')
-    fields_param = request.args.get('fields')
-
-    data = log_parser.get_all_data(status_filter, search_term, log_file)
-
-    column_definitions = [
-        ('id_scan', 'ID Scan'),
-        ('container_no', 'Nomor Container'),
-        ('scan_time', 'Jam Scan'),
-        ('update_time', 'Jam Update'),
-        ('time_difference', 'Selisih Waktu'),
-        ('image_count', 'Jumlah Gambar'),
-        ('status', 'Status'),
-        ('error_description', 'Deskripsi Error')
-    ]
-    column_map = {key: label for key, label in column_definitions}
-    default_fields = [key for key, _ in column_definitions if key != 'error_description']
-
+EXPORT_COLUMN_DEFINITIONS = [
+    ('id_scan', 'ID Scan'),
+    ('container_no', 'Nomor Container'),
+    ('scan_time', 'Jam Scan'),
+    ('update_time', 'Jam Update'),
+    ('time_difference', 'Selisih Waktu'),
+    ('image_count', 'Jumlah Gambar'),
+    ('status', 'Status'),
+    ('error_description', 'Deskripsi Error')
+]
+EXPORT_COLUMN_MAP = {key: label for key, label in EXPORT_COLUMN_DEFINITIONS}
+EXPORT_DEFAULT_FIELDS = [key for key, _ in EXPORT_COLUMN_DEFINITIONS
+                         if key != 'error_description']
+EXPORT_MAX_COLUMN_WIDTH = 50
+XLSX_MIMETYPE = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+EXPORT_PROGRESS_INTERVAL = 1000
+EXPORT_STREAM_CHUNK_ROWS = 500
+EXPORT_JOB_WORKERS = 2
+EXPORT_JOB_QUEUE_LIMIT = 8
+EXPORT_CACHE_MAX_AGE = 30 * 60
+EXPORT_CACHE_MAX_BYTES = 512 * 1024 * 1024
+
+
+def resolve_export_fields(fields_param):
+    """Return the requested export fields in order, or the defaults."""
     requested_fields = []
     if fields_param:
         for field in fields_param.split(','):
             field_key = field.strip()
-            if field_key and field_key in column_map and field_key not in requested_fields:
+            if field_key and field_key in EXPORT_COLUMN_MAP and field_key not in requested_fields:
                 requested_fields.append(field_key)
 
-    if not requested_fields:
-        requested_fields = default_fields
+    return requested_fields or list(EXPORT_DEFAULT_FIELDS)
 
-    headers = [column_map[field] for field in requested_fields]
 
-    wb = Workbook()
-    ws = wb.active
+def export_cell_value(entry, field):
+    value = entry.get(field, '')
+    return '' if value is None else value
+
+
+def write_excel_export(data, fields, status_filter, output, progress_callback=None):
+    """Write entries to ``output`` as an xlsx workbook in a single streaming pass.
+
+    Uses openpyxl's write-only mode so rows are serialized as they are
+    appended instead of being held as cell objects. Write-only sheets emit
+    column widths before the first row, so widths come from a running max
+    over the source values rather than re-reading written cells.
+    """
+    headers = [EXPORT_COLUMN_MAP[field] for field in fields]
+
+    column_widths = [len(header) for header in headers]
+    for entry in data:
+        for col_index, field in enumerate(fields):
+            length = len(str(export_cell_value(entry, field)))
+            if length > column_widths[col_index]:
+                column_widths[col_index] = length
+
+    wb = Workbook(write_only=True)
     if status_filter:
         sheet_title = f"Transmission {status_filter.upper()} Data"
     else:
         sheet_title = 'Transmission Log Data'
-    ws.title = sheet_title[:31]
+    ws = wb.create_sheet(title=sheet_title[:31])
+
+    for col_index, width in enumerate(column_widths, 1):
+        ws.column_dimensions[get_column_letter(col_index)].width = min(
+            width + 2, EXPORT_MAX_COLUMN_WIDTH)
 
     header_font = Font(bold=True, color='FFFFFF')
     header_fill = PatternFill(start_color='366092', end_color='366092', fill_type='solid')
     header_alignment = Alignment(horizontal='center', vertical='center')
 
-    for col_index, header in enumerate(headers, 1):
-        cell = ws.cell(row=1, column=col_index, value=header)
+    header_cells = []
+    for header in headers:
+        cell = WriteOnlyCell(ws, value=header)
         cell.font = header_font
         cell.fill = header_fill
         cell.alignment = header_alignment
+        header_cells.append(cell)
+    ws.append(header_cells)
 
-    for row_index, entry in enumerate(data, 2):
-        for col_index, field in enumerate(requested_fields, 1):
-            value = entry.get(field, '')
-            if value is None:
-                value = ''
-            ws.cell(row=row_index, column=col_index, value=value)
-
-    for col_index in range(1, len(headers) + 1):
-        column_letter = get_column_letter(col_index)
-        max_length = 0
-        for row_index in range(1, len(data) + 2):
-            cell_value = ws[f"{column_letter}{row_index}"].value
-            if cell_value is not None:
-                max_length = max(max_length, len(str(cell_value)))
-        ws.column_dimensions[column_letter].width = min(max_length + 2, 50)
-
-    temp_file = tempfile.NamedTemporaryFile(delete=False, suffix='.xlsx')
-    wb.save(temp_file.name)
-    temp_file.close()
+    total_rows = len(data)
+    for row_count, entry in enumerate(data, 1):
+        ws.append([export_cell_value(entry, field) for field in fields])
+        if progress_callback and not row_count % EXPORT_PROGRESS_INTERVAL:
+            progress_callback(row_count, total_rows)
 
+    wb.save(output)
+    if progress_callback:
+        progress_callback(total_rows, total_rows)
+
+
+def build_export_filename(status_filter, extension):
     timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
     filename_status = (status_filter or 'all').lower()
-    filename = f"transmission_log_{filename_status}_{timestamp}.xlsx"
+    return f"transmission_log_{filename_status}_{timestamp}.{extension}"
+
+
+class ExportJobManager:
+    """Run Excel exports on a small worker pool and cache the finished files.
+
+    Finished files are keyed by filters, fields and the log snapshot they were
+    built from, so repeating an export against unchanged logs reuses the
+    existing file. Files are evicted once they exceed the age or total size
+    budget.
+    """
+
+    def __init__(self, max_workers=EXPORT_JOB_WORKERS,
+                 max_age=EXPORT_CACHE_MAX_AGE, max_bytes=EXPORT_CACHE_MAX_BYTES):
+        self.lock = threading.Lock()
+        self.max_workers = max_workers
+        self.max_age = max_age
+        self.max_bytes = max_bytes
+        self.executor = None
+        self.export_dir = None
+        self.jobs = {}
+        self.jobs_by_key = {}
+
+    def _ensure_started(self):
+        if self.executor is None:
+            self.executor = ThreadPoolExecutor(max_workers=self.max_workers,
+                                               thread_name_prefix='export-job')
+        if self.export_dir is None or not os.path.isdir(self.export_dir):
+            self.export_dir = tempfile.mkdtemp(prefix='transmission_exports_')
+
+    def submit(self, parser, status_filter, search_term, log_file, fields):
+        """Queue an export or return an existing job for the same snapshot.
+
+        Returns a ``(job_snapshot, created)`` tuple, or ``(None, False)`` when
+        the queue is full.
+        """
+        cache_key = (parser.logs_dir, status_filter, search_term, log_file,
+                     tuple(fields), parser.get_directory_signature())
+
+        with self.lock:
+            self._evict_locked()
+            existing_id = self.jobs_by_key.get(cache_key)
+            existing = self.jobs.get(existing_id) if existing_id else None
+            if existing and existing['status'] in ('queued', 'running', 'completed'):
+                existing['last_access'] = time.time()
+                return self._public_view(existing), False
+
+            pending = sum(1 for job in self.jobs.values()
+                          if job['status'] in ('queued', 'running'))
+            if pending >= EXPORT_JOB_QUEUE_LIMIT:
+                return None, False
+
+            self._ensure_started()
+            job_id = uuid.uuid4().hex
+            now = time.time()
+            job = {
+                'id': job_id,
+                'status': 'queued',
+                'phase': 'queued',
+                'rows_written': 0,
+                'total_rows': None,
+                'progress': 0.0,
+                'error': None,
+                'created_at': now,
+                'finished_at': None,
+                'last_access': now,
+                'size': 0,
+                'file_path': None,
+                'download_name': build_export_filename(status_filter, 'xlsx'),
+                'cache_key': cache_key
+            }
+            self.jobs[job_id] = job
+            self.jobs_by_key[cache_key] = job_id
+            self.executor.submit(self._run, job_id, parser, status_filter,
+                                 search_term, log_file, list(fields))
+            return self._public_view(job), True
+
+    def _update(self, job_id, **changes):
+        with self.lock:
+            job = self.jobs.get(job_id)
+            if job:
+                job.update(changes)
+
+    def _run(self, job_id, parser, status_filter, search_term, log_file, fields):
+        # Jobs share the export admission slots with the streaming exports.
+        limiter = admission_limiters['export']
+        limiter.acquire_background()
+        try:
+            self._run_admitted(job_id, parser, status_filter, search_term,
+                               log_file, fields)
+        finally:
+            limiter.release()
+
+    def _run_admitted(self, job_id, parser, status_filter, search_term, log_file, fields):
+        self._update(job_id, status='running', phase='loading')
+        file_path = os.path.join(self.export_dir, f'{job_id}.xlsx')
+
+        def report_progress(rows_written, total_rows):
+            progress = rows_written / total_rows if total_rows else 1.0
+            self._update(job_id, rows_written=rows_written, total_rows=total_rows,
+                         progress=round(progress, 4))
+
+        try:
+            data = parser.get_all_data(status_filter, search_term, log_file)
+            self._update(job_id, phase='writing', total_rows=len(data))
+            with open(file_path, 'wb') as output:
+                write_excel_export(data, fields, status_filter, output,
+                                   progress_callback=report_progress)
+            size = os.path.getsize(file_path)
+        except Exception as exc:
+            logger.exception("Export job %s failed: %s", job_id, exc)
+            self._remove_file(file_path)
+            self._update(job_id, status='failed', phase='failed', error=str(exc),
+                         finished_at=time.time())
+            return
+
+        self._update(job_id, status='completed', phase='completed', progress=1.0,
+                     file_path=file_path, size=size, finished_at=time.time())
+        with self.lock:
+            self._evict_locked()
+
+    @staticmethod
+    def _remove_file(file_path):
+        if not file_path:
+            return True
+        try:
+            os.remove(file_path)
+        except FileNotFoundError:
+            pass
+        except OSError:
+            # Still being downloaded (Windows keeps open files locked).
+            return False
+        return True
+
+    def _drop_job_locked(self, job):
+        self.jobs.pop(job['id'], None)
+        if self.jobs_by_key.get(job['cache_key']) == job['id']:
+            del self.jobs_by_key[job['cache_key']]
+
+    def _evict_locked(self):
+        now = time.time()
+        finished = [job for job in self.jobs.values()
+                    if job['status'] in ('completed', 'failed')]
+
+        for job in finished:
+            if now - (job['finished_at'] or now) > self.max_age:
+                if self._remove_file(job['file_path']):
+                    self._drop_job_locked(job)
+
+        completed = sorted(
+            (job for job in self.jobs.values() if job['status'] == 'completed'),
+            key=lambda job: job['last_access']
+        )
+        total_bytes = sum(job['size'] for job in completed)
+        for job in completed:
+            if total_bytes <= self.max_bytes:
+                break
+            if self._remove_file(job['file_path']):
+                total_bytes -= job['size']
+                self._drop_job_locked(job)
+
+    def shutdown(self):
+        """Stop the worker pool and remove cached export files."""
+        with self.lock:
+            executor, self.executor = self.executor, None
+            export_dir, self.export_dir = self.export_dir, None
+            self.jobs.clear()
+            self.jobs_by_key.clear()
+        if executor:
+            executor.shutdown(wait=False)
+        if export_dir:
+            shutil.rmtree(export_dir, ignore_errors=True)
+
+    def get(self, job_id):
+        with self.lock:
+            job = self.jobs.get(job_id)
+            return self._public_view(job) if job else None
+
+    def get_file(self, job_id):
+        """Return (file_path, download_name) for a completed job, or None."""
+        with self.lock:
+            job = self.jobs.get(job_id)
+            if not job or job['status'] != 'completed':
+                return None
+            job['last_access'] = time.time()
+            return job['file_path'], job['download_name']
+
+    @staticmethod
+    def _public_view(job):
+        return {
+            'id': job['id'],
+            'status': job['status'],
+            'phase': job['phase'],
+            'progress': job['progress'],
+            'rows_written': job['rows_written'],
+            'total_rows': job['total_rows'],
+            'error': job['error'],
+            'size': job['size'],
+            'download_name': job['download_name'],
+            'created_at': format_utc_timestamp(job['created_at']),
+            'finished_at': (format_utc_timestamp(job['finished_at'])
+                            if job['finished_at'] else None),
+            'file_url': (f"/api/exports/{job['id']}/file"
+                         if job['status'] == 'completed' else None)
+        }
+
+
+export_jobs = ExportJobManager()
+atexit.register(export_jobs.shutdown)
+
+
+@app.route('/api/exports', methods=['POST'])
+def create_export_job():
+    """API endpoint to queue a background Excel export."""
+    payload = request.get_json(silent=True) or {}
+    if not isinstance(payload, dict):
+        return jsonify({'error': 'Invalid JSON payload'}), 400
+
+    status_filter = payload.get('status', 'OK') or None
+    search_term = payload.get('search') or None
+    log_file = payload.get('log_file') or None
+    fields = payload.get('fields')
+    if isinstance(fields, list):
+        fields = ','.join(str(field) for field in fields)
+    requested_fields = resolve_export_fields(fields)
+
+    job, created = export_jobs.submit(log_parser, status_filter, search_term,
+                                      log_file, requested_fields)
+    if job is None:
+        return service_unavailable('Too many exports are queued, please retry shortly',
+                                   DEFAULT_ADMISSION_QUEUE_TIMEOUT)
+
+    return jsonify(job), 202 if created else 200
+
+
+@app.route('/api/exports/<job_id>')
+def get_export_job(job_id):
+    """API endpoint to report background export progress."""
+    job = export_jobs.get(job_id)
+    if not job:
+        return jsonify({'error': 'Export job not found'}), 404
+    return jsonify(job)
+
+
+@app.route('/api/exports/<job_id>/file')
+def download_export_job(job_id):
+    """API endpoint to download a finished background export."""
+    result = export_jobs.get_file(job_id)
+    if not result:
+        return jsonify({'error': 'Export file is not available'}), 404
+
+    file_path, download_name = result
+    try:
+        return send_file(
+            file_path,
+            as_attachment=True,
+            download_name=download_name,
+            mimetype=XLSX_MIMETYPE
+        )
+    except FileNotFoundError:
+        return jsonify({'error': 'Export file is not available'}), 404
+
+
+@app.route('/api/export/excel')
+@admission_controlled('export')
+def export_excel():
+    """API endpoint to export data to Excel"""
+    status_filter = request.args.get('status', 'OK')
+    search_term = request.args.get('search')
+    log_file = request.args.get('log_file')
+    requested_fields = resolve_export_fields(request.args.get('fields'))
+
+    data = log_parser.get_all_data(status_filter, search_term, log_file)
+
+    # An anonymous temporary file is removed as soon as it is closed, which
+    # send_file does once the response has been streamed to the client.
+    output = tempfile.TemporaryFile(suffix='.xlsx')
+    try:
+        write_excel_export(data, requested_fields, status_filter, output)
+        output.seek(0)
+    except Exception:
+        output.close()
+        raise
 
     return send_file(
-        temp_file.name,
+        output,
         as_attachment=True,
-        download_name=filename,
-        mimetype='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+        download_name=build_export_filename(status_filter, 'xlsx'),
+        mimetype=XLSX_MIMETYPE
     )
 
 
+def iter_csv_export(data, fields):
+    """Yield CSV text in chunks of rows without building the whole document."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow([EXPORT_COLUMN_MAP[field] for field in fields])
+
+    for row_count, entry in enumerate(data, 1):
+        writer.writerow([export_cell_value(entry, field) for field in fields])
+        if not row_count % EXPORT_STREAM_CHUNK_ROWS:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate(0)
+
+    yield buffer.getvalue()
+
+
+def iter_ndjson_export(data, fields):
+    """Yield one JSON object per line, batched into chunks of rows."""
+    lines = []
+    for entry in data:
+        lines.append(json.dumps(
+            {field: export_cell_value(entry, field) for field in fields},
+            ensure_ascii=False, default=str
+        ))
+        if len(lines) >= EXPORT_STREAM_CHUNK_ROWS:
+            yield '\n'.join(lines) + '\n'
+            lines = []
+
+    if lines:
+        yield '\n'.join(lines) + '\n'
+
+
+def stream_export(serializer, mimetype, extension):
+    """Build a streaming export response using the Excel export filters.
+
+    The rows are loaded before the response starts, under the request
+    deadline, so a failed parse still returns a 503 rather than a truncated
+    200. The filtered result list is held in memory; only its serialization
+    is streamed.
+    """
+    status_filter = request.args.get('status', 'OK')
+    search_term = request.args.get('search')
+    log_file = request.args.get('log_file')
+    requested_fields = resolve_export_fields(request.args.get('fields'))
+
+    data = log_parser.get_all_data(status_filter, search_term, log_file)
+
+    filename = build_export_filename(status_filter, extension)
+    return Response(
+        stream_with_context(serializer(data, requested_fields)),
+        mimetype=mimetype,
+        headers={'Content-Disposition': f'attachment; filename={filename}'}
+    )
+
+
+@app.route('/api/export/csv')
+@admission_controlled('export')
+def export_csv():
+    """API endpoint to stream filtered data as CSV"""
+    return stream_export(iter_csv_export, 'text/csv', 'csv')
+
+
+@app.route('/api/export/ndjson')
+@admission_controlled('export')
+def export_ndjson():
+    """API endpoint to stream filtered data as newline-delimited JSON"""
+    return stream_export(iter_ndjson_export, 'application/x-ndjson', 'ndjson')
+
+
+@app.route('/api/debug/parser-stats')
+def get_parser_stats():
+    """API endpoint exposing log parser coalescing counters."""
+    return jsonify({
+        'single_flight': log_data_single_flight.get_stats(),
+        'query_cache': query_result_cache.get_stats()
+    })
+
+
+@app.route('/api/debug/parse-profile')
+def get_parse_profile():
+    """API endpoint exposing per-line-category and per-function parse costs."""
+    return jsonify(parse_profiler.snapshot())
+
+
+@app.route('/api/debug/parse-profile', methods=['POST'])
+@admission_controlled('scan')
+def control_parse_profile():
+    """Enable, disable or reset parse profiling, or profile one fresh parse.
+
+    ``{"run": true}`` parses every log file once, bypassing the query cache,
+    and returns the profile of that parse alone; the cumulative totals are
+    left untouched. ``enabled`` always reports the global setting.
+    """
+    payload = request.get_json(silent=True) or {}
+    for key in ('enabled', 'reset', 'run'):
+        if key in payload and not isinstance(payload[key], bool):
+            return jsonify({'error': f'{key} must be true or false'}), 400
+
+    if payload.get('reset'):
+        parse_profiler.reset()
+    if 'enabled' in payload:
+        parse_profiler.enabled = payload['enabled']
+
+    if payload.get('run'):
+        # Profile only this parse; concurrent requests keep the current setting.
+        run_profiler = ParseProfiler(enabled=True)
+        log_parser._load_all_data(profiler=run_profiler)
+        profile = run_profiler.snapshot()
+        profile['enabled'] = parse_profiler.enabled
+        return jsonify(profile)
+
+    return jsonify(parse_profiler.snapshot())
+
+
+@app.route('/api/debug/admission')
+def get_admission_stats():
+    """API endpoint exposing admission control counters per endpoint group."""
+    return jsonify({
+        name: limiter.get_stats()
+        for name, limiter in admission_limiters.items()
+    })
+
+
+@app.before_request
+def start_request_metrics():
+    g.metrics_started = time.perf_counter()
+    request_metrics.begin_request()
+    if app_settings.get('server_timing_enabled', True) and request.path.startswith('/api/'):
+        start_server_timing()
+
+
+@app.after_request
+def record_request_metrics(response):
+    started = g.get('metrics_started')
+    if started is not None:
+        route = request.url_rule.rule if request.url_rule is not None else '<unmatched>'
+        request_metrics.observe_request(route, request.method, response.status_code,
+                                        time.perf_counter() - started)
+    timing = finish_server_timing()
+    if timing is not None:
+        response.headers['Server-Timing'] = timing.header_value()
+    return response
+
+
+@app.teardown_request
+def finish_request_metrics(exc):
+    # Runs even when a view raised, so the in-flight gauge cannot drift and a
+    # pooled worker thread does not carry timings into its next request.
+    finish_server_timing()
+    if g.pop('metrics_started', None) is not None:
+        request_metrics.end_request()
+
+
+def format_metric_labels(labels):
+    if not labels:
+        return ''
+    parts = []
+    for name, value in labels.items():
+        text = str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+        parts.append(f'{name}="{text}"')
+    return '{' + ','.join(parts) + '}'
+
+
+def format_metric_value(value):
+    if value is None:
+        return 'NaN'
+    if isinstance(value, bool):
+        return '1' if value else '0'
+    if isinstance(value, int):
+        return str(value)
+    return repr(float(value))
+
+
+class MetricsWriter:
+    """Accumulates Prometheus text exposition (format 0.0.4)."""
+
+    def __init__(self):
+        self.lines = []
+
+    def family(self, name, metric_type, help_text):
+        self.lines.append(f'# HELP {name} {help_text}')
+        self.lines.append(f'# TYPE {name} {metric_type}')
+
+    def sample(self, name, value, labels=None):
+        self.lines.append(f'{name}{format_metric_labels(labels)} {format_metric_value(value)}')
+
+    def histogram(self, name, histogram, labels=None):
+        labels = dict(labels or {})
+        cumulative = 0
+        for bound, count in zip(histogram['bounds'], histogram['counts']):
+            cumulative += count
+            self.sample(f'{name}_bucket', cumulative, dict(labels, le=repr(float(bound))))
+        cumulative += histogram['counts'][-1]
+        self.sample(f'{name}_bucket', cumulative, dict(labels, le='+Inf'))
+        self.sample(f'{name}_sum', histogram['sum'], labels)
+        self.sample(f'{name}_count', histogram['count'], labels)
+
+    def render(self):
+        return '\n'.join(self.lines) + '\n'
+
+
+def render_metrics():
+    """Collect request, parser, cache, FTP and resend counters as exposition text."""
+    writer = MetricsWriter()
+    snapshot = request_metrics.snapshot()
+
+    writer.family('transmission_http_requests_total', 'counter',
+                  'HTTP requests handled, by route, method and status code.')
+    for (route, method, status_code), count in sorted(snapshot['requests'].items()):
+        writer.sample('transmission_http_requests_total', count,
+                      {'route': route, 'method': method, 'status': status_code})
+
+    writer.family('transmission_http_request_duration_seconds', 'histogram',
+                  'Time from before_request to after_request, by route and method.')
+    for (route, method), histogram in sorted(snapshot['durations'].items()):
+        writer.histogram('transmission_http_request_duration_seconds', histogram,
+                         {'route': route, 'method': method})
+
+    writer.family('transmission_http_requests_in_flight', 'gauge',
+                  'Requests currently being handled.')
+    writer.sample('transmission_http_requests_in_flight', snapshot['in_flight'])
+
+    writer.family('transmission_log_parse_duration_seconds', 'histogram',
+                  'Time to parse one log file.')
+    writer.histogram('transmission_log_parse_duration_seconds', snapshot['parse_duration'])
+    for key, help_text in (('files', 'Log files parsed.'),
+                           ('lines', 'Log lines parsed.'),
+                           ('bytes', 'Bytes read while parsing log files.')):
+        name = f'transmission_log_parse_{key}_total'
+        writer.family(name, 'counter', help_text)
+        writer.sample(name, snapshot['parse_totals'][key])
+    writer.family('transmission_log_parse_lines_per_second', 'gauge',
+                  'Parse throughput of the most recent log file.')
+    writer.sample('transmission_log_parse_lines_per_second',
+                  snapshot['last_parse_lines_per_second'])
+
+    cache_stats = query_result_cache.get_stats()
+    for key, metric_type, help_text in (
+            ('hits', 'counter', 'Query result cache hits.'),
+            ('misses', 'counter', 'Query result cache misses.'),
+            ('evictions', 'counter', 'Query result cache evictions.'),
+            ('invalidations', 'counter', 'Query result cache entries dropped by a directory change.')):
+        name = f'transmission_query_cache_{key}_total'
+        writer.family(name, metric_type, help_text)
+        writer.sample(name, cache_stats[key])
+    writer.family('transmission_query_cache_hit_ratio', 'gauge',
+                  'Query result cache hits divided by lookups.')
+    writer.sample('transmission_query_cache_hit_ratio', cache_stats['hit_rate'])
+    writer.family('transmission_query_cache_entries', 'gauge', 'Cached query results.')
+    writer.sample('transmission_query_cache_entries', cache_stats['entries'])
+    writer.family('transmission_query_cache_bytes', 'gauge', 'Approximate size of cached results.')
+    writer.sample('transmission_query_cache_bytes', cache_stats['approx_bytes'])
+
+    flight_stats = log_data_single_flight.get_stats()
+    writer.family('transmission_parse_coalesced_total', 'counter',
+                  'Data loads that waited on an identical in-progress parse.')
+    writer.sample('transmission_parse_coalesced_total', flight_stats['coalesced'])
+
+    with ftp_status_lock:
+        ftp_statuses = copy.deepcopy(ftp_status_cache)
+    ftp_monitor.attach_latency(ftp_statuses)
+    writer.family('transmission_ftp_target_up', 'gauge',
+                  'Whether the last probe of an FTP target connected (1) or not (0).')
+    for status in ftp_statuses:
+        if status.get('host') and status.get('status') in ('online', 'offline'):
+            writer.sample('transmission_ftp_target_up', status['status'] == 'online',
+                          {'target': f"{status['host']}:{status['port']}"})
+    writer.family('transmission_ftp_connect_milliseconds', 'gauge',
+                  'TCP connect time of the last successful probe.')
+    for status in ftp_statuses:
+        if status.get('host') and status.get('connect_ms') is not None:
+            writer.sample('transmission_ftp_connect_milliseconds', status['connect_ms'],
+                          {'target': f"{status['host']}:{status['port']}"})
+    writer.family('transmission_ftp_probes_total', 'counter',
+                  'FTP connect probes, by target and result.')
+    for status in ftp_statuses:
+        latency = status.get('latency')
+        if status.get('host') and latency:
+            target = f"{status['host']}:{status['port']}"
+            writer.sample('transmission_ftp_probes_total', latency['count'],
+                          {'target': target, 'result': 'online'})
+            writer.sample('transmission_ftp_probes_total', latency['failures'],
+                          {'target': target, 'result': 'offline'})
+
+    pool_stats = resend_sessions.get_stats()
+    writer.family('transmission_resend_http_requests_total', 'counter',
+                  'POSTs sent to the resend server.')
+    writer.sample('transmission_resend_http_requests_total', pool_stats['requests'])
+    writer.family('transmission_resend_http_errors_total', 'counter',
+                  'POSTs to the resend server that raised a transport error.')
+    writer.sample('transmission_resend_http_errors_total', pool_stats['errors'])
+    writer.family('transmission_resend_outcomes_total', 'counter',
+                  'Resend attempts by target and outcome.')
+    for target, details in sorted(resend_telemetry.snapshot().items()):
+        for outcome, count in sorted(details['outcomes'].items()):
+            writer.sample('transmission_resend_outcomes_total', count,
+                          {'target': target, 'outcome': outcome})
+
+    retry_stats = auto_retry_queue.get_stats()
+    writer.family('transmission_retry_queue_depth', 'gauge',
+                  'Auto-retry queue items by state.')
+    for state, count in sorted(retry_stats['depth'].items()):
+        writer.sample('transmission_retry_queue_depth', count, {'state': state})
+
+    return writer.render()
+
+
+@app.route('/metrics')
+def get_metrics():
+    """Prometheus text exposition of request, parser, cache, FTP and resend metrics."""
+    return Response(render_metrics(), content_type='text/plain; version=0.0.4; charset=utf-8')
+
+
 @app.route('/api/settings')
 def get_settings():
     """API endpoint to get current settings"""
@@ -1767,11 +5969,175 @@ def get_ftp_status():
     """API endpoint to get cached FTP statuses."""
     with ftp_status_lock:
         status_snapshot = copy.deepcopy(ftp_status_cache)
+    ftp_monitor.attach_latency(status_snapshot)
 
     return jsonify({
         'statuses': status_snapshot,
         'ping_interval': app_settings.get('ftp_ping_interval',
-                                          DEFAULT_FTP_PING_INTERVAL)
+                                          DEFAULT_FTP_PING_INTERVAL),
+        'probe_counts': ftp_monitor.get_probe_counts()
+    })
+
+
+def parse_history_time(value, default_value):
+    """Parse epoch seconds or an ISO timestamp (UTC when no offset is given)."""
+    if value in (None, ''):
+        return default_value
+    try:
+        timestamp = float(value)
+    except (TypeError, ValueError):
+        text = str(value).strip().replace(' ', 'T')
+        if text.endswith('Z'):
+            text = text[:-1] + '+00:00'
+        try:
+            parsed = datetime.fromisoformat(text)
+        except ValueError:
+            raise ValueError(f'Invalid time value: {value}')
+        if parsed.tzinfo is None:
+            parsed = parsed.replace(tzinfo=timezone.utc)
+        return parsed.timestamp()
+    if not math.isfinite(timestamp):
+        raise ValueError(f'Invalid time value: {value}')
+    return timestamp
+
+
+def parse_history_resolution(value, span):
+    """Parse '90', '5m', '1h', '1d' or 'auto' into bucket seconds."""
+    text = str(value or 'auto').strip().lower()
+    if text == 'auto':
+        resolution = span / PING_HISTORY_AUTO_BUCKETS
+        for step in (60, 300, 900, 3600, 6 * 3600, 86400):
+            if resolution <= step:
+                return step
+        return math.ceil(resolution / 86400) * 86400
+    units = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400}
+    multiplier = units.get(text[-1:], None)
+    number = text[:-1] if multiplier else text
+    try:
+        resolution = int(float(number) * (multiplier or 1))
+    except (ValueError, OverflowError):
+        raise ValueError(f'Invalid resolution: {value}')
+    if resolution <= 0:
+        raise ValueError('Resolution must be positive')
+    if resolution > PING_HISTORY_MAX_SPAN:
+        raise ValueError(f'Resolution must be at most {PING_HISTORY_MAX_SPAN} seconds')
+    return resolution
+
+
+def summarize_ping_history(records, start, resolution, is_raw):
+    """Group raw probes or aggregates into uptime/latency buckets."""
+    buckets = {}
+    for record in records:
+        if is_raw:
+            timestamp, _, status_code, connect_ms = record
+            if status_code == PING_STATUS_CODES['unknown']:
+                continue
+            has_rtt = not math.isnan(connect_ms)
+            probes, online = 1, 1 if status_code == PING_STATUS_CODES['online'] else 0
+            rtt_count = 1 if has_rtt else 0
+            rtt_sum = rtt_min = rtt_max = connect_ms if has_rtt else 0.0
+        else:
+            timestamp, _, probes, online, rtt_count, rtt_sum, rtt_min, rtt_max = record
+        slot = int((timestamp - start) // resolution)
+        bucket = buckets.get(slot)
+        if bucket is None:
+            bucket = buckets[slot] = {'probes': 0, 'online': 0, 'rtt_count': 0,
+                                      'rtt_sum': 0.0, 'rtt_min': None, 'rtt_max': None}
+        bucket['probes'] += probes
+        bucket['online'] += online
+        bucket['rtt_count'] += rtt_count
+        bucket['rtt_sum'] += rtt_sum
+        if rtt_count:
+            bucket['rtt_min'] = rtt_min if bucket['rtt_min'] is None else min(bucket['rtt_min'], rtt_min)
+            bucket['rtt_max'] = rtt_max if bucket['rtt_max'] is None else max(bucket['rtt_max'], rtt_max)
+
+    series = []
+    totals = {'probes': 0, 'online': 0, 'rtt_count': 0, 'rtt_sum': 0.0}
+    for slot in sorted(buckets):
+        bucket = buckets[slot]
+        for key in totals:
+            totals[key] += bucket[key]
+        series.append({
+            'start': start + slot * resolution,
+            'probes': bucket['probes'],
+            'uptime_pct': round(100.0 * bucket['online'] / bucket['probes'], 2)
+            if bucket['probes'] else None,
+            'rtt_avg_ms': round(bucket['rtt_sum'] / bucket['rtt_count'], 2)
+            if bucket['rtt_count'] else None,
+            'rtt_min_ms': round(bucket['rtt_min'], 2) if bucket['rtt_min'] is not None else None,
+            'rtt_max_ms': round(bucket['rtt_max'], 2) if bucket['rtt_max'] is not None else None
+        })
+
+    summary = {
+        'probes': totals['probes'],
+        'uptime_pct': round(100.0 * totals['online'] / totals['probes'], 2)
+        if totals['probes'] else None,
+        'rtt_avg_ms': round(totals['rtt_sum'] / totals['rtt_count'], 2)
+        if totals['rtt_count'] else None
+    }
+    return series, summary
+
+
+@app.route('/api/ftp-status/history')
+def get_ftp_status_history():
+    """API endpoint returning bucketed FTP uptime and latency history.
+
+    Query parameters: ``target`` (``host:port``; all targets when omitted),
+    ``from``/``to`` (epoch seconds or ISO timestamps, default the last 24 h)
+    and ``resolution`` (``auto``, seconds, or ``5m``/``1h``/``1d`` style).
+    """
+    try:
+        end = parse_history_time(request.args.get('to'), time.time())
+        start = parse_history_time(request.args.get('from'), end - PING_HISTORY_DEFAULT_SPAN)
+        if start >= end:
+            raise ValueError('from must be earlier than to')
+        if end - start > PING_HISTORY_MAX_SPAN:
+            raise ValueError(f'Requested range must be at most {PING_HISTORY_MAX_SPAN} seconds')
+        resolution = parse_history_resolution(request.args.get('resolution'), end - start)
+    except ValueError as exc:
+        return jsonify({'error': str(exc)}), 400
+
+    # Align buckets to whole multiples of the resolution.
+    start = start - start % resolution
+    if (end - start) / resolution > PING_HISTORY_MAX_BUCKETS:
+        return jsonify({
+            'error': f'Requested range needs more than {PING_HISTORY_MAX_BUCKETS} buckets; '
+                     'use a coarser resolution'
+        }), 400
+
+    if resolution >= PING_HISTORY_TIER_SECONDS['hour'] and not resolution % 3600:
+        tier_name = 'hour'
+    elif resolution >= PING_HISTORY_TIER_SECONDS['minute'] and not resolution % 60:
+        tier_name = 'minute'
+    else:
+        tier_name = 'raw'
+
+    known_targets = ping_history.get_targets()
+    target_filter = (request.args.get('target') or '').strip()
+    if target_filter:
+        if target_filter not in known_targets:
+            return jsonify({'error': f'No history for target {target_filter}'}), 404
+        known_targets = {target_filter: known_targets[target_filter]}
+
+    started = time.perf_counter()
+    records_by_target = {}
+    target_filter_id = known_targets[target_filter] if target_filter else None
+    for record in ping_history.read_range(tier_name, start, end, target_filter_id):
+        records_by_target.setdefault(record[1], []).append(record)
+
+    targets = []
+    for target_key, target_id in sorted(known_targets.items(), key=lambda item: item[1]):
+        series, summary = summarize_ping_history(
+            records_by_target.get(target_id, []), start, resolution, tier_name == 'raw')
+        targets.append({'target': target_key, 'summary': summary, 'buckets': series})
+
+    return jsonify({
+        'from': start,
+        'to': end,
+        'resolution': resolution,
+        'source': tier_name,
+        'targets': targets,
+        'query_ms': round((time.perf_counter() - started) * 1000.0, 2)
     })
 
 
@@ -1785,7 +6151,7 @@ def ping_ftp_status():
         return jsonify({'error': 'Failed to poll FTP status'}), 500
 
     return jsonify({
-        'statuses': statuses,
+        'statuses': ftp_monitor.attach_latency(statuses),
         'ping_interval': app_settings.get('ftp_ping_interval',
                                           DEFAULT_FTP_PING_INTERVAL)
     })
@@ -1853,6 +6219,66 @@ def update_settings():
                 new_settings['resend_endpoint'] or ''
             ).strip()
 
+        for cache_key, cache_label in (('query_cache_max_entries', 'Query cache entry limit'),
+                                       ('query_cache_max_mb', 'Query cache size limit')):
+            if cache_key in new_settings:
+                try:
+                    cache_value = int(new_settings[cache_key])
+                except (TypeError, ValueError):
+                    return jsonify({'error': f'{cache_label} must be a positive integer'}), 400
+                if cache_value <= 0:
+                    return jsonify({'error': f'{cache_label} must be a positive integer'}), 400
+                sanitized_settings[cache_key] = cache_value
+
+        for limit_key, limit_label, minimum in (
+                ('max_concurrent_scans', 'Concurrent scan limit', 1),
+                ('max_concurrent_exports', 'Concurrent export limit', 1),
+                ('admission_queue_size', 'Admission queue size', 0),
+                ('admission_queue_timeout', 'Admission queue timeout', 1),
+                ('request_deadline_seconds', 'Request deadline', 1)):
+            if limit_key in new_settings:
+                try:
+                    limit_value = int(new_settings[limit_key])
+                except (TypeError, ValueError):
+                    limit_value = None
+                if limit_value is None or limit_value < minimum:
+                    return jsonify({
+                        'error': f'{limit_label} must be an integer of at least {minimum}'
+                    }), 400
+                sanitized_settings[limit_key] = limit_value
+
+        if 'auto_retry_enabled' in new_settings:
+            if not isinstance(new_settings['auto_retry_enabled'], bool):
+                return jsonify({'error': 'auto_retry_enabled must be true or false'}), 400
+            sanitized_settings['auto_retry_enabled'] = new_settings['auto_retry_enabled']
+
+        if 'server_timing_enabled' in new_settings:
+            if not isinstance(new_settings['server_timing_enabled'], bool):
+                return jsonify({'error': 'server_timing_enabled must be true or false'}), 400
+            sanitized_settings['server_timing_enabled'] = new_settings['server_timing_enabled']
+
+        for retry_key, retry_label, maximum in (
+                ('auto_retry_workers', 'Auto-retry worker count', AUTO_RETRY_MAX_WORKERS),
+                ('auto_retry_max_attempts', 'Auto-retry attempt limit', None)):
+            if retry_key in new_settings:
+                try:
+                    retry_value = int(new_settings[retry_key])
+                except (TypeError, ValueError):
+                    retry_value = None
+                if retry_value is None or retry_value < 1 or (maximum and retry_value > maximum):
+                    limit_text = f'between 1 and {maximum}' if maximum else 'a positive integer'
+                    return jsonify({'error': f'{retry_label} must be {limit_text}'}), 400
+                sanitized_settings[retry_key] = retry_value
+
+        if 'resend_log_flush_policy' in new_settings:
+            flush_policy = str(new_settings['resend_log_flush_policy'] or '').strip().lower()
+            if flush_policy not in RESEND_LOG_FLUSH_POLICIES:
+                return jsonify({
+                    'error': 'Resend log flush policy must be one of: '
+                             + ', '.join(RESEND_LOG_FLUSH_POLICIES)
+                }), 400
+            sanitized_settings['resend_log_flush_policy'] = flush_policy
+
         if not sanitized_settings:
             return jsonify({'message': 'No settings were changed'}), 200
 
@@ -1860,7 +6286,8 @@ def update_settings():
             logs_dir = sanitized_settings['logs_directory']
             if app_settings.get('logs_directory') != logs_dir:
                 log_parser = LogParser(logs_dir)
-                configure_ping_logger(logs_dir)
+                ping_history.configure(logs_dir)
+                resend_ledger.configure(logs_dir)
                 settings_changed = True
 
         if 'auto_refresh_interval' in sanitized_settings:
@@ -1885,6 +6312,19 @@ def update_settings():
 
         app_settings.update(sanitized_settings)
 
+        if ('query_cache_max_entries' in sanitized_settings or
+                'query_cache_max_mb' in sanitized_settings):
+            configure_query_cache(app_settings)
+
+        configure_admission_limits(app_settings)
+        resend_sessions.configure(app_settings.get('resend_server', ''),
+                                  app_settings.get('resend_endpoint', ''))
+        resend_log_writer.configure(app_settings['resend_log_flush_policy'])
+        if any(key in sanitized_settings for key in ('logs_directory', 'auto_retry_enabled',
+                                                     'auto_retry_workers',
+                                                     'auto_retry_max_attempts')):
+            auto_retry_queue.configure(app_settings)
+
         if not save_settings(app_settings):
             return jsonify({'error': 'Failed to save settings'}), 500
 
@@ -1929,7 +6369,227 @@ def validate_directory():
     })
 
 
-def _extract_shutdown_token():
+def get_profile_directory():
+    return os.path.join(app_settings.get('logs_directory', 'logs'), PROFILE_DIRNAME)
+
+
+def prune_profile_directory(directory, keep=PROFILE_MAX_FILES):
+    """Delete all but the newest ``keep`` ``.pstats`` and ``.collapsed`` files.
+
+    Works from the files on disk, so profiles left by earlier runs are pruned
+    too. Returns the paths that were removed.
+    """
+    removed = []
+    for extension in ('.pstats', '.collapsed'):
+        candidates = []
+        try:
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    if entry.name.endswith(extension) and entry.is_file():
+                        candidates.append((entry.stat().st_mtime, entry.name, entry.path))
+        except OSError:
+            return removed
+        candidates.sort(reverse=True)
+        for _, _, path in candidates[keep:]:
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            removed.append(path)
+    return removed
+
+
+def profile_file_stamp():
+    return f"{datetime.now(timezone.utc):%Y%m%dT%H%M%S}"
+
+
+class RequestProfileStore:
+    """Runs single requests under ``cProfile`` and keeps the ``.pstats`` files.
+
+    Only one request is profiled at a time (from Python 3.12 cProfile hooks
+    are process-wide); others are served normally. The newest
+    ``PROFILE_MAX_FILES`` profiles (and, separately, sampler outputs) are
+    kept in the ``profiles`` folder of the logs directory.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.busy = threading.Lock()
+        self.profiles = OrderedDict()
+
+    def begin(self):
+        """Start profiling the current request, or return None if one is running."""
+        if not self.busy.acquire(blocking=False):
+            return None
+        profiler = cProfile.Profile()
+        profiler.enable()
+        return profiler
+
+    def abandon(self, profiler):
+        profiler.disable()
+        self.busy.release()
+
+    def finish(self, profiler, route, method, status_code, elapsed_ms):
+        profiler.disable()
+        try:
+            directory = get_profile_directory()
+            os.makedirs(directory, exist_ok=True)
+            profile_id = f"{profile_file_stamp()}-{uuid.uuid4().hex[:8]}"
+            path = os.path.join(directory, f'{profile_id}.pstats')
+            profiler.dump_stats(path)
+        finally:
+            self.busy.release()
+
+        record = {
+            'id': profile_id,
+            'route': route,
+            'method': method,
+            'status': status_code,
+            'elapsed_ms': round(elapsed_ms, 2),
+            'created_at': format_utc_timestamp(time.time()),
+            'path': path
+        }
+        with self.lock:
+            self.profiles[profile_id] = record
+            removed = set(prune_profile_directory(directory))
+            for stale_id in [key for key, stale in self.profiles.items()
+                             if stale['path'] in removed]:
+                del self.profiles[stale_id]
+        return record
+
+    def list_profiles(self):
+        with self.lock:
+            return [dict(record) for record in reversed(self.profiles.values())]
+
+    def get(self, profile_id):
+        with self.lock:
+            record = self.profiles.get(profile_id)
+            return dict(record) if record else None
+
+    @staticmethod
+    def summarize(path, sort_key='cumulative', limit=PROFILE_SUMMARY_LINES):
+        output = io.StringIO()
+        stats = pstats.Stats(path, stream=output)
+        stats.sort_stats(sort_key).print_stats(limit)
+        return output.getvalue()
+
+
+class StackSampler:
+    """Background ``sys._current_frames()`` sampler emitting collapsed stacks.
+
+    Every ``interval`` seconds the stack of each other thread is walked and
+    counted as ``thread;file:function;...`` (root first), the format
+    flamegraph.pl and speedscope read. The sampler stops itself after the
+    requested number of seconds and writes a ``.collapsed`` file next to the
+    request profiles.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.thread = None
+        self.stop_event = threading.Event()
+        self.counts = Counter()
+        self.state = {}
+
+    def start(self, seconds, interval):
+        with self.lock:
+            if self.thread and self.thread.is_alive():
+                raise RuntimeError('The sampling profiler is already running')
+            self.counts = Counter()
+            self.stop_event = threading.Event()
+            self.state = {
+                'running': True,
+                'seconds': seconds,
+                'interval': interval,
+                'started_at': format_utc_timestamp(time.time()),
+                'finished_at': None,
+                'samples': 0,
+                'sampling_seconds': 0.0,
+                'path': None
+            }
+            self.thread = threading.Thread(target=self._run, args=(seconds, interval, self.stop_event),
+                                           name='stack-sampler', daemon=True)
+            self.thread.start()
+            return dict(self.state)
+
+    def stop(self):
+        self.stop_event.set()
+        thread = self.thread
+        if thread:
+            thread.join(timeout=5)
+
+    @staticmethod
+    def _frame_label(frame):
+        code = frame.f_code
+        return f'{os.path.basename(code.co_filename)}:{code.co_name}'.replace(';', ':')
+
+    def _run(self, seconds, interval, stop_event):
+        own_ident = threading.get_ident()
+        deadline = time.monotonic() + seconds
+        started = time.monotonic()
+        while time.monotonic() < deadline and not stop_event.wait(interval):
+            sample_started = time.perf_counter()
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            stacks = []
+            for ident, frame in sys._current_frames().items():
+                if ident == own_ident:
+                    continue
+                labels = []
+                while frame is not None and len(labels) < SAMPLER_MAX_DEPTH:
+                    labels.append(self._frame_label(frame))
+                    frame = frame.f_back
+                labels.append(str(names.get(ident, f'thread-{ident}')).replace(';', ':'))
+                stacks.append(';'.join(reversed(labels)))
+            elapsed = time.perf_counter() - sample_started
+            with self.lock:
+                self.counts.update(stacks)
+                self.state['samples'] += 1
+                self.state['sampling_seconds'] += elapsed
+
+        path = None
+        try:
+            directory = get_profile_directory()
+            os.makedirs(directory, exist_ok=True)
+            path = os.path.join(directory, f"{profile_file_stamp()}-sampler.collapsed")
+            with open(path, 'w', encoding='utf-8') as handle:
+                handle.write(self.collapsed())
+            prune_profile_directory(directory)
+        except OSError as exc:
+            logger.warning("Failed to write sampling profile: %s", exc)
+            path = None
+
+        with self.lock:
+            wall_seconds = time.monotonic() - started
+            self.state.update({
+                'running': False,
+                'finished_at': format_utc_timestamp(time.time()),
+                'wall_seconds': round(wall_seconds, 3),
+                'path': path
+            })
+
+    def collapsed(self):
+        with self.lock:
+            return ''.join(f'{stack} {count}\n' for stack, count in sorted(self.counts.items()))
+
+    def get_status(self):
+        with self.lock:
+            status = dict(self.state)
+            status['distinct_stacks'] = len(self.counts)
+        if status.get('sampling_seconds') is not None:
+            # Share of one core spent walking stacks.
+            elapsed = status.get('wall_seconds') or max(
+                1e-9, status['samples'] * status['interval'])
+            status['overhead'] = round(status['sampling_seconds'] / elapsed, 5)
+            status['sampling_seconds'] = round(status['sampling_seconds'], 4)
+        return status
+
+
+request_profiles = RequestProfileStore()
+stack_sampler = StackSampler()
+atexit.register(stack_sampler.stop)
+
+
+def _extract_controller_token(allow_query=True):
     header_token = request.headers.get('X-Controller-Token')
     if header_token:
         return header_token
@@ -1938,19 +6598,164 @@ def _extract_shutdown_token():
     if isinstance(json_payload, dict) and 'token' in json_payload:
         return json_payload['token']
 
-    if 'token' in request.args:
+    if allow_query and 'token' in request.args:
         return request.args['token']
 
     return None
 
 
+def controller_token_valid():
+    expected_token = app.config.get('SHUTDOWN_TOKEN', SHUTDOWN_TOKEN)
+    if not expected_token:
+        return True
+    provided_token = _extract_controller_token()
+    return provided_token is not None and hmac.compare_digest(str(provided_token),
+                                                              str(expected_token))
+
+
+def profiling_access_error():
+    """Return a 403 response unless the request may use the profiling routes.
+
+    Profiles expose code paths and request timings, so unlike shutdown they
+    stay off until a non-default token is configured, and the token is only
+    accepted from the header or JSON body, never from a loggable query string.
+    """
+    expected_token = app.config.get('SHUTDOWN_TOKEN', SHUTDOWN_TOKEN)
+    if not expected_token or expected_token == DEFAULT_SHUTDOWN_TOKEN:
+        return jsonify({'error': 'Profiling is disabled until TRANSMISSION_SHUTDOWN_TOKEN '
+                                 'is set to a non-default value'}), 403
+    provided_token = _extract_controller_token(allow_query=False)
+    if provided_token is None or not hmac.compare_digest(str(provided_token),
+                                                         str(expected_token)):
+        return jsonify({'status': 'unauthorized'}), 403
+    return None
+
+
+def profile_requested():
+    return (request.headers.get('X-Profile', '').lower() == 'cprofile' or
+            request.args.get('__profile') in ('1', 'cprofile'))
+
+
+@app.before_request
+def start_request_profile():
+    if not profile_requested():
+        return None
+    access_error = profiling_access_error()
+    if access_error is not None:
+        return access_error
+    profiler = request_profiles.begin()
+    if profiler is None:
+        g.profile_status = 'busy'
+    else:
+        g.request_profiler = profiler
+        g.profile_started = time.perf_counter()
+    return None
+
+
+@app.after_request
+def finish_request_profile(response):
+    profiler = g.pop('request_profiler', None)
+    if profiler is not None:
+        route = request.url_rule.rule if request.url_rule is not None else '<unmatched>'
+        elapsed_ms = (time.perf_counter() - g.pop('profile_started')) * 1000.0
+        try:
+            record = request_profiles.finish(profiler, route, request.method,
+                                             response.status_code, elapsed_ms)
+        except OSError as exc:
+            logger.warning("Failed to store request profile: %s", exc)
+            response.headers['X-Profile-Status'] = 'error'
+        else:
+            response.headers['X-Profile-Id'] = record['id']
+            response.headers['X-Profile-Status'] = 'stored'
+    elif g.get('profile_status') == 'busy':
+        response.headers['X-Profile-Status'] = 'busy'
+    return response
+
+
+@app.teardown_request
+def abandon_request_profile(exc):
+    # A view that raised skips after_request; stop its profiler here.
+    profiler = g.pop('request_profiler', None)
+    if profiler is not None:
+        request_profiles.abandon(profiler)
+
+
+@app.route('/__controller__/profiles')
+def list_request_profiles():
+    """Internal endpoint listing stored single-request profiles."""
+    access_error = profiling_access_error()
+    if access_error is not None:
+        return access_error
+    return jsonify({'profiles': request_profiles.list_profiles()})
+
+
+@app.route('/__controller__/profiles/<profile_id>')
+def get_request_profile(profile_id):
+    """Download a stored ``.pstats`` file, or ``?format=text`` for a summary."""
+    access_error = profiling_access_error()
+    if access_error is not None:
+        return access_error
+    record = request_profiles.get(profile_id)
+    if not record or not os.path.exists(record['path']):
+        return jsonify({'error': 'Profile not found'}), 404
+
+    if request.args.get('format') == 'text':
+        sort_key = request.args.get('sort', 'cumulative')
+        if sort_key not in ('cumulative', 'tottime', 'ncalls'):
+            return jsonify({'error': 'sort must be cumulative, tottime or ncalls'}), 400
+        limit = sanitize_positive_int(request.args.get('limit'), PROFILE_SUMMARY_LINES)
+        return Response(request_profiles.summarize(record['path'], sort_key, limit),
+                        mimetype='text/plain')
+
+    return send_file(record['path'], as_attachment=True,
+                     download_name=os.path.basename(record['path']),
+                     mimetype='application/octet-stream')
+
+
+@app.route('/__controller__/sampler', methods=['GET', 'POST'])
+def control_stack_sampler():
+    """Start the sampling profiler (POST) or read its status and output (GET)."""
+    access_error = profiling_access_error()
+    if access_error is not None:
+        return access_error
+
+    if request.method == 'GET':
+        if request.args.get('format') == 'collapsed':
+            return Response(stack_sampler.collapsed(), mimetype='text/plain')
+        return jsonify(stack_sampler.get_status())
+
+    payload = request.get_json(silent=True) or {}
+    try:
+        seconds = float(payload.get('seconds', SAMPLER_DEFAULT_SECONDS))
+        interval = float(payload.get('interval', SAMPLER_DEFAULT_INTERVAL))
+    except (TypeError, ValueError):
+        return jsonify({'error': 'seconds and interval must be numbers'}), 400
+    if not (0 < seconds <= SAMPLER_MAX_SECONDS):
+        return jsonify({'error': f'seconds must be between 0 and {SAMPLER_MAX_SECONDS}'}), 400
+    if not (SAMPLER_MIN_INTERVAL <= interval <= 1):
+        return jsonify({'error': f'interval must be between {SAMPLER_MIN_INTERVAL} and 1 second'}), 400
+
+    try:
+        status = stack_sampler.start(seconds, interval)
+    except RuntimeError as exc:
+        return jsonify({'error': str(exc)}), 409
+    return jsonify(status), 202
+
+
+@app.route('/__controller__/sampler/stop', methods=['POST'])
+def stop_stack_sampler():
+    """Stop the sampling profiler early; its output so far is kept."""
+    access_error = profiling_access_error()
+    if access_error is not None:
+        return access_error
+    stack_sampler.stop()
+    return jsonify(stack_sampler.get_status())
+
+
 @app.route('/__controller__/shutdown', methods=['POST'])
 def controller_shutdown():
     """Internal endpoint invoked by the desktop controller to stop the server."""
-    expected_token = app.config.get('SHUTDOWN_TOKEN', SHUTDOWN_TOKEN)
-    provided_token = _extract_shutdown_token()
-
-    if expected_token and provided_token != expected_token:
+    if not controller_token_valid():
         return jsonify({'status': 'unauthorized'}), 403
 
     shutdown_event = app.config.get('SHUTDOWN_EVENT')
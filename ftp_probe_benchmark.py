@@ -0,0 +1,279 @@
+#!/usr/bin/env python3
+"""
+Benchmark sequential versus concurrent FTP connectivity probes.
+
+Starts local listeners that accept connections and "black-holed" listeners
+whose accept queue is already full (so further connects hang until the
+timeout), then times one poll with the old one-by-one connect loop against
+``probe_tcp_targets``.
+
+It then simulates a week of flapping outages to compare the fixed probe
+interval with ``AdaptiveProbeInterval``: probes per target-hour and the mean
+delay before an outage or recovery is observed.
+
+Finally ``probe_ftp_protocol`` is run against ``StandInFTPServer``, a small
+in-process FTP server that understands just enough of the protocol (login,
+NOOP, passive STOR, DELE) to time a real ftplib session, both with the right
+credentials and with a wrong password.
+
+Usage: python ftp_probe_benchmark.py [--healthy N] [--blackholed N] [--timeout S]
+                                     [--interval S] [--days N] [--upload-kb N]
+"""
+
+import argparse
+import bisect
+import math
+import random
+import socket
+import socketserver
+import threading
+import time
+
+from app import AdaptiveProbeInterval, probe_ftp_protocol, probe_tcp_targets
+
+
+def start_healthy_listener():
+    listener = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    listener.bind(('127.0.0.1', 0))
+    listener.listen(128)
+    return listener
+
+
+def start_blackholed_listener():
+    """Listen with a zero backlog and fill it so new SYNs are dropped."""
+    listener = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    listener.bind(('127.0.0.1', 0))
+    listener.listen(0)
+    fillers = []
+    address = listener.getsockname()
+    for _ in range(4):
+        filler = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        filler.setblocking(False)
+        try:
+            filler.connect(address)
+        except (BlockingIOError, OSError):
+            pass
+        fillers.append(filler)
+    time.sleep(0.2)
+    return listener, fillers
+
+
+def sequential_poll(targets, timeout):
+    results = []
+    for host, port in targets:
+        try:
+            with socket.create_connection((host, port), timeout=timeout):
+                results.append('online')
+        except OSError:
+            results.append('offline')
+    return results
+
+
+class _StandInFTPHandler(socketserver.StreamRequestHandler):
+    """One control connection; passive data connections are opened per STOR."""
+
+    def reply(self, line):
+        self.wfile.write(f'{line}\r\n'.encode('ascii'))
+
+    def handle(self):
+        server = self.server
+        user = None
+        authenticated = False
+        data_listener = None
+        self.reply('220 Stand-in FTP server ready')
+        for raw in self.rfile:
+            command, _, argument = raw.decode('utf-8', 'replace').strip().partition(' ')
+            command = command.upper()
+            if command == 'USER':
+                user = argument
+                self.reply('331 Password required')
+            elif command == 'PASS':
+                authenticated = (user, argument) == server.credentials
+                self.reply('230 Logged in' if authenticated else '530 Login incorrect')
+            elif command == 'QUIT':
+                self.reply('221 Bye')
+                break
+            elif not authenticated:
+                self.reply('530 Please login with USER and PASS')
+            elif command == 'NOOP':
+                self.reply('200 NOOP ok')
+            elif command == 'TYPE':
+                self.reply('200 Type set')
+            elif command == 'PASV':
+                data_listener = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+                data_listener.bind((server.server_address[0], 0))
+                data_listener.listen(1)
+                host, port = data_listener.getsockname()
+                address = ','.join(host.split('.') + [str(port >> 8), str(port & 0xFF)])
+                self.reply(f'227 Entering Passive Mode ({address})')
+            elif command == 'STOR' and data_listener is not None:
+                self.reply('150 Ready for data')
+                connection, _ = data_listener.accept()
+                chunks = []
+                with connection:
+                    while True:
+                        chunk = connection.recv(65536)
+                        if not chunk:
+                            break
+                        chunks.append(chunk)
+                data_listener.close()
+                data_listener = None
+                with server.files_lock:
+                    server.files[argument] = b''.join(chunks)
+                self.reply('226 Transfer complete')
+            elif command == 'DELE':
+                with server.files_lock:
+                    removed = server.files.pop(argument, None)
+                self.reply('250 Deleted' if removed is not None else '550 No such file')
+            else:
+                self.reply('502 Command not implemented')
+
+        if data_listener is not None:
+            data_listener.close()
+
+
+class StandInFTPServer(socketserver.ThreadingTCPServer):
+    """Minimal FTP server on localhost for exercising ``probe_ftp_protocol``."""
+
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, username='probe', password='secret'):
+        super().__init__(('127.0.0.1', 0), _StandInFTPHandler)
+        self.credentials = (username, password)
+        self.files = {}
+        self.files_lock = threading.Lock()
+        self.thread = threading.Thread(target=self.serve_forever, daemon=True)
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.shutdown()
+        self.server_close()
+
+
+def simulate_outages(rng, days):
+    """Outages arrive about twice a day; half are followed by a quick relapse."""
+    outages = []
+    horizon = days * 86400
+    moment = 0.0
+    while True:
+        moment += rng.expovariate(2 / 86400)
+        if moment > horizon:
+            return outages
+        while True:
+            duration = rng.lognormvariate(math.log(120), 1.0)
+            outages.append((moment, moment + duration))
+            moment += duration
+            if rng.random() >= 0.5:
+                break
+            moment += rng.expovariate(1 / 90)
+
+
+def simulate_schedule(base_interval, days, adaptive, seed=7, targets=12):
+    """Return (probes per target-hour, mean outage delay, mean recovery delay)."""
+    rng = random.Random(seed)
+    probes = 0
+    outage_delays = []
+    recovery_delays = []
+    for _ in range(targets):
+        outages = simulate_outages(rng, days)
+        starts = [start for start, _ in outages]
+        cadence = AdaptiveProbeInterval(base_interval)
+        probe_times = []
+        moment = rng.uniform(0, base_interval)
+        while moment < days * 86400:
+            position = bisect.bisect_right(starts, moment) - 1
+            offline = position >= 0 and moment < outages[position][1]
+            probe_times.append(moment)
+            probes += 1
+            if adaptive:
+                delay = cadence.jittered(cadence.update('offline' if offline else 'online'))
+            else:
+                delay = base_interval
+            moment += delay
+
+        for start, end in outages:
+            position = bisect.bisect_left(probe_times, start)
+            if position < len(probe_times) and probe_times[position] < end:
+                outage_delays.append(probe_times[position] - start)
+                position = bisect.bisect_left(probe_times, end)
+                if position < len(probe_times):
+                    recovery_delays.append(probe_times[position] - end)
+
+    return (probes / (days * 24 * targets),
+            sum(outage_delays) / max(1, len(outage_delays)),
+            sum(recovery_delays) / max(1, len(recovery_delays)))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--healthy', type=int, default=10)
+    parser.add_argument('--blackholed', type=int, default=2)
+    parser.add_argument('--timeout', type=float, default=2.0)
+    parser.add_argument('--interval', type=int, default=60,
+                        help='configured ftp_ping_interval for the scheduler simulation')
+    parser.add_argument('--days', type=int, default=7)
+    parser.add_argument('--upload-kb', type=int, default=256,
+                        help='size of the throughput test file for the FTP protocol probe')
+    args = parser.parse_args()
+
+    healthy = [start_healthy_listener() for _ in range(args.healthy)]
+    blackholed = [start_blackholed_listener() for _ in range(args.blackholed)]
+
+    targets = [listener.getsockname() for listener in healthy]
+    targets += [listener.getsockname() for listener, _ in blackholed]
+
+    print(f"Targets: {args.healthy} healthy, {args.blackholed} black-holed, "
+          f"timeout {args.timeout:.1f}s")
+
+    started = time.perf_counter()
+    sequential = sequential_poll(targets, args.timeout)
+    sequential_elapsed = time.perf_counter() - started
+
+    started = time.perf_counter()
+    concurrent = [status for status, _, _ in probe_tcp_targets(targets, args.timeout)]
+    concurrent_elapsed = time.perf_counter() - started
+
+    for label, statuses, elapsed in (('sequential', sequential, sequential_elapsed),
+                                     ('concurrent', concurrent, concurrent_elapsed)):
+        print(f"{label:>10}: {elapsed:6.2f}s  "
+              f"online={statuses.count('online')} offline={statuses.count('offline')}")
+
+    if concurrent_elapsed:
+        print(f"Speed-up: {sequential_elapsed / concurrent_elapsed:.1f}x")
+
+    for listener in healthy:
+        listener.close()
+    for listener, fillers in blackholed:
+        for filler in fillers:
+            filler.close()
+        listener.close()
+
+    print()
+    print(f"Scheduler simulation: {args.days} days, 12 targets, interval {args.interval}s")
+    for label, adaptive in (('fixed', False), ('adaptive', True)):
+        rate, outage_delay, recovery_delay = simulate_schedule(args.interval, args.days, adaptive)
+        print(f"{label:>10}: {rate:5.1f} probes/target-hour  "
+              f"outage seen after {outage_delay:5.1f}s  recovery after {recovery_delay:5.1f}s")
+
+    print()
+    print(f"FTP protocol probe against a stand-in server, {args.upload_kb} KB upload")
+    with StandInFTPServer() as server:
+        host, port = server.server_address
+        for label, password in (('valid login', 'secret'), ('bad password', 'wrong')):
+            result = probe_ftp_protocol(host, port, username='probe', password=password,
+                                        throughput_kb=args.upload_kb, timeout=args.timeout)
+            if result['status'] == 'ok':
+                print(f"{label:>12}: banner {result['banner_ms']} ms  login {result['login_ms']} ms  "
+                      f"NOOP {result['noop_ms']} ms  upload {result['upload_kbps']} KB/s  "
+                      f"delete {result['delete_ms']} ms")
+            else:
+                print(f"{label:>12}: failed during {result['phase']} - {result['error']}")
+        print(f"Files left on the server: {len(server.files)}")
+
+
+if __name__ == '__main__':
+    main()
@@ -25,9 +25,9 @@ from PyQt5.QtWidgets import (
     QWidget,
 )
 
-from server_runner import FLASK_HOST, FLASK_PORT, SHUTDOWN_TOKEN
+from server_runner import FLASK_HOST, FLASK_PORT, SHUTDOWN_TOKEN, WAITRESS_THREADS
 from waitress import create_server
-from app import app
+from app import app, resend_log_writer
 
 SERVER_URL = f"http://{FLASK_HOST}:{FLASK_PORT}"
 LOG_HISTORY_LIMIT = 400
@@ -142,7 +142,9 @@ class ServerThread(QThread):
                 "info",
             )
 
-            self.server = create_server(app, host=FLASK_HOST, port=FLASK_PORT)
+            self.server = create_server(
+                app, host=FLASK_HOST, port=FLASK_PORT, threads=WAITRESS_THREADS
+            )
             self.state_signal.emit("running")
             self.output_signal.emit("Embedded server is now running.", "info")
 
@@ -174,6 +176,10 @@ class ServerThread(QThread):
                 self.server = None
             if self.shutdown_event:
                 self.shutdown_event.set()
+            if not resend_log_writer.drain():
+                self.output_signal.emit(
+                    "Resend outcome log did not finish flushing.", "warning"
+                )
             self._detach_logging()
             self.state_signal.emit("stopped")
             self.exit_signal.emit(exit_code)
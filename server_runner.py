@@ -1,7 +1,7 @@
 import os
 import threading
 from waitress import create_server
-from app import app
+from app import app, resend_log_writer, WAITRESS_THREADS
 
 FLASK_PORT = 5050
 FLASK_HOST = '0.0.0.0'  # Listen on all interfaces
@@ -13,7 +13,8 @@ if __name__ == '__main__':
     app.config['SHUTDOWN_EVENT'] = shutdown_event
     app.config['SHUTDOWN_TOKEN'] = SHUTDOWN_TOKEN
 
-    server = create_server(app, host=FLASK_HOST, port=FLASK_PORT)
+    server = create_server(app, host=FLASK_HOST, port=FLASK_PORT,
+                           threads=WAITRESS_THREADS)
 
     def _monitor_shutdown():
         shutdown_event.wait()
@@ -35,4 +36,5 @@ if __name__ == '__main__':
         except Exception:
             pass
         monitor_thread.join(timeout=1)
+        resend_log_writer.drain()
         print('Server stopped.')
@@ -0,0 +1,82 @@
+"""Shared fixtures.
+
+``app`` reads ``settings.json`` from the working directory and starts its
+background workers at import time, so the suite switches to a scratch
+directory with its own settings before any test module imports it.
+"""
+
+import json
+import os
+import sys
+import tempfile
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+WORKDIR = tempfile.mkdtemp(prefix='transmission-tests-')
+DEFAULT_LOGS_DIR = os.path.join(WORKDIR, 'logs')
+os.makedirs(DEFAULT_LOGS_DIR)
+with open(os.path.join(WORKDIR, 'settings.json'), 'w', encoding='utf-8') as handle:
+    json.dump({'logs_directory': DEFAULT_LOGS_DIR, 'ftp_targets': []}, handle)
+os.chdir(WORKDIR)
+sys.path.insert(0, ROOT)
+
+import app as app_module  # noqa: E402
+
+
+def center_line(id_scan, ok, timestamp='2025-10-02 10:00:00', scan_time=None):
+    """A ``center response`` line as Task.py writes it."""
+    if ok:
+        body = {'resultCode': True, 'resultDesc': 'ok',
+                'resultData': {'PICNO': id_scan, 'RESPON_TPS_API': 'OK',
+                               'SCANTIME': scan_time or timestamp}}
+    else:
+        body = {'resultCode': False, 'resultDesc': 'rejected', 'resultData': '-'}
+    return (f"{timestamp},000 INFO [Task.py-send_message_handler: 138] center response:"
+            f"{id_scan},response code: 200,response text: {json.dumps(body)}\n")
+
+
+def upload_line(id_scan, timestamp='2025-10-02 10:00:00'):
+    """A ``build_upload_data`` line, which yields a provisional (NOK) entry."""
+    year, month, day = (int(part) for part in timestamp[:10].split('-'))
+    hour, minute, second = (int(part) for part in timestamp[11:19].split(':'))
+    return (f"{timestamp},000 DEBUG [Task.py-build_upload_data: 196] upload_data is "
+            f"{{'task_no': '{id_scan}', 'image_path': 'D:/Image/', 'task_time': "
+            f"datetime.datetime({year}, {month}, {day}, {hour}, {minute}, {second}, 0)}}\n")
+
+
+class LogDirectory:
+    def __init__(self, path):
+        self.path = str(path)
+
+    def write(self, lines, name='Transmission.log', mode='w'):
+        file_path = os.path.join(self.path, name)
+        with open(file_path, mode, encoding='utf-8') as handle:
+            handle.writelines(lines)
+        return file_path
+
+    def append(self, lines, name='Transmission.log'):
+        return self.write(lines, name, mode='a')
+
+
+@pytest.fixture
+def app():
+    return app_module
+
+
+@pytest.fixture
+def client():
+    return app_module.app.test_client()
+
+
+@pytest.fixture
+def logs(tmp_path, monkeypatch):
+    """Point the parser and resend ledger at an empty, private logs directory."""
+    monkeypatch.setattr(app_module, 'log_parser', app_module.LogParser(str(tmp_path)))
+    monkeypatch.setitem(app_module.app_settings, 'logs_directory', str(tmp_path))
+    app_module.resend_ledger.configure(str(tmp_path))
+    app_module.query_result_cache.clear()
+    yield LogDirectory(tmp_path)
+    app_module.resend_log_writer.drain()
+    app_module.resend_ledger.configure(DEFAULT_LOGS_DIR)
+    app_module.query_result_cache.clear()
@@ -0,0 +1,51 @@
+import time
+
+from conftest import center_line
+
+
+def test_limits_are_clamped_to_server_threads(app):
+    threads = app.WAITRESS_THREADS
+    scans, exports, queue = app.clamp_admission_limits(50, 50, 50, threads)
+    assert scans + exports + 2 * queue + app.BULK_RESEND_MAX_STREAMS <= (
+        threads - app.RESERVED_LIGHTWEIGHT_THREADS)
+    assert app.bulk_resend_limiter.max_concurrent == app.BULK_RESEND_MAX_STREAMS
+    assert scans >= 1 and exports >= 1
+
+    defaults = (app.DEFAULT_MAX_CONCURRENT_SCANS, app.DEFAULT_MAX_CONCURRENT_EXPORTS,
+                app.DEFAULT_ADMISSION_QUEUE_SIZE)
+    assert app.clamp_admission_limits(*defaults, threads) == defaults
+
+
+def test_streamed_export_holds_slot_until_body_is_closed(app, client, logs):
+    logs.write([center_line('SCAN1', True)])
+    limiter = app.admission_limiters['export']
+
+    response = client.get('/api/export/csv', buffered=False)
+    assert limiter.get_stats()['active'] == 1
+    assert b'SCAN1' in b''.join(response.response)
+    response.close()
+    assert limiter.get_stats()['active'] == 0
+
+
+def test_export_jobs_wait_for_an_export_slot(app, logs):
+    logs.write([center_line('SCAN1', True)])
+    limiter = app.admission_limiters['export']
+    jobs = app.ExportJobManager()
+    for _ in range(limiter.max_concurrent):
+        limiter.acquire_background()
+    try:
+        job, created = jobs.submit(app.log_parser, 'OK', None, None, ['id_scan'])
+        assert created
+        time.sleep(0.1)
+        assert jobs.get(job['id'])['status'] == 'queued'
+    finally:
+        for _ in range(limiter.max_concurrent):
+            limiter.release()
+
+    deadline = time.monotonic() + 10
+    while jobs.get(job['id'])['status'] != 'completed' and time.monotonic() < deadline:
+        time.sleep(0.02)
+    assert jobs.get(job['id'])['status'] == 'completed'
+    assert jobs.get(job['id'])['created_at'].endswith('Z')
+    assert limiter.get_stats()['active'] == 0
+    jobs.shutdown()
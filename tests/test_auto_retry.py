@@ -0,0 +1,70 @@
+import threading
+import time
+
+import pytest
+
+
+def wait_for(condition, timeout=5):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            return False
+        time.sleep(0.01)
+    return True
+
+
+@pytest.fixture
+def retry_queue(app, logs, monkeypatch):
+    monkeypatch.setitem(app.app_settings, 'resend_server', 'http://127.0.0.1:9')
+    monkeypatch.setitem(app.app_settings, 'resend_endpoint', '/resend')
+    retry_queue = app.AutoRetryQueue()
+    yield retry_queue
+    retry_queue.close()
+
+
+def settings(logs, **overrides):
+    values = {'logs_directory': logs.path, 'auto_retry_enabled': True,
+              'auto_retry_workers': 1}
+    values.update(overrides)
+    return values
+
+
+def test_reconfigure_does_not_wait_for_inflight_resends(retry_queue, logs, monkeypatch):
+    started = threading.Event()
+    release = threading.Event()
+    attempted = []
+
+    def blocking_attempt(id_scan, log_file, attempts, target_url):
+        attempted.append(id_scan)
+        started.set()
+        release.wait(10)
+        retry_queue.breaker.release()
+
+    monkeypatch.setattr(retry_queue, '_attempt', blocking_attempt)
+    retry_queue.configure(settings(logs))
+    retry_queue.enqueue(['SCAN1'])
+    assert started.wait(5)
+    first_dispatcher = retry_queue.thread
+
+    began = time.monotonic()
+    retry_queue.configure(settings(logs, auto_retry_workers=2))
+    assert time.monotonic() - began < 1
+    assert retry_queue.thread is not first_dispatcher
+    assert retry_queue.thread.is_alive()
+    assert retry_queue.workers == 2
+    # Still in flight on the retired pool, so not dispatched a second time.
+    time.sleep(0.2)
+    assert attempted == ['SCAN1']
+
+    release.set()
+    assert wait_for(lambda: not retry_queue.inflight)
+    assert wait_for(lambda: not first_dispatcher.is_alive())
+
+
+def test_disabling_stops_dispatching(retry_queue, logs):
+    retry_queue.configure(settings(logs))
+    assert retry_queue.get_stats()['running']
+
+    retry_queue.configure(settings(logs, auto_retry_enabled=False))
+
+    assert not retry_queue.get_stats()['running']
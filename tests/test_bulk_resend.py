@@ -0,0 +1,83 @@
+import json
+
+import pytest
+
+from conftest import center_line
+
+ENTRIES = [
+    {'id_scan': 'A', 'status': 'NOK', 'scan_time': '2025-10-02 09:00:00'},
+    {'id_scan': 'B', 'status': 'NOK', 'scan_time': '2025-10-02 11:00:00'},
+    {'id_scan': 'C', 'status': 'OK', 'scan_time': '2025-10-02 11:30:00'},
+    {'id_scan': 'D', 'status': 'NOK', 'scan_time': 'N/A'},
+    {'id_scan': 'E', 'status': 'NOK', 'scan_time': ''},
+]
+
+
+def ids(selected):
+    return [entry['id_scan'] for entry in selected]
+
+
+def test_explicit_ids_keep_order_and_report_missing(app):
+    selected, missing = app.select_bulk_resend_entries(ENTRIES, ['C', 'A', 'C', 'Z', ''])
+    assert ids(selected) == ['C', 'A']
+    assert missing == ['Z']
+
+
+@pytest.mark.parametrize('status', [None, '', 'nok', 'FAILED'])
+def test_filter_requires_a_known_status(app, status):
+    with pytest.raises(ValueError):
+        app.select_bulk_resend_entries(ENTRIES, filters={'status': status})
+    with pytest.raises(ValueError):
+        app.select_bulk_resend_entries(ENTRIES, filters={})
+
+
+def test_status_filter(app):
+    nok, _ = app.select_bulk_resend_entries(ENTRIES, filters={'status': 'NOK'})
+    every, _ = app.select_bulk_resend_entries(ENTRIES, filters={'status': 'any'})
+    assert ids(nok) == ['A', 'B', 'D', 'E']
+    assert ids(every) == ['A', 'B', 'C', 'D', 'E']
+
+
+def test_time_window_skips_unparseable_scan_times(app):
+    selected, _ = app.select_bulk_resend_entries(
+        ENTRIES, filters={'status': 'any', 'from': '2025-10-02T10:00', 'to': '2025-10-02'})
+    assert ids(selected) == []
+
+    selected, _ = app.select_bulk_resend_entries(
+        ENTRIES, filters={'status': 'any', 'from': '2025-10-02 10:00:00'})
+    assert ids(selected) == ['B', 'C']
+
+    selected, _ = app.select_bulk_resend_entries(
+        ENTRIES, filters={'status': 'NOK', 'to': '2025-10-02 10:00'})
+    assert ids(selected) == ['A']
+
+    with pytest.raises(ValueError):
+        app.select_bulk_resend_entries(ENTRIES, filters={'status': 'any', 'from': 'yesterday'})
+
+
+def test_load_settings_sanitizes_bulk_limits(app, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    with open(app.SETTINGS_FILE, 'w', encoding='utf-8') as handle:
+        json.dump({'bulk_resend_concurrency': 500, 'bulk_resend_rate_limit': 'fast'}, handle)
+    settings = app.load_settings()
+    assert settings['bulk_resend_concurrency'] == app.BULK_RESEND_MAX_CONCURRENCY
+    assert settings['bulk_resend_rate_limit'] == app.DEFAULT_BULK_RESEND_RATE_LIMIT
+
+    with open(app.SETTINGS_FILE, 'w', encoding='utf-8') as handle:
+        json.dump({'bulk_resend_concurrency': 0, 'bulk_resend_rate_limit': -3}, handle)
+    settings = app.load_settings()
+    assert settings['bulk_resend_concurrency'] == app.DEFAULT_BULK_RESEND_CONCURRENCY
+    assert settings['bulk_resend_rate_limit'] == app.DEFAULT_BULK_RESEND_RATE_LIMIT
+
+
+def test_bulk_route_rejects_filter_without_status(app, client, logs, monkeypatch):
+    logs.write([center_line('SCAN1', False)])
+    monkeypatch.setitem(app.app_settings, 'resend_server', 'http://127.0.0.1:9')
+    monkeypatch.setitem(app.app_settings, 'resend_endpoint', '/resend')
+
+    response = client.post('/api/resend/bulk', json={'filter': {'status': None}})
+
+    assert response.status_code == 400
+    assert 'status' in response.get_json()['error']
+    assert app.admission_limiters['scan'].get_stats()['active'] == 0
+    assert app.bulk_resend_limiter.get_stats()['active'] == 0
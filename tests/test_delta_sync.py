@@ -0,0 +1,59 @@
+from conftest import center_line
+
+
+def fetch(client, query=''):
+    response = client.get(f'/api/data{query}')
+    assert response.status_code == 200
+    return response.get_json()
+
+
+def test_unchanged_logs_return_an_empty_delta(client, logs):
+    logs.write([center_line('SCAN1', True), center_line('SCAN2', False)])
+    full = fetch(client)
+    assert full['delta'] is False
+    assert {row['id_scan'] for row in full['data']} == {'SCAN1', 'SCAN2'}
+
+    delta = fetch(client, f"?since={full['generation']}")
+    assert delta['delta'] is True
+    assert delta['data'] == []
+    assert delta['removed'] == []
+    assert delta['generation'] == full['generation']
+
+
+def test_delta_carries_new_and_changed_rows_only(client, logs):
+    logs.write([center_line('SCAN1', True), center_line('SCAN2', False)])
+    generation = fetch(client)['generation']
+
+    logs.append([center_line('SCAN3', False, timestamp='2025-10-02 10:05:00')])
+    delta = fetch(client, f'?since={generation}')
+    assert delta['delta'] is True
+    assert [row['id_scan'] for row in delta['data']] == ['SCAN3']
+    assert delta['generation'] > generation
+
+
+def test_rows_leaving_a_filter_are_reported_as_removed(client, logs):
+    logs.write([center_line('SCAN1', False, timestamp='2025-10-02 10:00:00')])
+    generation = fetch(client, '?status=NOK')['generation']
+
+    # A later successful response for the same scan turns it OK.
+    logs.append([center_line('SCAN1', True, timestamp='2025-10-02 10:10:00')])
+    delta = fetch(client, f'?status=NOK&since={generation}')
+    assert delta['data'] == []
+    assert delta['removed'] == ['SCAN1']
+
+
+def test_unknown_or_stale_generation_forces_full_resync(client, logs):
+    logs.write([center_line('SCAN1', True)])
+    full = fetch(client)
+    for since in (1, full['generation'] + 1000):
+        response = fetch(client, f'?since={since}')
+        assert response['delta'] is False
+        assert len(response['data']) == 1
+
+
+def test_unknown_log_file_names_do_not_accumulate_trackers(app, client, logs):
+    logs.write([center_line('SCAN1', True)])
+    for index in range(50):
+        fetch(client, f'?log_file=bogus-{index}.log')
+    fetch(client, '?log_file=Transmission.log')
+    assert set(app.log_parser._version_trackers) <= {None, 'Transmission.log'}
@@ -0,0 +1,72 @@
+import os
+
+from conftest import center_line
+
+
+def count_full_loads(app, monkeypatch):
+    calls = []
+    get_all_data = app.log_parser.get_all_data
+
+    def counting_get_all_data(*args, **kwargs):
+        calls.append(args)
+        return get_all_data(*args, **kwargs)
+
+    monkeypatch.setattr(app.log_parser, 'get_all_data', counting_get_all_data)
+    return calls
+
+
+def test_appends_only_invalidate_the_scans_they_touch(app, logs, monkeypatch):
+    logs.write([center_line('SCAN1', False), center_line('SCAN2', True)])
+    calls = count_full_loads(app, monkeypatch)
+
+    assert app.log_parser.get_entry('SCAN1')['status'] == 'NOK'
+    assert len(calls) == 1
+
+    logs.append([center_line('SCAN1', True, '2025-10-02 10:05:00'),
+                 center_line('SCAN3', True, '2025-10-02 10:06:00')])
+    assert app.log_parser.get_entry('SCAN2')['status'] == 'OK'
+    assert len(calls) == 1
+
+    assert app.log_parser.get_entry('SCAN1')['status'] == 'OK'
+    assert app.log_parser.get_entry('SCAN3')['status'] == 'OK'
+    assert len(calls) == 2
+
+
+def test_resend_outcome_invalidates_only_that_scan(app, logs, monkeypatch):
+    logs.write([center_line('SCAN1', False), center_line('SCAN2', False)])
+    calls = count_full_loads(app, monkeypatch)
+    assert app.log_parser.get_entry('SCAN1')['status'] == 'NOK'
+
+    app.resend_ledger.record({'id_scan': 'SCAN1', 'status': 'SUCCESS',
+                              'timestamp': '2025-10-02 11:00:00'})
+    assert app.log_parser.get_entry('SCAN2')['status'] == 'NOK'
+    assert len(calls) == 1
+    assert app.log_parser.get_entry('SCAN1')['status'] == 'OK'
+    assert len(calls) == 2
+
+
+def test_rotation_rebuilds_the_index(app, logs, monkeypatch):
+    logs.write([center_line('SCAN1', False)])
+    calls = count_full_loads(app, monkeypatch)
+    app.log_parser.get_entry('SCAN1')
+
+    logs.write([center_line('SCAN1', True)], name='Transmission.log.1')
+    assert app.log_parser.get_entry('SCAN9') is None
+    assert len(calls) == 2
+
+
+def test_parse_does_not_index_a_partial_last_line(app, logs):
+    complete = center_line('SCAN1', True)
+    partial = center_line('SCAN2', True)
+    cut = partial.index('response code')
+    path = logs.write([complete, partial[:cut]])
+
+    app.log_parser.get_all_data()
+    record = app.log_parser._line_index[path]
+    assert record['size'] == len(complete.encode())
+    assert 'SCAN2' not in record['ids']
+
+    logs.append([partial[cut:]])
+    refs = app.log_parser.get_line_refs('SCAN2')
+    assert refs == [(path, len(complete.encode()))]
+    assert os.path.getsize(path) == len((complete + partial).encode())
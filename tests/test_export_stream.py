@@ -0,0 +1,42 @@
+from conftest import center_line
+
+
+def test_csv_export_streams_rows_and_holds_its_slot(app, client, logs):
+    logs.write([center_line('SCAN1', True)])
+    limiter = app.admission_limiters['export']
+
+    response = client.get('/api/export/csv?fields=id_scan', buffered=False)
+    assert response.status_code == 200
+    assert limiter.get_stats()['active'] == 1
+
+    lines = b''.join(response.response).decode().splitlines()
+    assert lines == [app.EXPORT_COLUMN_MAP['id_scan'], 'SCAN1']
+    response.close()
+    assert limiter.get_stats()['active'] == 0
+
+
+def test_export_parse_deadline_returns_503_before_streaming(app, client, logs, monkeypatch):
+    logs.write([center_line('SCAN1', True)])
+
+    def expired(*args):
+        raise app.ParseDeadlineExceeded('Log parsing exceeded the request deadline')
+
+    monkeypatch.setattr(app.log_parser, 'get_all_data', expired)
+    limiter = app.admission_limiters['export']
+    exceeded = limiter.get_stats()['deadline_exceeded']
+
+    for path in ('/api/export/csv', '/api/export/ndjson'):
+        response = client.get(path)
+        assert response.status_code == 503
+        assert 'Retry-After' in response.headers
+    assert limiter.get_stats()['deadline_exceeded'] == exceeded + 2
+    assert limiter.get_stats()['active'] == 0
+
+
+def test_ndjson_export_streams_filtered_rows(client, logs):
+    logs.write([center_line('SCAN1', True), center_line('SCAN2', False)])
+
+    response = client.get('/api/export/ndjson?status=OK&fields=id_scan')
+
+    assert response.status_code == 200
+    assert response.get_data(as_text=True).splitlines() == ['{"id_scan": "SCAN1"}']
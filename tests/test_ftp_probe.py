@@ -0,0 +1,86 @@
+import time
+
+import pytest
+
+from ftp_probe_benchmark import StandInFTPServer, _StandInFTPHandler
+
+
+class FailingStorHandler(_StandInFTPHandler):
+    """Keeps the uploaded bytes but reports the transfer as failed."""
+
+    def reply(self, line):
+        if line.startswith('226'):
+            line = '451 Transfer aborted'
+        super().reply(line)
+
+
+@pytest.fixture
+def server():
+    with StandInFTPServer() as server:
+        yield server
+
+
+def test_probe_times_a_full_session(app, server):
+    host, port = server.server_address
+
+    result = app.probe_ftp_protocol(host, port, 'probe', 'secret', throughput_kb=16, timeout=5)
+
+    assert result['status'] == 'ok', result
+    assert result['phase'] is None and result['error'] is None
+    for key in ('banner_ms', 'login_ms', 'noop_ms', 'upload_ms', 'delete_ms'):
+        assert result[key] >= 0
+    assert result['upload_kb'] == 16 and result['upload_kbps'] > 0
+    assert server.files == {}
+
+
+def test_probe_reports_a_failed_login(app, server):
+    host, port = server.server_address
+
+    result = app.probe_ftp_protocol(host, port, 'probe', 'wrong', timeout=5)
+
+    assert result['status'] == 'failed'
+    assert result['phase'] == 'login'
+    assert result['error'].startswith('530')
+    assert result['banner_ms'] is not None and result['login_ms'] is None
+
+
+def test_probe_reports_a_refused_connection(app):
+    with StandInFTPServer() as server:
+        host, port = server.server_address
+
+    result = app.probe_ftp_protocol(host, port, timeout=2)
+
+    assert (result['status'], result['phase']) == ('failed', 'banner')
+
+
+def test_failed_upload_still_removes_the_remote_file(app, server):
+    server.RequestHandlerClass = FailingStorHandler
+    host, port = server.server_address
+
+    result = app.probe_ftp_protocol(host, port, 'probe', 'secret', throughput_kb=4, timeout=5)
+
+    assert (result['status'], result['phase']) == ('failed', 'upload')
+    assert server.files == {}
+
+
+def test_monitor_does_not_wait_for_protocol_probes(app, monkeypatch):
+    monitor = app.FTPStatusMonitor()
+    target = {'host': '127.0.0.1', 'port': 2121, 'probe': 'ftp'}
+    finished = {'status': 'ok'}
+
+    def slow_probe(*args, **kwargs):
+        time.sleep(0.5)
+        return finished
+
+    monkeypatch.setattr(app, 'probe_ftp_protocol', slow_probe)
+
+    began = time.monotonic()
+    assert monitor._probe_protocols([target]) == {('127.0.0.1', 2121): None}
+    assert monitor._probe_protocols([target]) == {('127.0.0.1', 2121): None}
+    assert time.monotonic() - began < 0.25
+
+    deadline = time.monotonic() + 5
+    while monitor.protocol_inflight and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert monitor._probe_protocols([target]) == {('127.0.0.1', 2121): finished}
+    monitor.protocol_executor.shutdown(wait=True)
@@ -0,0 +1,30 @@
+import pytest
+
+
+@pytest.mark.parametrize('size, fraction, expected', [
+    (1, 0.50, 1), (1, 0.99, 1),
+    (2, 0.50, 1), (2, 0.95, 2),
+    (4, 0.50, 2), (4, 0.75, 3),
+    (10, 0.50, 5), (10, 0.95, 10),
+    (20, 0.95, 19), (100, 0.50, 50), (100, 0.95, 95), (100, 0.99, 99),
+])
+def test_nearest_rank_percentile(app, size, fraction, expected):
+    ordered = list(range(1, size + 1))
+    assert app.LatencyHistogram._percentile(ordered, fraction) == expected
+
+
+def test_snapshot_reports_window_percentiles_and_buckets(app):
+    histogram = app.LatencyHistogram(bucket_bounds=(10, 100), window=100)
+    for latency in range(1, 101):
+        histogram.record(float(latency))
+    histogram.record(500.0)
+    histogram.record_failure()
+
+    snapshot = histogram.snapshot()
+
+    window = snapshot['window']
+    assert window['samples'] == 100
+    assert (window['p50_ms'], window['p95_ms'], window['p99_ms']) == (51, 96, 100)
+    assert (window['min_ms'], window['max_ms'], window['jitter_ms']) == (2, 500, 5.03)
+    assert [bucket['count'] for bucket in snapshot['buckets']] == [10, 90, 1]
+    assert (snapshot['count'], snapshot['failures'], snapshot['last_ms']) == (101, 1, 500)
@@ -0,0 +1,201 @@
+import math
+import random
+import threading
+import time
+
+import pytest
+
+
+@pytest.fixture
+def make_store(app, tmp_path):
+    stores = []
+
+    def make(raw=None, minute=None, hour=None):
+        class Store(app.PingHistoryStore):
+            TIERS = tuple(
+                (name, record_format, size or capacity, width)
+                for (name, record_format, capacity, width), size in
+                zip(app.PingHistoryStore.TIERS, (raw, minute, hour)))
+
+        store = Store()
+        store.configure(str(tmp_path))
+        stores.append(store)
+        return store
+
+    yield make
+    for store in stores:
+        store.close()
+
+
+def status(host, state='online', connect_ms=5.0):
+    """A sample as ``PingHistoryStore.submit`` queues it."""
+    return (f'{host}:21', {'online': 1, 'offline': 2}[state], connect_ms)
+
+
+def all_records(store, tier_name):
+    tier = store.tiers[tier_name]
+    with open(store.path, 'rb') as handle:
+        return store._read_records(handle, tier, 0, tier['count'])
+
+
+def test_raw_ring_round_trip_across_wrap_and_reopen(app, make_store, tmp_path):
+    store = make_store(raw=8)
+    for second in range(20):
+        store._write_batch([(1000.0 + second, [status('a', connect_ms=float(second))])])
+
+    records = store.read_range('raw', 0, math.inf)
+    assert [record[0] for record in records] == [1000.0 + second for second in range(12, 20)]
+    assert [record[3] for record in records] == [float(second) for second in range(12, 20)]
+    assert [record[0] for record in store.read_range('raw', 1014.0, 1017.0)] == [
+        1014.0, 1015.0, 1016.0]
+    assert store.read_range('raw', 0, 1012.0) == []
+
+    store._write_batch([(2000.0, [status('b', 'offline', None)])])
+    store.close()
+    store.configure(str(tmp_path))
+
+    records = store.read_range('raw', 1019.0, math.inf)
+    assert [(record[0], record[2]) for record in records] == [
+        (1019.0, app.PING_STATUS_CODES['online']), (2000.0, app.PING_STATUS_CODES['offline'])]
+    assert math.isnan(records[-1][3])
+    assert store.get_targets() == {'a:21': 1, 'b:21': 2}
+
+
+
+@pytest.mark.parametrize('start, end', [(0, 1010.0), (1003.0, math.inf)])
+def test_read_range_drops_slots_overwritten_during_the_read(make_store, monkeypatch,
+                                                            start, end):
+    store = make_store(raw=8)
+    for second in range(8):
+        store._write_batch([(1000.0 + second, [status('a')])])
+    read_records = store._read_records
+    wrapped = []
+
+    def read_while_writer_wraps(*args):
+        if not wrapped:
+            wrapped.append(True)
+            for second in range(8, 14):
+                store._write_batch([(1000.0 + second, [status('a')])])
+        return read_records(*args)
+
+    monkeypatch.setattr(store, '_read_records', read_while_writer_wraps)
+
+    assert [record[0] for record in store.read_range('raw', start, end)] == [1006.0, 1007.0]
+    monkeypatch.undo()
+    assert [record[0] for record in store.read_range('raw', 0, math.inf)] == [
+        1000.0 + second for second in range(6, 14)]
+
+
+def test_minute_aggregates_and_open_bucket(make_store):
+    store = make_store()
+    store._write_batch([(60.0, [status('a', connect_ms=2.0)]),
+                        (90.0, [status('a', 'offline', None)]),
+                        (120.0, [status('a', connect_ms=4.0)])])
+
+    closed, still_open = store.read_range('minute', 0, math.inf)
+    assert closed == (60.0, 1, 2, 1, 1, 2.0, 2.0, 2.0)
+    assert still_open == (120.0, 1, 1, 1, 1, 4.0, 4.0, 4.0)
+
+
+def test_history_endpoint_buckets_a_target(app, client, make_store, monkeypatch):
+    store = make_store()
+    monkeypatch.setattr(app, 'ping_history', store)
+    store._write_batch([(3600.0, [status('a', connect_ms=10.0), status('b')]),
+                        (3630.0, [status('a', 'offline', None)]),
+                        (3660.0, [status('a', connect_ms=20.0)])])
+
+    response = client.get('/api/ftp-status/history?target=a:21&from=3600&to=3720&resolution=60')
+
+    assert response.status_code == 200
+    body = response.get_json()
+    assert body['source'] == 'minute'
+    [target] = body['targets']
+    assert target['target'] == 'a:21'
+    assert [(bucket['start'], bucket['probes'], bucket['uptime_pct'], bucket['rtt_avg_ms'])
+            for bucket in target['buckets']] == [(3600, 2, 50.0, 10.0), (3660, 1, 100.0, 20.0)]
+
+    raw = client.get('/api/ftp-status/history?from=3600&to=3720&resolution=30').get_json()
+    assert raw['source'] == 'raw'
+    assert [entry['summary']['probes'] for entry in raw['targets']] == [3, 1]
+    assert client.get('/api/ftp-status/history?target=z:21').status_code == 404
+
+
+
+@pytest.mark.parametrize('query', [
+    'from=0&to=inf', 'from=-inf&to=60', 'from=nan&to=60', 'from=0&to=1e400',
+    'from=0&to=1e12', 'from=0&to=3600&resolution=infm',
+    'from=0&to=3600&resolution=1e400', 'from=0&to=3600&resolution=nan',
+    'from=0&to=3600&resolution=1e12'])
+def test_history_endpoint_rejects_unbounded_inputs(app, client, make_store, monkeypatch, query):
+    monkeypatch.setattr(app, 'ping_history', make_store())
+
+    response = client.get(f'/api/ftp-status/history?{query}')
+
+    assert response.status_code == 400
+    assert 'error' in response.get_json()
+
+def test_mixed_cadences_keep_aggregate_rings_sorted(make_store):
+    store = make_store()
+    cadences = {'fast': 7, 'slow': 300, 'medium': 45, 'jittery': 61}
+    next_due = {host: float(index) for index, host in enumerate(cadences)}
+    probes_fed = 0
+    now = 0.0
+    while now < 4 * 3600:
+        due = [host for host, at in next_due.items() if at <= now]
+        if due:
+            store._write_batch([(now, [status(host) for host in due])])
+            probes_fed += len(due)
+            for host in due:
+                next_due[host] = now + cadences[host]
+        now += 1.0
+
+    for tier_name in ('raw', 'minute', 'hour'):
+        stamps = [record[0] for record in all_records(store, tier_name)]
+        assert stamps == sorted(stamps), tier_name
+
+    rng = random.Random(44)
+    for tier_name in ('minute', 'hour'):
+        everything = store.read_range(tier_name, -math.inf, math.inf)
+        for _ in range(200):
+            start = rng.uniform(0, 4 * 3600)
+            end = start + rng.uniform(0, 3600)
+            expected = [record for record in everything if start <= record[0] < end]
+            assert sorted(store.read_range(tier_name, start, end)) == sorted(expected)
+
+    minute_probes = sum(record[2] for record in store.read_range('minute', 0, math.inf))
+    assert minute_probes == probes_fed
+
+
+def test_late_samples_are_clamped_not_misordered(make_store):
+    store = make_store()
+    store._write_batch([(200.0, [status('a')]), (100.0, [status('b')])])
+
+    stamps = [record[0] for record in all_records(store, 'raw')]
+
+    assert stamps == [200.0, 200.0]
+    assert store.stats['clamped'] >= 1
+
+
+def test_manual_and_scheduled_polls_are_serialized(app, monkeypatch):
+    monitor = app.FTPStatusMonitor()
+    monitor.settings = {'ftp_targets': app.sanitize_ftp_targets([]),
+                        'ftp_ping_interval': 30}
+    inside = []
+    overlaps = []
+
+    def probe(indexes):
+        if inside:
+            overlaps.append(indexes)
+        inside.append(indexes)
+        time.sleep(0.05)
+        inside.pop()
+        return {}
+
+    monkeypatch.setattr(monitor, '_probe_indexes_locked', probe)
+    threads = [threading.Thread(target=monitor._probe_indexes, args=([],)) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert overlaps == []
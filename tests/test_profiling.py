@@ -0,0 +1,111 @@
+import os
+import time
+
+import pytest
+
+from conftest import center_line
+
+TOKEN = 'a-real-secret'
+
+
+@pytest.fixture
+def token(app, monkeypatch):
+    monkeypatch.setitem(app.app.config, 'SHUTDOWN_TOKEN', TOKEN)
+    return TOKEN
+
+
+@pytest.fixture
+def profile_dir(app, tmp_path, monkeypatch):
+    monkeypatch.setitem(app.app_settings, 'logs_directory', str(tmp_path))
+    return tmp_path / app.PROFILE_DIRNAME
+
+
+@pytest.mark.parametrize('configured', [None, '', 'transmission-shutdown'])
+def test_profiling_is_refused_without_a_real_token(app, client, monkeypatch, configured):
+    monkeypatch.setitem(app.app.config, 'SHUTDOWN_TOKEN', configured)
+
+    for response in (
+            client.get('/__controller__/profiles',
+                       headers={'X-Controller-Token': 'transmission-shutdown'}),
+            client.get('/api/stats', headers={'X-Profile': 'cprofile'}),
+            client.post('/__controller__/sampler', json={'token': 'transmission-shutdown'})):
+        assert response.status_code == 403
+        assert 'TRANSMISSION_SHUTDOWN_TOKEN' in response.get_json()['error']
+
+
+def test_query_string_token_is_not_accepted(client, token):
+    assert client.get(f'/__controller__/profiles?token={token}').status_code == 403
+    assert client.get(f'/__controller__/sampler?token={token}').status_code == 403
+    assert client.get(f'/api/stats?__profile=1&token={token}').status_code == 403
+
+    response = client.get('/__controller__/profiles', headers={'X-Controller-Token': token})
+    assert response.status_code == 200
+
+
+def test_profiled_request_is_stored(client, token, profile_dir, logs):
+    response = client.get('/api/stats', headers={'X-Profile': 'cprofile',
+                                                 'X-Controller-Token': token})
+
+    assert response.headers['X-Profile-Status'] == 'stored'
+    profile_id = response.headers['X-Profile-Id']
+    assert (profile_dir / f'{profile_id}.pstats').exists()
+    listed = client.get('/__controller__/profiles',
+                        headers={'X-Controller-Token': token}).get_json()['profiles']
+    assert listed[0]['id'] == profile_id and listed[0]['created_at'].endswith('Z')
+
+
+def test_pruning_covers_files_from_earlier_runs(app, tmp_path):
+    now = time.time()
+    for index in range(25):
+        for extension in ('pstats', 'collapsed'):
+            path = tmp_path / f'old-{index:02d}.{extension}'
+            path.write_text('x')
+            os.utime(path, (now - 1000 + index, now - 1000 + index))
+    (tmp_path / 'notes.txt').write_text('keep me')
+
+    removed = app.prune_profile_directory(str(tmp_path), keep=20)
+
+    assert len(removed) == 10
+    remaining = sorted(os.listdir(tmp_path))
+    assert 'notes.txt' in remaining
+    assert [name for name in remaining if name.endswith('.pstats')] == [
+        f'old-{index:02d}.pstats' for index in range(5, 25)]
+    assert len([name for name in remaining if name.endswith('.collapsed')]) == 20
+
+
+def test_parse_profile_run_leaves_other_parses_unprofiled(app, client, logs, monkeypatch):
+    logs.write([center_line('SCAN-1', ok=True)])
+    app.parse_profiler.reset()
+    monkeypatch.setattr(app.parse_profiler, 'enabled', False)
+    seen_enabled = []
+    original_parse = app.log_parser.parse_log_file
+
+    def parse_log_file(*args, **kwargs):
+        seen_enabled.append(app.parse_profiler.enabled)
+        return original_parse(*args, **kwargs)
+
+    monkeypatch.setattr(app.log_parser, 'parse_log_file', parse_log_file)
+
+    for _ in range(2):
+        profile = client.post('/api/debug/parse-profile', json={'run': True}).get_json()
+        assert profile['files'] == 1 and profile['matched_lines'] == 1
+        assert profile['enabled'] is False
+    assert seen_enabled == [False, False]
+
+    app.log_parser._load_all_data()
+    assert app.parse_profiler.snapshot()['files'] == 0
+
+
+def test_parse_profile_run_does_not_touch_cumulative_totals(app, client, logs, monkeypatch):
+    logs.write([center_line('SCAN-1', ok=True), center_line('SCAN-2', ok=False)])
+    app.parse_profiler.reset()
+    monkeypatch.setattr(app.parse_profiler, 'enabled', True)
+    app.log_parser._load_all_data()
+
+    first = client.post('/api/debug/parse-profile', json={'run': True}).get_json()
+    second = client.post('/api/debug/parse-profile', json={'run': True}).get_json()
+
+    assert first['files'] == second['files'] == 1
+    assert first['lines'] == second['lines'] == 2
+    assert first['enabled'] is True
+    assert app.parse_profiler.snapshot()['files'] == 1
@@ -0,0 +1,51 @@
+from conftest import center_line
+
+
+def test_lru_evicts_least_recently_used(app):
+    cache = app.QueryResultCache(max_entries=2)
+    cache.put('dir', 'sig', ('a',), [1])
+    cache.put('dir', 'sig', ('b',), [2])
+    assert cache.get('dir', 'sig', ('a',)) == [1]
+    cache.put('dir', 'sig', ('c',), [3])
+
+    assert cache.get('dir', 'sig', ('b',)) is None
+    assert cache.get('dir', 'sig', ('a',)) == [1]
+    assert cache.get_stats()['evictions'] == 1
+
+
+def test_new_signature_invalidates_older_entries_of_the_same_scope(app):
+    cache = app.QueryResultCache()
+    cache.put('dir', 'old', ('a',), [1])
+    cache.put('other', 'old', ('a',), [9])
+    cache.put('dir', 'new', ('b',), [2])
+
+    assert cache.get('dir', 'old', ('a',)) is None
+    assert cache.get('other', 'old', ('a',)) == [9]
+    assert cache.get_stats()['invalidations'] == 1
+
+
+def test_results_larger_than_the_byte_budget_are_not_cached(app):
+    cache = app.QueryResultCache(max_bytes=64)
+    cache.put('dir', 'sig', ('a',), [{'payload': 'x' * 500}])
+    assert cache.get('dir', 'sig', ('a',)) is None
+
+
+def test_appending_to_a_log_invalidates_cached_results(app, client, logs):
+    logs.write([center_line('SCAN1', False)])
+    assert client.get('/api/data').get_json()['total'] == 1
+    assert client.get('/api/data').get_json()['total'] == 1
+    hits = app.query_result_cache.get_stats()['hits']
+    assert hits >= 1
+
+    logs.append([center_line('SCAN2', False, timestamp='2025-10-02 10:01:00')])
+    assert client.get('/api/data').get_json()['total'] == 2
+    assert app.query_result_cache.get_stats()['hits'] == hits
+
+
+def test_recorded_resend_outcome_invalidates_cached_results(app, client, logs):
+    logs.write([center_line('SCAN1', False)])
+    assert client.get('/api/data?status=NOK').get_json()['total'] == 1
+
+    app.resend_ledger.record({'id_scan': 'SCAN1', 'status': 'SUCCESS',
+                              'timestamp': '2025-10-02 11:00:00'})
+    assert client.get('/api/data?status=NOK').get_json()['total'] == 0
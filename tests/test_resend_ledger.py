@@ -0,0 +1,75 @@
+import json
+import sqlite3
+
+import pytest
+
+from conftest import LogDirectory, center_line
+
+
+def resend_line(id_scan, status, timestamp='2025-10-02 11:00:00'):
+    payload = {'id_scan': id_scan, 'status': status, 'timestamp': timestamp}
+    return (f"{timestamp},000 INFO [Dashboard-resend-handler] resend_result "
+            f"{json.dumps(payload)}\n")
+
+
+@pytest.fixture
+def ledger(app):
+    ledger = app.ResendLedger()
+    yield ledger
+    ledger.close()
+
+
+def test_new_ledger_is_seeded_from_log_audit_lines(ledger, tmp_path):
+    logs = LogDirectory(tmp_path)
+    logs.write([resend_line('SCAN1', 'FAILED'), resend_line('SCAN1', 'SUCCESS'),
+                resend_line('SCAN2', 'FAILED')])
+
+    ledger.configure(logs.path)
+
+    overrides = ledger.get_overrides()
+    assert overrides['SCAN1']['status'] == 'SUCCESS'
+    assert overrides['SCAN2']['status'] == 'FAILED'
+    assert ledger.get_stats()['source'] == 'sqlite'
+
+
+def test_recorded_outcomes_survive_reopening(app, ledger, logs, tmp_path_factory):
+    ledger.configure(logs.path)
+    version = ledger.get_version()
+    ledger.record({'id_scan': 'SCAN1', 'status': 'SUCCESS'})
+    assert ledger.get_version() > version
+
+    ledger.configure(str(tmp_path_factory.mktemp('elsewhere')))
+    assert ledger.get_overrides() == {}
+    ledger.configure(logs.path)
+    assert ledger.get_overrides()['SCAN1']['status'] == 'SUCCESS'
+
+
+def test_unopenable_database_falls_back_to_log_audit_lines(app, ledger, tmp_path,
+                                                           monkeypatch):
+    logs = LogDirectory(tmp_path)
+    logs.write([resend_line('SCAN1', 'SUCCESS')])
+
+    def refuse(*args, **kwargs):
+        raise sqlite3.OperationalError('unable to open database file')
+
+    monkeypatch.setattr(app.sqlite3, 'connect', refuse)
+    ledger.configure(logs.path)
+
+    assert ledger.get_overrides()['SCAN1']['status'] == 'SUCCESS'
+    stats = ledger.get_stats()
+    assert stats['source'] == 'logs'
+    assert stats['open'] is False
+    assert stats['errors'] == 1
+
+    ledger.record({'id_scan': 'SCAN2', 'status': 'FAILED'})
+    assert set(ledger.get_overrides()) == {'SCAN1', 'SCAN2'}
+
+
+def test_overrides_apply_to_parsed_entries(app, client, logs):
+    logs.write([center_line('SCAN1', False), center_line('SCAN2', False)])
+    app.resend_ledger.record({'id_scan': 'SCAN1', 'status': 'SUCCESS',
+                              'timestamp': '2025-10-02 11:00:00'})
+
+    rows = client.get('/api/data?status=NOK').get_json()['data']
+
+    assert [row['id_scan'] for row in rows] == ['SCAN2']
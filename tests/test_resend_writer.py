@@ -0,0 +1,51 @@
+import threading
+import time
+
+
+def read_lines(path):
+    with open(path, encoding='utf-8') as handle:
+        return handle.read().splitlines()
+
+
+def test_drain_writes_everything_and_writer_restarts(app, tmp_path):
+    writer = app.ResendOutcomeWriter()
+    log_path = str(tmp_path / 'Transmission.log')
+
+    writer.submit(log_path, 'first\n')
+    assert writer.drain()
+    writer.submit(log_path, 'second\n')
+    assert writer.drain()
+
+    assert read_lines(log_path) == ['first', 'second']
+
+
+def test_submit_during_drain_is_not_lost(app, tmp_path, monkeypatch):
+    writer = app.ResendOutcomeWriter()
+    log_path = str(tmp_path / 'Transmission.log')
+    writing = threading.Event()
+    release = threading.Event()
+    write_batch = writer._write_batch
+
+    def slow_write_batch(batch):
+        writing.set()
+        release.wait(5)
+        write_batch(batch)
+
+    monkeypatch.setattr(writer, '_write_batch', slow_write_batch)
+
+    writer.submit(log_path, 'before\n')
+    assert writing.wait(5)
+    first_writer, first_queue = writer.thread, writer.queue
+    drainer = threading.Thread(target=writer.drain)
+    drainer.start()
+    deadline = time.monotonic() + 5
+    while first_queue.empty() and time.monotonic() < deadline:
+        time.sleep(0.001)
+    # The stop marker is queued while the first writer is still busy.
+    assert first_writer.is_alive()
+    writer.submit(log_path, 'during\n')
+    release.set()
+    drainer.join()
+    assert writer.drain()
+
+    assert read_lines(log_path) == ['before', 'during']
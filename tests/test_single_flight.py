@@ -0,0 +1,87 @@
+import threading
+import time
+
+import pytest
+
+
+def wait_for(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, 'condition not reached'
+        time.sleep(0.005)
+
+
+def run_leader(app, flight, release, error, deadline=None):
+    """Start a leader whose computation fails with ``error`` once released."""
+    def compute():
+        release.wait(5)
+        raise error
+
+    def lead():
+        if deadline:
+            app.set_parse_deadline(deadline)
+        try:
+            flight.do('key', compute)
+        except Exception:
+            pass
+        finally:
+            app.clear_parse_deadline()
+
+    thread = threading.Thread(target=lead)
+    thread.start()
+    wait_for(lambda: flight.get_stats()['in_flight'] == 1)
+    return thread
+
+
+@pytest.fixture
+def flight(app):
+    return app.SingleFlight()
+
+
+def join_as_follower(flight, func, outcomes):
+    def follow():
+        try:
+            outcomes.append(flight.do('key', func))
+        except Exception as exc:
+            outcomes.append(exc)
+
+    thread = threading.Thread(target=follow)
+    thread.start()
+    return thread
+
+
+def test_follower_with_time_left_retries_after_leader_deadline(app, flight):
+    release = threading.Event()
+    leader = run_leader(app, flight, release, app.ParseDeadlineExceeded('leader ran out'),
+                        deadline=30)
+    outcomes = []
+    follower = join_as_follower(flight, lambda: 'rows', outcomes)
+    wait_for(lambda: flight.get_stats()['coalesced'] == 1)
+
+    release.set()
+    leader.join(5)
+    follower.join(5)
+
+    assert outcomes == ['rows']
+    stats = flight.get_stats()
+    assert stats['retried'] == 1 and stats['executions'] == 2
+
+
+def test_followers_get_fresh_chained_errors(app, flight):
+    release = threading.Event()
+    original = ValueError('bad log line')
+    leader = run_leader(app, flight, release, original)
+    outcomes = []
+    followers = [join_as_follower(flight, lambda: 'unused', outcomes) for _ in range(2)]
+    wait_for(lambda: flight.get_stats()['coalesced'] == 2)
+
+    release.set()
+    leader.join(5)
+    for follower in followers:
+        follower.join(5)
+
+    first, second = outcomes
+    assert isinstance(first, ValueError) and isinstance(second, ValueError)
+    assert first is not second and original not in outcomes
+    assert first.__cause__ is original and second.__cause__ is original
+    assert str(first) == 'bad log line'